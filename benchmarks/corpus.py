@@ -0,0 +1,116 @@
+"""
+Deterministic generator of synthetic `projects_data` trees.
+
+The same seed always produces the same tree: many projects, all nine context
+types, skewed file sizes (most files small, a long tail of large archives and
+timelines) and markdown bodies made of headings and bullet points.
+
+    python benchmarks/corpus.py /tmp/corpus --files 10000 --projects 50
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from context_core.constants import VALID_CONTEXT_TYPES
+
+# Share of files per type, roughly what long-running projects accumulate
+TYPE_WEIGHTS = {
+    "facts": 14, "decisions": 10, "goals": 6,
+    "instructions": 4, "actions": 12, "summaries": 24,
+    "archives": 12, "personas": 3, "timeline": 15,
+}
+
+# Median body size in bytes per type; actual sizes follow a log-normal spread
+TYPE_MEDIAN_BYTES = {
+    "facts": 1200, "decisions": 900, "goals": 600,
+    "instructions": 800, "actions": 500, "summaries": 1500,
+    "archives": 24000, "personas": 700, "timeline": 4000,
+}
+
+WORDS = (
+    "context project decision goal fact summary archive persona timeline agent "
+    "model token budget prompt cache index search manifest latency storage file "
+    "session insight next step review design api user workflow release plan "
+    "risk metric deploy test benchmark backlog customer feedback roadmap scope "
+    "owner deadline migration schema query vector chunk section heading note"
+).split()
+
+SECTIONS = ["Overview", "Key Accomplishments", "Insights", "Next Steps", "Details", "Open Questions"]
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(6, 14))
+    return " ".join(words).capitalize() + "."
+
+
+def _body(rng: random.Random, title: str, size: int) -> str:
+    parts = [f"# {title}\n"]
+    length = len(parts[0])
+    while length < size:
+        heading = f"\n## {rng.choice(SECTIONS)}\n"
+        parts.append(heading)
+        length += len(heading)
+        for _ in range(rng.randint(2, 6)):
+            line = f"- {_sentence(rng)}\n"
+            parts.append(line)
+            length += len(line)
+    return "".join(parts)
+
+
+def _name(rng: random.Random, context_type: str, index: int, start: date) -> str:
+    if context_type in ("summaries", "timeline"):
+        return (start + timedelta(days=index)).isoformat()
+    return f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{index}"
+
+
+def generate(root: Path, files: int, projects: int = 10, seed: int = 0) -> dict:
+    """
+    Write a synthetic tree under `root/projects_data` and return its stats.
+    """
+    rng = random.Random(seed)
+    data_path = root / "projects_data"
+    names = [f"project-{i:04d}" for i in range(projects)]
+
+    # Project sizes are skewed too: a few large projects, many small ones
+    project_weights = [1 / (i + 1) for i in range(projects)]
+    type_names = list(TYPE_WEIGHTS)
+    type_weights = [TYPE_WEIGHTS[t] for t in type_names]
+
+    for project in names:
+        for context_type in VALID_CONTEXT_TYPES:
+            (data_path / project / context_type).mkdir(parents=True, exist_ok=True)
+        meta = {"project": project, "created": "2025-01-01T00:00:00", "context_types": VALID_CONTEXT_TYPES}
+        (data_path / project / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    counters = {}
+    total_bytes = 0
+    start = date(2020, 1, 1)
+    for _ in range(files):
+        project = rng.choices(names, project_weights)[0]
+        context_type = rng.choices(type_names, type_weights)[0]
+        index = counters.get((project, context_type), 0)
+        counters[(project, context_type)] = index + 1
+
+        size = int(rng.lognormvariate(0, 0.9) * TYPE_MEDIAN_BYTES[context_type])
+        name = _name(rng, context_type, index, start)
+        body = _body(rng, name.replace("-", " ").title(), size)
+        (data_path / project / context_type / f"{name}.md").write_text(body)
+        total_bytes += len(body)
+
+    return {"files": files, "projects": projects, "seed": seed, "bytes": total_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic projects_data tree.")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args()
+    print(json.dumps(generate(options.root, options.files, options.projects, options.seed)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Startup benchmark for the `context` entry point.
+
+For each command it measures wall-clock time over several cold process
+launches, and it records `python -X importtime` totals for the fast path and
+for the full Typer app. Results are printed as JSON.
+
+    python benchmarks/startup.py --runs 20 > startup.json
+    python benchmarks/startup.py --baseline startup.json --tolerance 0.25
+
+With --baseline, the run exits with status 1 if any command's median got
+slower than the baseline by more than the tolerance.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ENTRY = "import sys; from context_core.fastpath import main; sys.exit(main())"
+
+COMMANDS = {
+    "hello": ["hello"],
+    "list-contexts": ["list-contexts", "bench"],
+    "view-context": ["view-context", "bench", "facts", "notes"],
+    "search": ["search", "latency"],
+    "load": ["load", "--project", "bench", "--max-tokens", "2000"],
+    "help": ["--help"],
+}
+
+
+def make_project(root: Path):
+    project = root / "projects_data" / "bench"
+    for folder in ["facts", "goals", "summaries"]:
+        (project / folder).mkdir(parents=True)
+    (project / "meta.json").write_text(json.dumps({"project": "bench"}))
+    (project / "facts" / "notes.md").write_text("# Notes\n\n" + "Startup latency matters.\n" * 50)
+    (project / "goals" / "speed.md").write_text("# Speed\n\nKeep every command fast.\n")
+    (project / "summaries" / "2025-01-01.md").write_text("# Session\n\n## Next Steps\n- Measure\n")
+
+
+def time_command(args, cwd: Path, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", ENTRY, *args], cwd=cwd, capture_output=True, check=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "runs": runs,
+        "min_ms": round(samples[0], 2),
+        "median_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+    }
+
+
+def import_time(module: str, top: int = 5) -> dict:
+    """
+    Return the cumulative import time of `module` and its slowest children.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative), name.strip()))
+
+    total = next((us for us, name in rows if name == module), 0)
+    slowest = sorted((r for r in rows if r[1] != module), reverse=True)[:top]
+    return {
+        "total_us": total,
+        "slowest": [{"module": name, "cumulative_us": us} for us, name in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--baseline", type=Path, help="Earlier JSON output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown (0.25 = 25%%)")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_project(root)
+        report = {
+            "python": sys.version.split()[0],
+            "commands": {name: time_command(args, root, options.runs) for name, args in COMMANDS.items()},
+            "imports": {
+                "context_core.fastpath": import_time("context_core.fastpath"),
+                "context_core.__main__": import_time("context_core.__main__"),
+            },
+        }
+
+    print(json.dumps(report, indent=2))
+
+    if options.baseline:
+        baseline = json.loads(options.baseline.read_text())["commands"]
+        regressions = [
+            name for name, stats in report["commands"].items()
+            if name in baseline and stats["median_ms"] > baseline[name]["median_ms"] * (1 + options.tolerance)
+        ]
+        if regressions:
+            print(f"Startup regressions: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Storage backend benchmark: flat files vs SQLite as the corpus grows.
+
+For each corpus size both backends are filled through `Storage.create_many`
+with the same synthetic contexts (see corpus.py), spread over projects of a
+fixed size, then list, read and create latencies are sampled through the
+`Storage` interface (`fill_s` includes generating the bodies). Results are
+printed as JSON:
+
+    python benchmarks/storage.py --files 10000,100000,1000000 > storage.json
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from context_core import storage
+from context_core.constants import VALID_CONTEXT_TYPES
+from corpus import TYPE_MEDIAN_BYTES, TYPE_WEIGHTS, _body
+from suite import summarize
+
+
+def contexts(files: int, per_project: int, seed: int):
+    """Yield (project, type, name, content) for a deterministic corpus."""
+    rng = random.Random(seed)
+    type_names = list(TYPE_WEIGHTS)
+    type_weights = [TYPE_WEIGHTS[t] for t in type_names]
+    for index in range(files):
+        context_type = rng.choices(type_names, type_weights)[0]
+        size = int(rng.lognormvariate(0, 0.9) * TYPE_MEDIAN_BYTES[context_type])
+        name = f"note-{index:07d}"
+        yield f"project-{index // per_project:05d}", context_type, name, _body(rng, name, size)
+
+
+def fill(store, files: int, per_project: int, seed: int) -> float:
+    started = time.perf_counter()
+    batch, current = [], None
+    for project, context_type, name, content in contexts(files, per_project, seed):
+        if project != current:
+            if batch:
+                store.create_many(current, batch)
+            store.init_project(project)
+            batch, current = [], project
+        batch.append((context_type, name, content))
+    if batch:
+        store.create_many(current, batch)
+    return time.perf_counter() - started
+
+
+def sample(operation, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - began) * 1000)
+    return summarize(samples)
+
+
+def run_backend(backend: str, files: int, per_project: int, repeat: int, seed: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        store = storage.FileStorage(root) if backend == "files" else storage.SQLiteStorage(root)
+        fill_s = fill(store, files, per_project, seed)
+
+        rng = random.Random(seed)
+        projects = (files + per_project - 1) // per_project
+        catalogue = [(p, t, n) for p, t, n, _ in contexts(files, per_project, seed)]
+        counter = iter(range(10**9))
+
+        def pick_project():
+            return f"project-{rng.randrange(projects):05d}"
+
+        results = {
+            "fill_s": round(fill_s, 2),
+            "list-project": sample(lambda: store.list_contexts(pick_project()), repeat),
+            "list-type": sample(lambda: store.list_contexts(pick_project(), rng.choice(VALID_CONTEXT_TYPES)), repeat),
+            "read": sample(lambda: store.read(*rng.choice(catalogue)), repeat),
+            "create": sample(lambda: store.create(pick_project(), "facts", f"bench-{next(counter)}", "x\n"), repeat),
+        }
+        store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare storage backends on growing corpora.")
+    parser.add_argument("--files", default="10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--per-project", type=int, default=500, help="Files per project")
+    parser.add_argument("--backends", default=",".join(storage.BACKENDS))
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write JSON here instead of stdout")
+    options = parser.parse_args()
+
+    report = {
+        "python": sys.version.split()[0],
+        "seed": options.seed,
+        "per_project": options.per_project,
+        "scales": [
+            {
+                "files": int(size),
+                "backends": {
+                    backend: run_backend(backend, int(size), options.per_project, options.repeat, options.seed)
+                    for backend in options.backends.split(",")
+                },
+            }
+            for size in options.files.split(",")
+        ],
+    }
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        options.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Scaling benchmark: runs every CLI command against synthetic corpora.
+
+For each corpus size a fresh tree is generated (see corpus.py), then each
+command is invoked in-process through the Typer app many times. The first
+call is reported separately, since it also pays for building manifests and
+indexes. Results are printed as JSON:
+
+    python benchmarks/suite.py --files 10000,100000 --repeat 50 > bench.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from context_core.__main__ import app
+from corpus import generate
+
+runner = CliRunner()
+
+
+@contextmanager
+def working_directory(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def percentile(sorted_samples, pct: float) -> float:
+    index = min(len(sorted_samples) - 1, max(0, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples_ms) -> dict:
+    first, rest = samples_ms[0], sorted(samples_ms[1:] or samples_ms)
+    return {
+        "samples": len(rest),
+        "first_ms": round(first, 3),
+        "mean_ms": round(statistics.fmean(rest), 3),
+        "p50_ms": round(percentile(rest, 50), 3),
+        "p95_ms": round(percentile(rest, 95), 3),
+        "p99_ms": round(percentile(rest, 99), 3),
+        "throughput_per_s": round(len(rest) / (sum(rest) / 1000), 1) if sum(rest) else None,
+    }
+
+
+def catalogue(data_path: Path):
+    """List (project, type, name) for every generated file."""
+    files = []
+    for project in sorted(os.listdir(data_path)):
+        for context_type in sorted(os.listdir(data_path / project)):
+            folder = data_path / project / context_type
+            if folder.is_dir():
+                files.extend((project, context_type, n[:-3]) for n in sorted(os.listdir(folder)) if n.endswith(".md"))
+    return files
+
+
+def command_cases(files, projects, rng: random.Random):
+    """
+    Map each benchmark name to a function returning (argv, setup) per sample.
+    `setup` runs untimed before the command.
+    """
+    def pick_file():
+        return rng.choice(files)
+
+    def scratch_project():
+        source = rng.choice(projects)
+        target = f"scratch-{rng.randrange(10**9)}"
+        return target, lambda: shutil.copytree(Path("projects_data") / source, Path("projects_data") / target)
+
+    counter = iter(range(10**9))
+
+    def create():
+        project, _, _ = pick_file()
+        return ["create-context", project, "facts", f"bench-{next(counter)}"], None
+
+    def delete():
+        project, _, _ = pick_file()
+        name = f"bench-del-{next(counter)}"
+        return ["delete-context", project, "facts", name, "--force"], \
+            lambda: runner.invoke(app, ["create-context", project, "facts", name])
+
+    def delete_project():
+        target, setup = scratch_project()
+        return ["delete-project", target, "--force"], setup
+
+    return {
+        "list-contexts": lambda: (["list-contexts", rng.choice(projects)], None),
+        "list-contexts-type": lambda: (["list-contexts", pick_file()[0], "summaries"], None),
+        "view-context": lambda: (["view-context", *pick_file()], None),
+        "load": lambda: (["load", "--project", rng.choice(projects), "--max-tokens", "4000"], None),
+        "search-project": lambda: (["search", "latency budget", "--project", rng.choice(projects)], None),
+        "search-all": lambda: (["search", rng.choice(["cache index", "release plan", "token"])], None),
+        "create-context": create,
+        "delete-context": delete,
+        "delete-project": delete_project,
+    }
+
+
+def run_scale(files: int, projects: int, repeat: int, seed: int, only=None) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+        corpus = generate(root, files, projects, seed)
+        corpus["generation_s"] = round(time.perf_counter() - start, 2)
+
+        with working_directory(root):
+            catalogue_files = catalogue(Path("projects_data"))
+            project_names = sorted({f[0] for f in catalogue_files})
+            cases = command_cases(catalogue_files, project_names, random.Random(seed))
+
+            results = {}
+            for name, case in cases.items():
+                if only and name not in only:
+                    continue
+                samples = []
+                for _ in range(repeat):
+                    argv, setup = case()
+                    if setup:
+                        setup()
+                    began = time.perf_counter()
+                    result = runner.invoke(app, argv)
+                    samples.append((time.perf_counter() - began) * 1000)
+                    if result.exit_code != 0:
+                        raise RuntimeError(f"{' '.join(argv)} failed: {result.output}")
+                results[name] = summarize(samples)
+
+    return {"corpus": corpus, "commands": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI commands on synthetic corpora.")
+    parser.add_argument("--files", default="10000", help="Comma-separated corpus sizes, e.g. 10000,100000,1000000")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="Comma-separated subset of commands to run")
+    parser.add_argument("--output", type=Path, help="Write JSON here instead of stdout")
+    options = parser.parse_args()
+
+    only = set(options.only.split(",")) if options.only else None
+    report = {
+        "python": sys.version.split()[0],
+        "seed": options.seed,
+        "scales": [
+            run_scale(int(size), options.projects, options.repeat, options.seed, only)
+            for size in options.files.split(",")
+        ],
+    }
+
+    text = json.dumps(report, indent=2)
+    if options.output:
+        options.output.write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
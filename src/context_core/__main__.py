@@ -2,17 +2,22 @@ import typer
 import os
 import json
 import subprocess
-from datetime import datetime
 from pathlib import Path
 
+from context_core import events, fastpath, manifest, operations, trace
+from context_core.constants import VALID_CONTEXT_TYPES
+
 # Create the Typer app
 app = typer.Typer()
 
-VALID_CONTEXT_TYPES = [
-    "facts", "decisions", "goals",
-    "instructions", "actions", "summaries",
-    "archives", "personas", "timeline"
-]
+
+@app.callback()
+def global_options(ctx: typer.Context, profile: bool = typer.Option(False, "--profile", help="Print timing spans and I/O counters to stderr")):
+    """
+    Context management CLI tool.
+    """
+    if trace.start("stderr" if profile else None):
+        ctx.call_on_close(trace.finish)
 
 
 # ──────────────────────────────────────────────────────────────
@@ -33,6 +38,62 @@ def safe_prompt(prompt_text: str) -> str:
     return value
 
 
+def _project_path(project: str) -> Path:
+    project_path = Path("projects_data") / project
+    if not project_path.exists():
+        typer.echo(f"❌ Project '{project}' does not exist.")
+        raise typer.Exit(code=1)
+    return project_path
+
+
+def _store():
+    """
+    The `ContextStore` the commands work through, on the storage backend
+    selected by CONTEXT_STORAGE (flat files by default).
+    """
+    from context_core.store import ContextStore
+
+    try:
+        return ContextStore(Path("projects_data"))
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+
+def _require_files(command: str):
+    """
+    Refuse a command built on the flat-file layout when CONTEXT_STORAGE
+    selects another backend.
+    """
+    from context_core import storage
+
+    try:
+        if storage.selected() != "files":
+            raise storage.files_only(command)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+
+def _existing_context(project: str, type: str, name: str) -> Path:
+    try:
+        return operations.existing_context(project, type, name)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+
+def _run_operation(op: str, **args):
+    """
+    Run a read operation, through the daemon when CONTEXT_SOCKET points at one.
+    """
+    try:
+        return fastpath.run_operation(op, **args)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+
 # ──────────────────────────────────────────────────────────────
 # CLI COMMAND: init-project
 # Initializes a new project with folder structure and metadata
@@ -42,49 +103,30 @@ def init_project(project_name: str):
     """
     Initialize a new context project with folders and metadata.
     """
-    base_path = Path("projects_data") / project_name
-
-    # Define the standard context subfolders
-    subfolders = [
-        "facts", "decisions", "goals",
-        "instructions", "actions", "summaries",
-        "archives", "personas", "timeline"
-    ]
-
-    # Prevent overwriting an existing project
-    if base_path.exists():
-        typer.echo(f"⚠️ Project '{project_name}' already exists.")
+    # Creates the project folder, each context subfolder and meta.json,
+    # refusing to overwrite an existing project
+    try:
+        base_path = _store().init_project(project_name).path
+    except operations.ContextExists as e:
+        typer.echo(f"⚠️ {e}")
         raise typer.Exit(code=1)
 
-    # Create the project folder and each subfolder
-    for folder in subfolders:
-        folder_path = base_path / folder
-        folder_path.mkdir(parents=True, exist_ok=True)
-
-    # Create a metadata file for the project
-    meta = {
-        "project": project_name,
-        "created": datetime.now().isoformat(),
-        "context_types": subfolders
-    }
-    with open(base_path / "meta.json", "w") as f:
-        json.dump(meta, f, indent=2)
-
     typer.echo(f"✅ Initialized project at {base_path}")
 
 # ──────────────────────────────────────────────────────────────
 # CLI COMMAND: delete-project
-# Delete a project and all its context folders and files.
+# Move a project and all its context folders and files to the trash.
 # ──────────────────────────────────────────────────────────────
 @app.command("delete-project")
 def delete_project(project_name: str, force: bool = typer.Option(False, "--force", help="Skip confirmation")):
     """
-    Delete a project and all its context folders and files.
+    Delete a project and all its context folders and files (restorable until `gc`).
     """
-    base_path = Path("projects_data") / project_name
-
-    if not base_path.exists():
-        typer.echo(f"❌ Project '{project_name}' does not exist.")
+    store = _store()
+    try:
+        store.project(project_name)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
         raise typer.Exit(code=1)
 
     # Confirm deletion unless --force is used
@@ -94,10 +136,30 @@ def delete_project(project_name: str, force: bool = typer.Option(False, "--force
             typer.echo("❎ Cancelled.")
             raise typer.Exit(code=1)
 
-    # Recursively delete the project folder
-    import shutil
-    shutil.rmtree(base_path)
+    # One rename (or one SQLite transaction) into the trash; `gc` reclaims the space later
+    try:
+        store.delete_project(project_name)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
     typer.echo(f"🗑️ Deleted project '{project_name}' and all contents.")
+    typer.echo(f"♻️ Restore it with: context restore-project {project_name}")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: restore-project
+# Bring a deleted project back from the trash
+# ──────────────────────────────────────────────────────────────
+@app.command("restore-project")
+def restore_project(project_name: str):
+    """
+    Restore the most recently deleted project of that name from the trash.
+    """
+    try:
+        base_path = _store().restore_project(project_name).path
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"♻️ Restored project at {base_path}")
 
 # ──────────────────────────────────────────────────────────────
 # CLI COMMAND: create-context
@@ -108,28 +170,21 @@ def create_context(project: str, type: str, name: str):
     """
     Create a new context file in a project (e.g. facts/my-topic.md).
     """
-    if type not in VALID_CONTEXT_TYPES:
-        typer.echo(f"❌ '{type}' is not a valid context type.")
+    try:
+        file_path = _store().create(project, type, name).path
+    except operations.InvalidContextType as e:
+        typer.echo(f"❌ {e}")
         typer.echo("📂 Valid types:")
         for t in VALID_CONTEXT_TYPES:
             typer.echo(f"  - {t}")
         raise typer.Exit(code=1)
-
-    base_path = Path("projects_data") / project / type
-    file_path = base_path / f"{name}.md"
-
-    if not base_path.exists():
-        typer.echo(f"❌ The folder '{base_path}' does not exist. Did you run `init`?")
+    except operations.ContextExists as e:
+        typer.echo(f"⚠️ {e}")
         raise typer.Exit(code=1)
-
-    if file_path.exists():
-        typer.echo(f"⚠️ File '{file_path}' already exists.")
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
         raise typer.Exit(code=1)
 
-    title = name.replace("-", " ").title()
-    content = f"# {title}\n\nCreated on {datetime.now().isoformat()}\n"
-    file_path.write_text(content)
-
     typer.echo(f"✅ Created file: {file_path}")
 
 # ──────────────────────────────────────────────────────────────
@@ -141,10 +196,11 @@ def delete_context(project: str, type: str, name: str, force: bool = typer.Optio
     """
     Delete a context file from a project (e.g. facts/my-topic.md).
     """
-    file_path = Path("projects_data") / project / type / f"{name}.md"
-
-    if not file_path.exists():
-        typer.echo(f"❌ File '{file_path}' does not exist.")
+    store = _store()
+    try:
+        file_path = store.get(project, type, name).path
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
         raise typer.Exit(code=1)
 
     if not force:
@@ -153,9 +209,25 @@ def delete_context(project: str, type: str, name: str, force: bool = typer.Optio
             typer.echo("❎ Cancelled.")
             raise typer.Exit(code=1)
 
-    file_path.unlink()
+    store.delete(project, type, name)
     typer.echo(f"🗑️ Deleted file: {file_path}")
 
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: restore-context
+# Bring a deleted context file back from the trash
+# ──────────────────────────────────────────────────────────────
+@app.command("restore-context")
+def restore_context(project: str, type: str, name: str):
+    """
+    Restore the most recently deleted version of a context file from the trash.
+    """
+    try:
+        file_path = _store().restore(project, type, name).path
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"♻️ Restored file: {file_path}")
+
 # ──────────────────────────────────────────────────────────────
 # CLI COMMAND: edit-context
 # Edit a context file in your system editor
@@ -165,37 +237,79 @@ def edit_context(project: str, type: str, name: str):
     """
     Edit a context file in your default system editor (e.g. nano, code).
     """
-    file_path = Path("projects_data") / project / type / f"{name}.md"
+    store = _store()
+    if not store.files_backend:
+        _edit_in_storage(store, project, type, name)
+        return
 
-    if not file_path.exists():
-        typer.echo(f"❌ File '{file_path}' does not exist.")
-        raise typer.Exit(code=1)
+    file_path = _existing_context(project, type, name)
+
+    # Packed archives are unpacked to a loose file for editing
+    packed = operations.packed_archive(project, type, name)
+    if packed and not file_path.exists():
+        packed.extract(name)
 
     editor = os.environ.get("EDITOR", "nano")
     subprocess.run([editor, str(file_path)])
+    manifest.update_entry(file_path.parent.parent, type, file_path.name)
+    events.record(file_path.parent.parent, "edit", type, name)
+
+    # Once a project has history, every edit is kept in it
+    from context_core import history
+    store = history.History(file_path.parent.parent)
+    if store.ids():
+        store.take(f"edit {type}/{name}")
+
+
+def _edit_in_storage(store, project: str, type: str, name: str):
+    """Edit a context kept outside the file layout through a temporary copy."""
+    import tempfile
+
+    try:
+        content = store.read(project, type, name)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+    with tempfile.TemporaryDirectory() as folder:
+        copy = Path(folder) / f"{name}.md"
+        copy.write_text(content, encoding="utf-8")
+        editor = os.environ.get("EDITOR", "nano")
+        subprocess.run([editor, str(copy)])
+        edited = copy.read_text(encoding="utf-8")
+    if edited != content:
+        store.write(project, type, name, edited)
 
 # ──────────────────────────────────────────────────────────────
 # CLI COMMAND: view-context
 # Print the contents of a context file to the terminal
 # ──────────────────────────────────────────────────────────────
 @app.command("view-context")
-def view_context(project: str, type: str, name: str, pager: bool = typer.Option(False, "--pager", help="Use a pager like 'less' to view the file")):
+def view_context(
+    project: str,
+    type: str,
+    name: str,
+    pager: bool = typer.Option(False, "--pager", help="Use a pager like 'less' to view the file"),
+    section: str = typer.Option(None, "--section", "-s", help="Only show the section under this heading"),
+    byte_range: str = typer.Option(None, "--range", help="Only show bytes START:END (of the section, if given)"),
+):
     """
-    View the contents of a context file.
+    View the contents of a context file, or one section or byte range of it.
     """
-    file_path = Path("projects_data") / project / type / f"{name}.md"
-
-    if not file_path.exists():
-        typer.echo(f"❌ File '{file_path}' does not exist.")
+    try:
+        blocks = fastpath.view_blocks(project, type, name, section, byte_range)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
         raise typer.Exit(code=1)
 
-    content = file_path.read_text()
-
     if pager:
         pager_process = subprocess.Popen(["less"], stdin=subprocess.PIPE)
-        pager_process.communicate(input=content.encode())
+        pager_process.communicate(input="".join(blocks).encode())
     else:
-        typer.echo(content)
+        with trace.span("output"):
+            for block in blocks:
+                typer.echo(block, nl=False)
+            typer.echo()
 
 # ──────────────────────────────────────────────────────────────
 # CLI COMMAND: list-contexts
@@ -206,37 +320,891 @@ def list_contexts(project: str, type: str = typer.Argument(None, help="Optional
     """
     List context files in a project. If a type is provided, only list that folder.
     """
+    folders = _run_operation("list-contexts", project=project, type=type)
+    with trace.span("output"):
+        for line in fastpath.render_listing(project, type, folders):
+            typer.echo(line)
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: archive-context
+# Append a conversation log to the project's packed archives
+# ──────────────────────────────────────────────────────────────
+@app.command("archive-context")
+def archive_context(
+    project: str,
+    name: str,
+    source: Path = typer.Argument(None, help="File holding the conversation (default: stdin)"),
+    codec: str = typer.Option("zlib", "--codec", help="Compression codec: zlib or lzma"),
+):
+    """
+    Store a conversation log as a compressed archive (read it back with view-context).
+    """
+    _require_files("archive-context")
+    import sys
+    from context_core.archives import CODECS, ArchiveStore
+
+    project_path = Path("projects_data") / project
+    if not (project_path / "archives").exists():
+        typer.echo(f"❌ The folder '{project_path / 'archives'}' does not exist. Did you run `init`?")
+        raise typer.Exit(code=1)
+
+    if codec not in CODECS:
+        typer.echo(f"❌ Unknown codec '{codec}'. Use one of: {', '.join(CODECS)}.")
+        raise typer.Exit(code=1)
+
+    if source and not source.exists():
+        typer.echo(f"❌ File '{source}' does not exist.")
+        raise typer.Exit(code=1)
+
+    if (project_path / "archives" / f"{name}.md").exists() or operations.packed_archive(project, "archives", name):
+        typer.echo(f"⚠️ Archive '{name}' already exists.")
+        raise typer.Exit(code=1)
+
+    text = source.read_text() if source else sys.stdin.read()
+    ArchiveStore(project_path).append(name, text, codec)
+    events.record(project_path, "create", "archives", name)
+    typer.echo(f"📦 Archived '{name}' ({len(text.encode())} bytes, {codec})")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: compact-archives
+# Rewrite archive segments without deleted blocks
+# ──────────────────────────────────────────────────────────────
+@app.command("compact-archives")
+def compact_archives(project: str):
+    """
+    Pack loose archive files and reclaim space left by deleted archives.
+    """
+    _require_files("compact-archives")
+    from context_core.archives import ArchiveStore
+
     project_path = Path("projects_data") / project
+    if not (project_path / "archives").exists():
+        typer.echo(f"❌ The folder '{project_path / 'archives'}' does not exist. Did you run `init`?")
+        raise typer.Exit(code=1)
+
+    stats = ArchiveStore(project_path).compact()
+    manifest.refresh(project_path)
+    typer.echo(
+        f"🗜️ Compacted {stats['archives']} archive(s), packed {stats['packed_files']} loose file(s): "
+        f"{stats['bytes_before']} → {stats['bytes_after']} bytes"
+    )
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: summarize
+# Fold new session summaries into the project's cumulative summary
+# ──────────────────────────────────────────────────────────────
+@app.command("summarize")
+def summarize(
+    project: str,
+    cumulative: bool = typer.Option(False, "--cumulative", help="Update summaries/cumulative.md from new session summaries"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Fold the whole history again instead of only new sessions"),
+):
+    """
+    Merge date-named session summaries into a rolling cumulative summary.
+    """
+    _require_files("summarize")
+    from context_core import summaries
+
+    project_path = Path("projects_data") / project
+    if not (project_path / "summaries").exists():
+        typer.echo(f"❌ The folder '{project_path / 'summaries'}' does not exist. Did you run `init`?")
+        raise typer.Exit(code=1)
+
+    if not cumulative:
+        typer.echo("❌ Only cumulative summaries are supported for now. Use --cumulative.")
+        raise typer.Exit(code=1)
+
+    result = summaries.update_cumulative(project_path, rebuild=rebuild)
+    if result["rebuilt"]:
+        typer.echo("♻️ Last folded session changed; refolded the whole history.")
+    if result["folded"]:
+        typer.echo(f"🧾 Folded {len(result['folded'])} new session(s): {', '.join(result['folded'])}")
+    else:
+        typer.echo("✅ Cumulative summary is up to date.")
+    typer.echo(f"📄 {result['path']} ({result['sessions']} session(s) total)")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: load
+# Stream selected context types of a project as one output
+# ──────────────────────────────────────────────────────────────
+@app.command("load")
+def load(
+    project: str = typer.Option(..., "--project", "-p", help="Project to load context from"),
+    facts: bool = typer.Option(False, "--facts", help="Include facts/"),
+    decisions: bool = typer.Option(False, "--decisions", help="Include decisions/"),
+    goals: bool = typer.Option(False, "--goals", help="Include goals/"),
+    instructions: bool = typer.Option(False, "--instructions", help="Include instructions/"),
+    actions: bool = typer.Option(False, "--actions", help="Include actions/"),
+    summaries: bool = typer.Option(False, "--summaries", help="Include summaries/"),
+    archives: bool = typer.Option(False, "--archives", help="Include archives/"),
+    personas: bool = typer.Option(False, "--personas", help="Include personas/"),
+    timeline: bool = typer.Option(False, "--timeline", help="Include timeline/"),
+    max_tokens: int = typer.Option(None, "--max-tokens", min=1, help="Stop once this many tokens have been emitted"),
+    priority: str = typer.Option(None, "--priority", help="Comma-separated type order (e.g. goals,facts)"),
+    query: str = typer.Option(None, "--query", "-q", help="Only load the heading-level chunks relevant to this query, best first"),
+    cache_friendly: bool = typer.Option(False, "--cache-friendly", help="Stable types first, deterministic layout, whole files only"),
+    fingerprints: bool = typer.Option(False, "--fingerprints", help="With --cache-friendly, print block fingerprints as JSON to stderr"),
+    dedup: bool = typer.Option(False, "--dedup", help="Replace near-duplicate paragraphs with a pointer to the first copy"),
+):
+    """
+    Load a project's context in one pass. With no type flags, all types are loaded.
+    """
+    from context_core.loader import assemble, iter_context, iter_relevant
+
+    store = _store()
+    try:
+        project_path = store.project(project).path
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+    flags = {
+        "facts": facts, "decisions": decisions, "goals": goals,
+        "instructions": instructions, "actions": actions, "summaries": summaries,
+        "archives": archives, "personas": personas, "timeline": timeline,
+    }
+    types = [t for t in VALID_CONTEXT_TYPES if flags[t]]
 
+    order = [t.strip() for t in priority.split(",") if t.strip()] if priority else []
+    for t in order:
+        if t not in VALID_CONTEXT_TYPES:
+            typer.echo(f"❌ '{t}' is not a valid context type.")
+            raise typer.Exit(code=1)
+
+    if dedup and (query or cache_friendly):
+        typer.echo("❌ --dedup cannot be combined with --query or --cache-friendly.")
+        raise typer.Exit(code=1)
+
+    if not store.files_backend:
+        # Only plain loads run on other backends; the rest needs the file layout
+        try:
+            if query or cache_friendly or dedup:
+                store.require_files("load")
+            text = store.load(project, types, max_tokens, order)
+        except operations.ContextError as e:
+            typer.echo(f"❌ {e}")
+            raise typer.Exit(code=1)
+        with trace.span("output"):
+            typer.echo(text, nl=False)
+        return
+
+    if cache_friendly:
+        if query:
+            typer.echo("❌ --cache-friendly and --query cannot be combined.")
+            raise typer.Exit(code=1)
+        # Built in memory: the fingerprints cover exactly the bytes printed
+        assembled = assemble(project_path, types, max_tokens, order)
+        with trace.span("output"):
+            typer.echo(assembled["text"], nl=False)
+        if fingerprints:
+            import json
+
+            summary = {key: assembled[key] for key in ("prefix_bytes", "prefix_fingerprint", "blocks")}
+            typer.echo(json.dumps(summary, indent=2), err=True)
+        return
+
+    if query:
+        from context_core.relevance import require_numpy
+
+        try:
+            require_numpy()
+        except operations.ContextError as e:
+            typer.echo(f"❌ {e}")
+            raise typer.Exit(code=1)
+        chunks = iter_relevant(project_path, query, types, max_tokens)
+    else:
+        from context_core.dedup import DEFAULT_THRESHOLD
+
+        chunks = iter_context(project_path, types, max_tokens, order, dedup=DEFAULT_THRESHOLD if dedup else None)
+
+    # Flush in blocks rather than per line to keep output overhead low
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= 65536:
+            with trace.span("output"):
+                typer.echo("".join(buffer), nl=False)
+            buffer, size = [], 0
+    with trace.span("output"):
+        typer.echo("".join(buffer), nl=False)
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: search
+# Full-text search across the context files of one or all projects
+# ──────────────────────────────────────────────────────────────
+@app.command("search")
+def search(
+    query: str,
+    project: str = typer.Option(None, "--project", "-p", help="Only search this project"),
+    type: str = typer.Option(None, "--type", "-t", help="Only search this context type"),
+    limit: int = typer.Option(10, "--limit", "-n", min=1, help="Maximum number of results"),
+):
+    """
+    Search context files and show ranked matches with a snippet.
+    """
+    _require_files("search")
+    data_path = Path("projects_data")
+
+    if project and not (data_path / project).exists():
+        typer.echo(f"❌ Project '{project}' does not exist.")
+        raise typer.Exit(code=1)
+
+    if type and type not in VALID_CONTEXT_TYPES:
+        typer.echo(f"❌ '{type}' is not a valid context type.")
+        raise typer.Exit(code=1)
+
+    results = _run_operation("search", query=query, project=project, type=type, limit=limit) if data_path.exists() else []
+    with trace.span("output"):
+        for line in fastpath.render_search(query, results):
+            typer.echo(line)
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: rank
+# Score a project's heading-level chunks against a query
+# ──────────────────────────────────────────────────────────────
+@app.command("rank")
+def rank(
+    query: str,
+    project: str = typer.Option(..., "--project", "-p", help="Project to rank"),
+    type: str = typer.Option(None, "--type", "-t", help="Only rank this context type"),
+    limit: int = typer.Option(10, "--limit", "-n", min=1, help="Maximum number of chunks"),
+):
+    """
+    Rank the sections of a project's context files by relevance to a query (needs NumPy).
+    """
+    _require_files("rank")
+    if type and type not in VALID_CONTEXT_TYPES:
+        typer.echo(f"❌ '{type}' is not a valid context type.")
+        raise typer.Exit(code=1)
+
+    results = _run_operation("rank", query=query, project=project, type=type, limit=limit)
+    with trace.span("output"):
+        if not results:
+            typer.echo(f"📈 No relevant chunks for '{query}'.")
+            return
+        typer.echo(f"📈 {len(results)} chunk(s) ranked for '{query}':")
+        for r in results:
+            heading = f"  § {r['heading']}" if r["heading"] else ""
+            typer.echo(f"  {r['score']:>8.2f}  {r['type']}/{r['file']}:{r['line']}{heading}")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: dedup
+# Report paragraphs repeated nearly verbatim across a project
+# ──────────────────────────────────────────────────────────────
+@app.command("dedup")
+def dedup_command(
+    project: str,
+    type: str = typer.Option(None, "--type", "-t", help="Only compare this context type"),
+    threshold: float = typer.Option(0.8, "--threshold", min=0.1, max=1.0, help="Minimum estimated similarity"),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum number of groups shown"),
+):
+    """
+    Find near-duplicate paragraphs and list items across a project's context files.
+    """
+    _require_files("dedup")
+    from context_core import dedup
+
+    project_path = _project_path(project)
+    if type and type not in VALID_CONTEXT_TYPES:
+        typer.echo(f"❌ '{type}' is not a valid context type.")
+        raise typer.Exit(code=1)
+
+    found = dedup.report(project_path, [type] if type else None, threshold)
+    with trace.span("output"):
+        if not found["clusters"]:
+            typer.echo(f"✨ No near-duplicates among {found['units']} paragraph(s).")
+            return
+        for cluster in found["clusters"][:limit]:
+            typer.echo(f"🔁 {len(cluster['copies'])} copies, ~{cluster['tokens']} token(s) repeated")
+            for copy in cluster["copies"]:
+                typer.echo(f"  {copy['path']}:{copy['line']}-{copy['end']}")
+        if len(found["clusters"]) > limit:
+            typer.echo(f"  ... and {len(found['clusters']) - limit} more group(s)")
+        typer.echo(
+            f"📊 {found['duplicates']} duplicate(s) of {found['units']} paragraph(s) in "
+            f"{len(found['clusters'])} group(s); `load --dedup` saves ~{found['tokens']} token(s)"
+        )
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: timeline
+# Query and append to the project's event log
+# ──────────────────────────────────────────────────────────────
+@app.command("timeline")
+def timeline(
+    project: str,
+    since: str = typer.Option(None, "--since", help="Only events at or after this ISO date/time"),
+    until: str = typer.Option(None, "--until", help="Only events up to this ISO date/time (a bare date includes the whole day)"),
+    limit: int = typer.Option(None, "--limit", "-n", min=1, help="Only the most recent N matching events"),
+    add: str = typer.Option(None, "--add", help="Append a note to the event log"),
+    record: bool = typer.Option(None, "--record/--no-record", help="Turn automatic create/delete/edit events on or off"),
+):
+    """
+    Show what happened in a project between two dates, from its append-only event log.
+    """
+    _require_files("timeline")
+    project_path = Path("projects_data") / project
     if not project_path.exists():
         typer.echo(f"❌ Project '{project}' does not exist.")
         raise typer.Exit(code=1)
 
-    if type:
-        type_path = project_path / type
-        if not type_path.exists():
-            typer.echo(f"❌ Context type '{type}' does not exist in project '{project}'.")
+    if record is not None:
+        events.set_recording(project_path, record)
+        typer.echo(f"🕒 Automatic events {'on' if record else 'off'} for '{project}'.")
+    if add:
+        event = events.append(project_path, "note", message=add)
+        typer.echo(f"🕒 Logged note at {event['time']}.")
+    if (record is not None or add) and not (since or until or limit):
+        return
+
+    try:
+        since_ns = events.parse_time(since) if since else None
+        until_ns = events.parse_time(until, end=True) if until else None
+    except ValueError as e:
+        typer.echo(f"❌ Invalid date: {e}")
+        raise typer.Exit(code=1)
+
+    found = events.query(project_path, since_ns, until_ns, limit)
+    with trace.span("output"):
+        if not found:
+            typer.echo(f"🕒 No events in '{project}' for that range.")
+            return
+        typer.echo(f"🕒 {len(found)} event(s) in '{project}':")
+        for event in found:
+            target = f"{event['type']}/{event['name']}" if event.get("type") else ""
+            detail = " ".join(part for part in (target, event.get("message", "")) if part)
+            typer.echo(f"  {event['time']}  {event['kind']:<7} {detail}")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: snapshot
+# Record the current version of every context file
+# ──────────────────────────────────────────────────────────────
+@app.command("snapshot")
+def snapshot(project: str, message: str = typer.Option(None, "--message", "-m", help="Describe the snapshot")):
+    """
+    Snapshot a project's context files (only what changed since the last snapshot is stored).
+    """
+    _require_files("snapshot")
+    from context_core import history
+
+    project_path = _project_path(project)
+    taken = history.History(project_path).take(message)
+    if taken is None:
+        typer.echo(f"📸 Nothing changed in '{project}' since the last snapshot.")
+        return
+    changes = taken["changes"]
+    typer.echo(f"📸 Snapshot {taken['id']} of '{project}': {len(changes['added'])} added, "
+               f"{len(changes['changed'])} changed, {len(changes['removed'])} removed.")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: history
+# List snapshots, or the versions of one file
+# ──────────────────────────────────────────────────────────────
+@app.command("history")
+def history_command(
+    project: str,
+    type: str = typer.Argument(None, help="Context type, to show one file's versions"),
+    name: str = typer.Argument(None, help="Context name, to show one file's versions"),
+):
+    """
+    List a project's snapshots, or the snapshots in which one context file changed.
+    """
+    _require_files("history")
+    from context_core import history
+
+    store = history.History(_project_path(project))
+    if type and name:
+        rel = f"{type}/{name}.md"
+        versions = store.file_history(rel)
+        if not versions:
+            typer.echo(f"📜 '{rel}' is in no snapshot of '{project}'.")
+            return
+        typer.echo(f"📜 Versions of '{rel}':")
+        for taken, digest in versions:
+            state = digest[:12] if digest else "(removed)"
+            typer.echo(f"  {taken['id']:>4}  {taken['time']}  {state}  {taken['message']}")
+        return
+
+    ids = store.ids()
+    if not ids:
+        typer.echo(f"📜 No snapshots of '{project}' yet. Take one with: context snapshot {project}")
+        return
+    typer.echo(f"📜 Snapshots of '{project}':")
+    for snapshot_id in ids:
+        taken = store.load(snapshot_id)
+        typer.echo(f"  {taken['id']:>4}  {taken['time']}  {len(taken['files'])} files  {taken['message']}")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: diff
+# Compare two snapshots, or a snapshot with the working files
+# ──────────────────────────────────────────────────────────────
+@app.command("diff")
+def diff(
+    project: str,
+    old: str = typer.Argument("latest", help="Snapshot id (default: latest)"),
+    new: str = typer.Argument(None, help="Snapshot id (default: the current files)"),
+    patch: bool = typer.Option(False, "--patch", "-p", help="Show line-by-line changes"),
+):
+    """
+    Show which context files were added, changed or removed between two snapshots.
+    """
+    _require_files("diff")
+    from context_core import history
+
+    project_path = _project_path(project)
+    try:
+        before, after, changes = history.diff(project_path, old, new)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+    if not any(changes.values()):
+        typer.echo("✅ No differences.")
+        return
+    store = history.History(project_path)
+    for mark, key in (("+", "added"), ("~", "changed"), ("-", "removed")):
+        for rel in changes[key]:
+            typer.echo(f"{mark} {rel}")
+            if not patch:
+                continue
+            old_data = store.version(before.get(rel))
+            if new is None and rel in after:
+                # Working files may not be in any snapshot yet, so read them directly
+                new_data = (project_path / rel).read_bytes()
+            else:
+                new_data = store.version(after.get(rel))
+            for line in history.patch(rel, old_data, new_data, old, new or "current"):
+                typer.echo(line, nl=not line.endswith("\n"))
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: rollback
+# Restore every context file to a snapshot
+# ──────────────────────────────────────────────────────────────
+@app.command("rollback")
+def rollback(project: str, snapshot_id: str, force: bool = typer.Option(False, "--force", help="Skip confirmation")):
+    """
+    Make a project's context files match a snapshot (the current state is snapshotted first).
+    """
+    _require_files("rollback")
+    from context_core import history
+
+    project_path = _project_path(project)
+    if not force:
+        confirm = typer.confirm(f"Roll '{project}' back to snapshot {snapshot_id}?")
+        if not confirm:
+            typer.echo("❎ Cancelled.")
             raise typer.Exit(code=1)
+    try:
+        target = history.rollback(project_path, snapshot_id)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+    changes = target["changes"]
+    typer.echo(f"⏪ Rolled '{project}' back to snapshot {target['id']}: "
+               f"{len(changes['added']) + len(changes['changed'])} restored, {len(changes['removed'])} moved to trash.")
 
-        files = sorted(type_path.glob("*.md"))
-        if not files:
-            typer.echo(f"📂 No context files found in '{type}/'")
-        else:
-            typer.echo(f"📂 {type}/")
-            for file in files:
-                typer.echo(f"  - {file.name}")
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: stats
+# Per-type file, byte and token totals of one or all projects
+# ──────────────────────────────────────────────────────────────
+@app.command("stats")
+def stats(
+    project: str = typer.Argument(None, help="Project to report on (default: all projects)"),
+    tokens: bool = typer.Option(False, "--tokens", help="Also report token counts (cached per file content)"),
+    tokenizer: str = typer.Option(None, "--tokenizer", help="Tokenizer: approx (default), words or tiktoken"),
+    workers: int = typer.Option(8, "--workers", "-j", help="Projects refreshed in parallel"),
+):
+    """
+    Show how many files, bytes and (with --tokens) tokens each context type holds.
+    """
+    _require_files("stats")
+    from context_core import scan
+
+    store = _store()
+    data_path = store.data_path
+
+    if project:
+        try:
+            store.project(project)
+        except operations.ContextError as e:
+            typer.echo(f"❌ {e}")
+            raise typer.Exit(code=1)
+        projects = [project]
     else:
-        found = False
-        for folder in sorted(project_path.iterdir()):
-            if folder.is_dir():
-                files = sorted(folder.glob("*.md"))
-                if files:
-                    found = True
-                    typer.echo(f"📂 {folder.name}/")
-                    for file in files:
-                        typer.echo(f"  - {file.name}")
+        projects = scan.projects(data_path)
+
+    if tokens:
+        from context_core import tokens as token_counts
+
+        try:
+            tokenizer, _ = token_counts.get_tokenizer(tokenizer)
+        except operations.ContextError as e:
+            typer.echo(f"❌ {e}")
+            raise typer.Exit(code=1)
+
+    def project_totals(project_path: Path) -> dict:
+        # One deep refresh serves both the byte and the token totals
+        folders = manifest.refresh(project_path, deep=True)["folders"]
+        totals = manifest.folder_totals(project_path, folders)
+        if tokens:
+            counted = token_counts.project_totals(project_path, tokenizer, folders)
+            # Packed archives have no loose file, so take their file count from the token totals
+            for folder, row in totals.items():
+                row["tokens"] = counted.get(folder, {}).get("tokens", 0)
+                row["files"] = max(row["files"], counted.get(folder, {}).get("files", 0))
+        return totals
+
+    # Projects are refreshed on a thread pool but reported in name order
+    grand = {"files": 0, "bytes": 0, "tokens": 0}
+    try:
+        for name, totals, error in scan.fan_out(data_path, project_totals, projects, workers, ordered=True):
+            if error:
+                typer.echo(f"❌ {name}: {error}")
+                continue
+            typer.echo(f"📊 {name}")
+            project_total = {"files": 0, "bytes": 0, "tokens": 0}
+            for folder, row in totals.items():
+                line = f"  {folder:<14}{row['files']:>7} file(s){row['bytes']:>12} bytes"
+                if tokens:
+                    line += f"{row['tokens']:>11} tokens"
+                typer.echo(line)
+                for key in project_total:
+                    project_total[key] += row.get(key, 0)
+            line = f"  {'total':<14}{project_total['files']:>7} file(s){project_total['bytes']:>12} bytes"
+            if tokens:
+                line += f"{project_total['tokens']:>11} tokens"
+            typer.echo(line)
+            for key in grand:
+                grand[key] += project_total[key]
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+    if len(projects) != 1:
+        summary = f"📊 {len(projects)} project(s): {grand['files']} file(s), {grand['bytes']} bytes"
+        if tokens:
+            summary += f", {grand['tokens']} tokens ({tokenizer})"
+        typer.echo(summary)
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: scan
+# Walk every project in parallel and stream per-project and per-type totals
+# ──────────────────────────────────────────────────────────────
+@app.command("scan")
+def scan_command(
+    type: str = typer.Option(None, "--type", "-t", help="Only scan this context type"),
+    workers: int = typer.Option(None, "--workers", "-j", help="Projects walked in parallel (default: 4 per CPU, max 32)"),
+    stale_days: float = typer.Option(None, "--stale-days", help="Only report projects unchanged for this many days"),
+    as_json: bool = typer.Option(False, "--json", help="Print one JSON object per project, then the totals"),
+):
+    """
+    Scan all projects at once; results are printed as each project finishes.
+    """
+    _require_files("scan")
+    import json
+    import time
+    from datetime import datetime
+
+    from context_core import scan
+
+    if type and type not in VALID_CONTEXT_TYPES:
+        typer.echo(f"❌ Invalid context type '{type}'.")
+        raise typer.Exit(code=1)
+
+    before_ns = time.time_ns() - int(stale_days * 86400 * 1e9) if stale_days is not None else None
+    totals = scan.Totals()
+    stale = 0
+    for result in scan.scan(Path("projects_data"), context_type=type, workers=workers or scan.DEFAULT_WORKERS):
+        totals.add(result)
+        if result["error"]:
+            typer.echo(f"❌ {result['project']}: {result['error']}", err=True)
+            continue
+        if before_ns is not None:
+            if not scan.is_stale(result["folders"], before_ns, type):
+                continue
+            stale += 1
+        if as_json:
+            typer.echo(json.dumps(result))
+            continue
+        rows = result["folders"].values()
+        newest = max((row["newest_ns"] for row in rows), default=0)
+        changed = datetime.fromtimestamp(newest / 1e9).strftime("%Y-%m-%d") if newest else "never"
+        typer.echo(
+            f"📁 {result['project']:<24}{sum(r['files'] for r in rows):>7} file(s)"
+            f"{sum(r['bytes'] for r in rows):>12} bytes  last change {changed}"
+        )
+
+    total = totals.total()
+    if as_json:
+        typer.echo(json.dumps({"projects": totals.projects, "failed": totals.failed, "stale": stale,
+                               "folders": totals.folders, **total}))
+        return
+    if totals.folders:
+        typer.echo("📊 Totals by type")
+        for folder, row in sorted(totals.folders.items()):
+            typer.echo(f"  {folder:<14}{row['files']:>7} file(s){row['bytes']:>12} bytes")
+    summary = f"📊 {totals.projects} project(s): {total['files']} file(s), {total['bytes']} bytes"
+    if before_ns is not None:
+        summary += f", {stale} unchanged for {stale_days:g} day(s)"
+    typer.echo(summary)
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: tier
+# Move files nobody has read or edited lately into cold storage
+# ──────────────────────────────────────────────────────────────
+@app.command("tier")
+def tier(
+    project: str = typer.Argument(None, help="Project to tier (default: all projects)"),
+    days: float = typer.Option(None, "--days", min=0.01, help="Cold after this many days unused (default: policy, else 30)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Only list what would move"),
+    auto: float = typer.Option(None, "--auto", min=0, help="Tier automatically (daily) after this many days; 0 turns it off"),
+    list_cold: bool = typer.Option(False, "--list", help="List the files in cold storage"),
+):
+    """
+    Move context files unused for a while into archives/.cold; they come back when next requested.
+    """
+    _require_files("tier")
+    from datetime import datetime
+
+    from context_core import scan, tiering
+
+    projects = [project] if project else scan.projects(Path("projects_data"))
+    if project:
+        _project_path(project)
+
+    for name in projects:
+        project_path = Path("projects_data") / name
+        if auto is not None:
+            tiering.set_policy(project_path, auto or None)
+            typer.echo(f"🧊 Automatic tiering for '{name}': {f'after {auto:g} day(s)' if auto else 'off'}.")
+            continue
+        if list_cold:
+            cold = tiering.cold_files(project_path)
+            typer.echo(f"🧊 {name}: {len(cold)} cold file(s)")
+            for path in cold:
+                typer.echo(f"  - {path}")
+            continue
+
+        found = tiering.apply(project_path, days, dry_run)
         if not found:
-            typer.echo(f"📦 No context files found in project '{project}'.")
+            reason = "" if tiering.has_history(project_path, days) else " (not enough access history yet)"
+            typer.echo(f"🧊 {name}: nothing to move{reason}.")
+            continue
+        typer.echo(f"🧊 {name}: {'would move' if dry_run else 'moved'} {len(found)} file(s) to cold storage")
+        for candidate in found:
+            used = datetime.fromtimestamp(candidate["last_used_ns"] / 1e9).strftime("%Y-%m-%d")
+            typer.echo(f"  - {candidate['path']}  (last used {used}, {candidate['reads']} read(s))")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: gc
+# Permanently reclaim trashed projects and files
+# ──────────────────────────────────────────────────────────────
+@app.command("gc")
+def gc(
+    everything: bool = typer.Option(False, "--all", help="Empty the whole trash, not just expired entries"),
+    older_than_days: float = typer.Option(None, "--older-than-days", min=0,
+                                          help="Retention window (default: CONTEXT_TRASH_DAYS or 7)"),
+    rate: float = typer.Option(None, "--rate", min=0.01, help="Delete at most this many MB per second"),
+    background: bool = typer.Option(False, "--background", help="Run detached and return immediately"),
+    list_only: bool = typer.Option(False, "--list", help="Only list what is in the trash"),
+):
+    """
+    Permanently delete trash entries past the retention window, optionally throttled.
+    """
+    store = _store()
+    if list_only:
+        found = store.trash()
+        if not found:
+            typer.echo("🗑️ Trash is empty.")
+        for info in found:
+            target = "/".join(info[key] for key in ("project", "type", "name") if info.get(key))
+            typer.echo(f"  {info.get('deleted', '?')}  {info.get('kind', '?'):<8} {target or '?'}")
+        return
+
+    if background:
+        import subprocess
+        import sys
+
+        args = [sys.executable, "-m", "context_core", "gc"]
+        if everything:
+            args.append("--all")
+        if older_than_days is not None:
+            args += ["--older-than-days", str(older_than_days)]
+        if rate is not None:
+            args += ["--rate", str(rate)]
+        process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL, start_new_session=True)
+        typer.echo(f"🧹 Collecting garbage in the background (pid {process.pid}).")
+        return
+
+    older_than = None if older_than_days is None else older_than_days * 86_400
+    result = store.collect_trash(older_than, everything, rate * 1024 * 1024 if rate else None)
+    typer.echo(f"🧹 Reclaimed {result['entries']} trash entr{'y' if result['entries'] == 1 else 'ies'}: "
+               f"{result['files']} files, {result['bytes'] / 1024:.1f} KB.")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: export-project
+# Stream a whole project into one compressed bundle
+# ──────────────────────────────────────────────────────────────
+@app.command("export-project")
+def export_project(
+    project: str,
+    output: Path = typer.Option(None, "--output", "-o", help="Bundle file to write (default: stdout)"),
+):
+    """
+    Write a project (meta.json, every folder, archives, history, indexes) as a .tar.gz bundle.
+    """
+    _require_files("export-project")
+    import sys
+    from context_core import bundle
+
+    if output is None and sys.stdout.isatty():
+        typer.echo("❌ Refusing to write a bundle to a terminal. Use --output or a pipe.", err=True)
+        raise typer.Exit(code=1)
+    try:
+        if output is None:
+            result = bundle.export_project(project, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+        else:
+            with open(output, "wb") as f:
+                result = bundle.export_project(project, f)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"📦 Exported '{project}': {result['files']} files, {result['bytes'] / 1024:.1f} KB.", err=True)
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: import-project
+# Unpack a bundle, writing only files whose content differs
+# ──────────────────────────────────────────────────────────────
+@app.command("import-project")
+def import_project(
+    file: Path = typer.Argument(None, help="Bundle file (default: stdin)"),
+    name: str = typer.Option(None, "--as", help="Import under a different project name"),
+):
+    """
+    Import a project bundle, verifying checksums and skipping files that are already identical.
+    """
+    _require_files("import-project")
+    import sys
+    from context_core import bundle
+
+    if file and not file.exists():
+        typer.echo(f"❌ File '{file}' does not exist.")
+        raise typer.Exit(code=1)
+    try:
+        if file is None:
+            result = bundle.import_project(sys.stdin.buffer, name=name)
+        else:
+            with open(file, "rb") as f:
+                result = bundle.import_project(f, name=name)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+    typer.echo(f"📦 Imported '{result['project']}': {result['written']} written "
+               f"({result['bytes'] / 1024:.1f} KB), {result['unchanged']} unchanged.")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: watch
+# Keep manifests and indexes in sync with out-of-band edits
+# ──────────────────────────────────────────────────────────────
+@app.command("watch")
+def watch(
+    poll: bool = typer.Option(False, "--poll", help="Poll file stats instead of using inotify"),
+    debounce: float = typer.Option(0.5, "--debounce", min=0.0, help="Seconds of quiet before applying a burst of changes"),
+    interval: float = typer.Option(1.0, "--interval", min=0.05, help="Seconds between polls (with --poll)"),
+):
+    """
+    Watch projects_data and update manifests, search, section and token indexes for changed files only.
+    """
+    _require_files("watch")
+    from context_core import watch as watcher
+
+    data_path = Path("projects_data")
+    data_path.mkdir(exist_ok=True)
+    source = watcher.open_watcher(data_path, poll, interval)
+    mode = "inotify" if isinstance(source, watcher.InotifyWatcher) else "polling"
+    typer.echo(f"👀 Watching {data_path} ({mode}). Press Ctrl-C to stop.")
+
+    def report(results):
+        for project, changed in results.items():
+            if changed:
+                typer.echo(f"🔄 {project}: {changed} file(s) re-indexed")
+
+    try:
+        watcher.watch(data_path, report, source, debounce=debounce, interval=interval)
+    except KeyboardInterrupt:
+        typer.echo("👋 Stopped watching.")
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: batch
+# Apply a JSONL stream of operations in a single process
+# ──────────────────────────────────────────────────────────────
+@app.command("batch")
+def batch(
+    file: Path = typer.Argument(None, help="JSONL file of operations (default: stdin)"),
+    atomic: bool = typer.Option(False, "--atomic", help="Roll back every change if any operation fails"),
+):
+    """
+    Run create/view/delete/list operations from JSONL, printing one JSON result per line.
+    """
+    import sys
+    from context_core.batch import run_batch
+
+    if file and not file.exists():
+        typer.echo(f"❌ File '{file}' does not exist.")
+        raise typer.Exit(code=1)
+
+    stream = open(file) if file else sys.stdin
+    failures = 0
+    try:
+        for result in run_batch(stream, atomic=atomic):
+            failures += not result["ok"]
+            typer.echo(json.dumps(result))
+    finally:
+        if file:
+            stream.close()
+
+    if failures:
+        raise typer.Exit(code=1)
+
+# ──────────────────────────────────────────────────────────────
+# CLI COMMAND: serve
+# Run a long-lived daemon answering operations over a Unix socket
+# ──────────────────────────────────────────────────────────────
+@app.command("serve")
+def serve(socket_path: Path = typer.Option(None, "--socket", help="Socket path (default: $CONTEXT_SOCKET or projects_data/.context.sock)")):
+    """
+    Serve context operations over a Unix socket, with file contents cached in memory.
+    Point other commands at it by exporting CONTEXT_SOCKET.
+    """
+    from context_core import daemon
+
+    socket_path = socket_path or Path(os.environ.get(daemon.SOCKET_ENV, daemon.DEFAULT_SOCKET))
+
+    try:
+        server = daemon.Server(socket_path)
+    except operations.ContextError as e:
+        typer.echo(f"❌ {e}")
+        raise typer.Exit(code=1)
+
+    # Stop cleanly (removing the socket) on SIGTERM as well as Ctrl+C
+    import signal
+
+    def _stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _stop)
+
+    typer.echo(f"🛰️ Serving on {socket_path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    typer.echo("👋 Daemon stopped.")
 
 @app.command("walkthrough")
 def walkthrough():
@@ -282,26 +1250,14 @@ def _run_walkthrough_interactive():
         else:
             break
 
-    base_path = Path("projects_data") / project
+    store = _store()
+    base_path = store.data_path / project
 
-    if base_path.exists():
-        typer.echo(f"⚠️ Project '{project}' already exists. Skipping init.")
-    else:
-        subfolders = [
-            "facts", "decisions", "goals",
-            "instructions", "actions", "summaries",
-            "archives", "personas", "timeline"
-        ]
-        for folder in subfolders:
-            (base_path / folder).mkdir(parents=True, exist_ok=True)
-        meta = {
-            "project": project,
-            "created": datetime.now().isoformat(),
-            "context_types": subfolders
-        }
-        with open(base_path / "meta.json", "w") as f:
-            json.dump(meta, f, indent=2)
+    try:
+        store.init_project(project)
         typer.echo(f"✅ Project '{project}' initialized.\n")
+    except operations.ContextExists:
+        typer.echo(f"⚠️ Project '{project}' already exists. Skipping init.")
 
     typer.echo("📂 Available context types:")
     for t in VALID_CONTEXT_TYPES:
@@ -315,16 +1271,16 @@ def _run_walkthrough_interactive():
     file_name = safe_prompt("📝 Context file name (without .md)")
 
     file_path = base_path / context_type / f"{file_name}.md"
-    if file_path.exists():
-        typer.echo(f"⚠️ File '{file_path}' already exists. Skipping create.")
-    else:
-        title = file_name.replace("-", " ").title()
-        content = f"# {title}\n\nCreated on {datetime.now().isoformat()}\n"
-        file_path.write_text(content)
+    try:
+        store.create(project, context_type, file_name)
         typer.echo(f"✅ Created file: {file_path}")
+    except operations.ContextExists:
+        typer.echo(f"⚠️ File '{file_path}' already exists. Skipping create.")
 
     open_now = typer.confirm("✏️ Do you want to open it now?", default=True)
-    if open_now:
+    if open_now and not store.files_backend:
+        _edit_in_storage(store, project, context_type, file_name)
+    elif open_now:
         editor = os.environ.get("EDITOR", "nano")
         subprocess.run([editor, str(file_path)])
 
@@ -0,0 +1,134 @@
+"""
+Low-overhead access accounting for context files.
+
+`view-context` and `load` call `record`, which only bumps an in-memory
+counter. Counters are appended to the project's `.cache/access.log` in
+batches: when FLUSH_EVERY reads are pending, FLUSH_INTERVAL seconds after
+the last flush, or when the process exits. A short CLI command therefore
+costs one append per project, and the daemon one append per batch.
+
+The log is plain text, one "LAST_NS COUNT TYPE/NAME.md" line per file and
+batch, after a "# since NS" header marking when accounting began. Readers
+sum it up; once it passes COMPACT_BYTES it is rewritten with one line per
+file.
+
+Flushing is also when a project's automatic tiering policy gets its
+(at most daily) chance to run; see tiering.py.
+"""
+import atexit
+import threading
+import time
+from pathlib import Path
+
+from context_core import fileio
+
+LOG_PATH = Path(".cache") / "access.log"
+FLUSH_EVERY = 256
+FLUSH_INTERVAL = 5.0
+COMPACT_BYTES = 1 << 20
+
+_pending = {}  # project path -> {"type/name.md": [count, last_ns]}
+_buffered = 0
+_last_flush = time.monotonic()
+_lock = threading.Lock()
+_registered = False
+
+
+def record(project_path: Path, path: str):
+    """
+    Count one read of `path` ("type/name.md"); written out with the next batch.
+    """
+    global _buffered, _registered
+    now = time.time_ns()
+    with _lock:
+        counter = _pending.setdefault(Path(project_path), {}).setdefault(path, [0, now])
+        counter[0] += 1
+        counter[1] = now
+        _buffered += 1
+        if not _registered:
+            atexit.register(flush)
+            _registered = True
+        due = _buffered >= FLUSH_EVERY or time.monotonic() - _last_flush >= FLUSH_INTERVAL
+    if due:
+        flush()
+
+
+def flush():
+    """Append every pending counter to its project's log."""
+    global _pending, _buffered, _last_flush
+    with _lock:
+        pending, _pending = _pending, {}
+        _buffered = 0
+        _last_flush = time.monotonic()
+    for project_path, counters in pending.items():
+        if not (project_path / "meta.json").exists():
+            continue  # deleted or moved to the trash meanwhile
+        lines = "".join(f"{last_ns} {count} {path}\n" for path, (count, last_ns) in sorted(counters.items()))
+        log_path = project_path / LOG_PATH
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with fileio.lock(log_path):
+            with open(log_path, "a") as f:
+                if f.tell() == 0:
+                    f.write(f"# since {time.time_ns()}\n")
+                f.write(lines)
+                size = f.tell()
+            if size > COMPACT_BYTES:
+                _compact(project_path)
+        _run_policy(project_path)
+
+
+def _run_policy(project_path: Path):
+    from context_core import tiering
+
+    try:
+        tiering.run_due(project_path)
+    except OSError:
+        pass  # retried with the next flush
+
+
+def _read(project_path: Path):
+    """Return (since_ns, {path: {"count", "last_ns"}}) from the log alone."""
+    since_ns = None
+    totals = {}
+    try:
+        with open(project_path / LOG_PATH) as f:
+            for line in f:
+                if line.startswith("# since "):
+                    since_ns = int(line.split()[2])
+                    continue
+                parts = line.rstrip("\n").split(" ", 2)
+                if not line.endswith("\n") or len(parts) != 3 or not parts[0].isdigit() or not parts[1].isdigit():
+                    continue  # torn trailing line
+                entry = totals.setdefault(parts[2], {"count": 0, "last_ns": 0})
+                entry["count"] += int(parts[1])
+                entry["last_ns"] = max(entry["last_ns"], int(parts[0]))
+    except FileNotFoundError:
+        pass
+    return since_ns, totals
+
+
+def _compact(project_path: Path):
+    since_ns, totals = _read(project_path)
+    header = f"# since {since_ns}\n" if since_ns is not None else ""
+    lines = "".join(f"{entry['last_ns']} {entry['count']} {path}\n" for path, entry in sorted(totals.items()))
+    fileio.atomic_write(project_path / LOG_PATH, header + lines, fsync=False)
+
+
+def counters(project_path: Path) -> dict:
+    """
+    Map each file read since accounting began to {"count", "last_ns"},
+    including reads not yet flushed by this process.
+    """
+    _, totals = _read(project_path)
+    with _lock:
+        pending = dict(_pending.get(Path(project_path), {}))
+    for path, (count, last_ns) in pending.items():
+        entry = totals.setdefault(path, {"count": 0, "last_ns": 0})
+        entry["count"] += count
+        entry["last_ns"] = max(entry["last_ns"], last_ns)
+    return totals
+
+
+def since(project_path: Path):
+    """When accounting began for the project (ns), or None if it never did."""
+    return _read(project_path)[0]
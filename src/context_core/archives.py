@@ -0,0 +1,201 @@
+"""
+Packed, compressed storage for the `archives/` context type.
+
+Conversation logs are appended as independently compressed blocks to
+segment files under `archives/.packs/`, with a small JSON index recording
+each archive's segment, offset, length and content hash (the sha256 the
+manifest would give the loose file, so caches keyed by it carry over). Reading one archive maps its
+segment and decompresses only its own block. Deleting drops the index entry;
+`compact` rewrites segments without the dead blocks and packs any loose
+`.md` files left in `archives/`.
+"""
+import hashlib
+import json
+import lzma
+import mmap
+import os
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from context_core import fileio
+
+PACK_DIR = ".packs"
+INDEX_NAME = "index.json"
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+CODECS = {
+    "zlib": (lambda data: zlib.compress(data, 9), zlib.decompress),
+    "lzma": (lzma.compress, lzma.decompress),
+}
+
+
+class ArchiveStore:
+    """Packed archives of one project."""
+
+    def __init__(self, project_path: Path):
+        self.folder = project_path / "archives"
+        self.pack_path = self.folder / PACK_DIR
+        self._index = None
+
+    # ── index ────────────────────────────────────────────────
+    @property
+    def index(self) -> dict:
+        if self._index is None:
+            try:
+                with open(self.pack_path / INDEX_NAME) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {"version": 1, "entries": {}}
+        return self._index
+
+    def _save_index(self):
+        fileio.atomic_write_json(self.pack_path / INDEX_NAME, self.index, fsync=True)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the index lock and start from the index as it is on disk, so
+        concurrent writers never drop each other's entries.
+        """
+        self.pack_path.mkdir(parents=True, exist_ok=True)
+        with fileio.lock(self.pack_path / INDEX_NAME):
+            self._index = None
+            yield
+
+    def _segments(self):
+        if not self.pack_path.exists():
+            return []
+        return sorted(p.name for p in self.pack_path.glob("segment-*.pack"))
+
+    @staticmethod
+    def _number(segment: str) -> int:
+        return int(segment[len("segment-"):-len(".pack")])
+
+    def _writable_segment(self, incoming: int, first_number: int = 1) -> Path:
+        """Return the last segment if `incoming` bytes still fit, else a new one."""
+        segments = [s for s in self._segments() if self._number(s) >= first_number]
+        if not segments:
+            return self.pack_path / f"segment-{first_number:06d}.pack"
+        last = self.pack_path / segments[-1]
+        if last.stat().st_size + incoming <= SEGMENT_MAX_BYTES:
+            return last
+        return self.pack_path / f"segment-{self._number(segments[-1]) + 1:06d}.pack"
+
+    # ── reading ──────────────────────────────────────────────
+    def names(self):
+        """Packed archive names, without the .md suffix."""
+        return sorted(self.index["entries"])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index["entries"]
+
+    def read_bytes(self, name: str) -> bytes:
+        entry = self.index["entries"][name]
+        with open(self.pack_path / entry["segment"], "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                block = mapped[entry["offset"]:entry["offset"] + entry["length"]]
+        return CODECS[entry["codec"]][1](block)
+
+    def read(self, name: str) -> str:
+        return self.read_bytes(name).decode("utf-8")
+
+    def content_hash(self, name: str) -> str:
+        """
+        The sha256 of an archive's text; entries packed before hashes were
+        recorded are read to compute it.
+        """
+        entry = self.index["entries"][name]
+        return entry.get("hash") or hashlib.sha256(self.read_bytes(name)).hexdigest()
+
+    # ── writing ──────────────────────────────────────────────
+    def _append_block(self, name: str, block: bytes, entry: dict, first_number: int = 1):
+        segment = self._writable_segment(len(block), first_number)
+        segment.parent.mkdir(parents=True, exist_ok=True)
+        with open(segment, "ab") as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        self.index["entries"][name] = dict(entry, segment=segment.name, offset=offset, length=len(block))
+
+    def append(self, name: str, text: str, codec: str = "zlib"):
+        """
+        Compress `text` and append it as archive `name`.
+        """
+        data = text.encode("utf-8")
+        block = CODECS[codec][0](data)
+        with self._locked():
+            if name in self:
+                raise FileExistsError(name)
+            self._append_block(name, block, {
+                "codec": codec,
+                "size": len(data),
+                "hash": hashlib.sha256(data).hexdigest(),
+                "archived": datetime.now().isoformat(),
+            })
+            self._save_index()
+
+    def delete(self, name: str):
+        with self._locked():
+            del self.index["entries"][name]
+            self._save_index()
+
+    def extract(self, name: str) -> Path:
+        """
+        Move a packed archive back to a loose `.md` file (e.g. to edit it).
+        """
+        file_path = self.folder / f"{name}.md"
+        with self._locked():
+            fileio.atomic_write(file_path, self.read_bytes(name))
+            self.delete(name)
+        return file_path
+
+    def compact(self, codec: str = "zlib") -> dict:
+        """
+        Pack loose archive files and rewrite segments without dead blocks.
+        """
+        with self._locked():
+            return self._compact(codec)
+
+    def _compact(self, codec: str) -> dict:
+        old_segments = self._segments()
+        live = self.index["entries"]
+        before = sum((self.pack_path / s).stat().st_size for s in old_segments)
+        first_number = self._number(old_segments[-1]) + 1 if old_segments else 1
+
+        # Write survivors and loose files into fresh segments, then swap the index
+        self.index["entries"] = {}
+        for name in sorted(live):
+            entry = live[name]
+            with open(self.pack_path / entry["segment"], "rb") as f:
+                f.seek(entry["offset"])
+                block = f.read(entry["length"])
+            if "hash" not in entry:
+                entry = dict(entry, hash=hashlib.sha256(CODECS[entry["codec"]][1](block)).hexdigest())
+            self._append_block(name, block, entry, first_number)
+
+        loose = sorted(self.folder.glob("*.md")) if self.folder.exists() else []
+        for file_path in loose:
+            data = file_path.read_bytes()
+            self._append_block(file_path.stem, CODECS[codec][0](data), {
+                "codec": codec,
+                "size": len(data),
+                "hash": hashlib.sha256(data).hexdigest(),
+                "archived": datetime.now().isoformat(),
+            }, first_number)
+
+        self._save_index()
+        for file_path in loose:
+            file_path.unlink()
+        for name in old_segments:
+            (self.pack_path / name).unlink()
+
+        after = sum((self.pack_path / s).stat().st_size for s in self._segments())
+        return {
+            "archives": len(self.index["entries"]),
+            "packed_files": len(loose),
+            "bytes_before": before,
+            "bytes_after": after,
+        }
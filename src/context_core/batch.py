@@ -0,0 +1,140 @@
+"""
+Batch execution of context operations from a JSONL stream.
+
+Each input line is one operation, using the same names and arguments as the
+daemon protocol:
+
+    {"op": "create-context", "project": "p", "type": "facts", "name": "x", "content": "..."}
+    {"op": "view-context", "project": "p", "type": "facts", "name": "x"}
+    {"op": "delete-context", "project": "p", "type": "facts", "name": "x"}
+
+Operations run through `operations.execute`, so validation matches the
+single commands. Manifest updates are deferred and done once per touched
+project at the end instead of once per file.
+"""
+import json
+import shutil
+from pathlib import Path
+
+from context_core import events, manifest, operations, storage, trash
+from context_core.constants import DATA_DIR
+
+WRITE_OPS = {"create-context", "delete-context"}
+
+
+def _parse(line: str):
+    request = json.loads(line)
+    if not isinstance(request, dict) or "op" not in request:
+        raise operations.ContextError("Each line must be a JSON object with an 'op' field.")
+    op = request.pop("op")
+    return op, request
+
+
+def _undo_for(op: str, args: dict, data_path: Path):
+    """
+    Capture what is needed to reverse a write before it happens.
+    """
+    if storage.selected() != "files":
+        return _undo_in_storage(op, args, storage.open_storage(data_path))
+    project, type, name = args.get("project"), args.get("type"), args.get("name")
+    if op == "create-context":
+        return lambda: _uncreate(data_path, project, type, name)
+    if op == "delete-context":
+        file_path = operations.context_path(project, type, name, data_path)
+        packed = None if file_path.exists() else operations.packed_archive(project, type, name, data_path)
+        if packed is None:
+            return lambda: _undelete(data_path, project, type, name, file_path)
+        entry = packed.index["entries"][name]
+        text = packed.read(name)
+
+        def repack():
+            packed.append(name, text, entry["codec"])
+            _undelete(data_path, project, type, name)
+
+        return repack
+    return None
+
+
+def _uncreate(data_path: Path, project: str, type: str, name: str):
+    operations.context_path(project, type, name, data_path).unlink(missing_ok=True)
+    events.retract(data_path / project, "create", type, name)
+
+
+def _undelete(data_path: Path, project: str, type: str, name: str, file_path: Path = None):
+    """
+    Take a deleted file back out of the trash (or, for a packed archive put
+    back in its store, just drop the trash entry) and retract its event.
+    """
+    entry = trash.find(data_path, "context", project, type, name)
+    if entry is not None:
+        if file_path is None:
+            shutil.rmtree(entry)
+        else:
+            trash.restore(entry, file_path)
+    events.retract(data_path / project, "delete", type, name)
+
+
+def _undo_in_storage(op: str, args: dict, store):
+    project, type, name = args.get("project"), args.get("type"), args.get("name")
+    if op == "create-context":
+        return lambda: store.delete(project, type, name)
+    if op == "delete-context":
+        try:
+            content = store.read(project, type, name)
+        except operations.ContextError:
+            return None
+        return lambda: store.create(project, type, name, content)
+    return None
+
+
+def run_batch(lines, atomic: bool = False, data_path: Path = DATA_DIR):
+    """
+    Execute JSONL operations and yield one result dict per non-empty line.
+
+    In atomic mode the first failure stops the batch and every change made
+    so far is rolled back; results are only yielded once the outcome is known.
+    """
+    results = []
+    undo_log = []
+    touched = set()
+    failed = False
+
+    for index, line in enumerate(lines):
+        if not line.strip():
+            continue
+        if failed and atomic:
+            results.append({"index": index, "ok": False, "error": "Skipped: batch aborted."})
+            continue
+
+        try:
+            op, args = _parse(line)
+            undo = _undo_for(op, args, data_path) if atomic else None
+            result = operations.execute(op, args, data_path, sync_manifest=False)
+        except (operations.ContextError, OSError, ValueError, KeyError, TypeError) as e:
+            message = f"Missing argument {e}." if isinstance(e, KeyError) else str(e)
+            outcome = {"index": index, "ok": False, "error": message}
+            failed = True
+        else:
+            outcome = {"index": index, "ok": True, "result": result}
+            if op in WRITE_OPS:
+                touched.add(args["project"])
+                if atomic:
+                    undo_log.append((outcome, undo))
+
+        if atomic:
+            results.append(outcome)
+        else:
+            yield outcome
+
+    if failed and atomic:
+        for outcome, undo in reversed(undo_log):
+            if undo:
+                undo()
+            outcome["rolled_back"] = True
+
+    for project in sorted(touched):
+        project_path = data_path / project
+        if project_path.exists():
+            manifest.refresh(project_path)
+
+    yield from results
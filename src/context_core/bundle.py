@@ -0,0 +1,170 @@
+"""
+Single-file project bundles for moving projects between machines.
+
+A bundle is a gzip-compressed tar stream of the project folder: meta.json,
+every type folder, packed archives, history and caches. Each file's sha256
+travels in its PAX header. Both directions stream, so memory stays bounded
+and bundles can be piped:
+
+    context export-project notes | ssh other context import-project
+
+Lock files, temporary files and the manifest (which records local mtimes
+and is rebuilt on import) are left out. Importing verifies every file
+against its checksum before it replaces anything, and over an existing
+project only writes files whose content differs.
+"""
+import hashlib
+import os
+import tarfile
+import tempfile
+from pathlib import Path, PurePosixPath
+
+from context_core import fileio, manifest, trace
+from context_core.constants import DATA_DIR
+from context_core.operations import ContextError, require_project
+
+CHECKSUM_KEY = "CONTEXT.sha256"
+BLOCK_SIZE = 1 << 20
+SPOOL_BYTES = 8 << 20
+
+
+def _skipped(rel: Path) -> bool:
+    return rel.name.endswith((".lock", ".tmp")) or rel == Path(manifest.MANIFEST_NAME)
+
+
+def _walk(project_path: Path):
+    """Yield every bundled file of a project, relative to it, in sorted order."""
+    for root, dirs, files in os.walk(project_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = Path(root) / name
+            rel = path.relative_to(project_path)
+            if not _skipped(rel) and path.is_file() and not path.is_symlink():
+                yield rel
+
+
+def export_project(project: str, stream, data_path: Path = DATA_DIR) -> dict:
+    """
+    Write `project` as a bundle to the binary `stream`. Returns {files, bytes}.
+    """
+    project_path = require_project(project, data_path)
+    files = total = 0
+    with tarfile.open(fileobj=stream, mode="w|gz", format=tarfile.PAX_FORMAT) as tar:
+        for rel in _walk(project_path):
+            path = project_path / rel
+            # Spool each file once so its checksum, size and content agree even if it changes meanwhile
+            with tempfile.SpooledTemporaryFile(SPOOL_BYTES) as spool, open(path, "rb") as f:
+                digest = hashlib.sha256()
+                for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+                    digest.update(block)
+                    spool.write(block)
+                info = tarfile.TarInfo(f"{project}/{rel.as_posix()}")
+                info.size = spool.tell()
+                info.mtime = int(os.fstat(f.fileno()).st_mtime)
+                info.mode = 0o644
+                info.pax_headers = {CHECKSUM_KEY: digest.hexdigest()}
+                spool.seek(0)
+                tar.addfile(info, spool)
+            files += 1
+            total += info.size
+            trace.count("bytes_read", info.size)
+    return {"files": files, "bytes": total}
+
+
+def _target(member: tarfile.TarInfo, root: str):
+    """
+    Return the member's path inside the project, refusing anything that could
+    land outside it.
+    """
+    path = PurePosixPath(member.name)
+    if path.is_absolute() or ".." in path.parts or len(path.parts) < 2 or path.parts[0] != root:
+        raise ContextError(f"Bundle entry '{member.name}' is outside the project.")
+    return Path(*path.parts[1:])
+
+
+def _same_content(path: Path, size: int, digest: str) -> bool:
+    try:
+        if path.stat().st_size != size:
+            return False
+    except FileNotFoundError:
+        return False
+    return manifest.hash_file(path) == digest
+
+
+def import_project(stream, data_path: Path = DATA_DIR, name: str = None) -> dict:
+    """
+    Read a bundle from the binary `stream` into `data_path`, as `name` if given.
+
+    Returns {project, written, unchanged, bytes}.
+    """
+    stats = {"project": name, "written": 0, "unchanged": 0, "bytes": 0}
+    root = None
+    project_path = None
+    try:
+        tar = tarfile.open(fileobj=stream, mode="r|gz")
+    except (tarfile.TarError, OSError) as e:
+        raise ContextError(f"Not a project bundle: {e}")
+
+    with tar:
+        try:
+            for member in tar:
+                if root is None:
+                    root = PurePosixPath(member.name).parts[0]
+                    stats["project"] = name = name or root
+                    if name.startswith(".") or "/" in name:
+                        raise ContextError(f"'{name}' is not a valid project name.")
+                    project_path = data_path / name
+                    project_path.mkdir(parents=True, exist_ok=True)
+                if not member.isfile():
+                    if member.isdir():
+                        continue
+                    raise ContextError(f"Bundle entry '{member.name}' is not a regular file.")
+
+                rel = _target(member, root)
+                digest = member.pax_headers.get(CHECKSUM_KEY)
+                if digest is None:
+                    raise ContextError(f"Bundle entry '{member.name}' has no checksum.")
+                if _skipped(rel):
+                    continue
+                path = project_path / rel
+                if _same_content(path, member.size, digest):
+                    stats["unchanged"] += 1
+                    continue
+
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _write_verified(tar.extractfile(member), path, digest, member.name)
+                stats["written"] += 1
+                stats["bytes"] += member.size
+        except (tarfile.TarError, EOFError, OSError) as e:
+            raise ContextError(f"Bundle is corrupt or truncated: {e}")
+
+    if project_path is None:
+        raise ContextError("Bundle is empty.")
+    manifest.refresh(project_path, deep=True)
+    return stats
+
+
+def _write_verified(source, path: Path, digest: str, label: str):
+    """
+    Stream one member to a temporary file and move it into place only if its
+    checksum matches.
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        check = hashlib.sha256()
+        with os.fdopen(fd, "wb") as f:
+            for block in iter(lambda: source.read(BLOCK_SIZE), b""):
+                check.update(block)
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        if check.hexdigest() != digest:
+            raise ContextError(f"Checksum mismatch for '{label}'.")
+        with fileio.lock(path):
+            os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+# Root folder holding one sub-folder per project
+DATA_DIR = Path("projects_data")
+
+VALID_CONTEXT_TYPES = [
+    "facts", "decisions", "goals",
+    "instructions", "actions", "summaries",
+    "archives", "personas", "timeline"
+]
+
+# Default order in which `load` emits context types: guidance and durable
+# knowledge first, volatile logs last, so a tight budget keeps what matters.
+DEFAULT_LOAD_PRIORITY = [
+    "instructions", "personas", "facts",
+    "goals", "decisions", "actions",
+    "summaries", "timeline", "archives"
+]
+
+# Types that rarely change. `load --cache-friendly` emits them first, so the
+# start of the prompt stays byte-identical between requests.
+STABLE_CONTEXT_TYPES = ["instructions", "personas", "facts"]
@@ -0,0 +1,97 @@
+"""
+Long-lived local daemon answering context operations over a Unix socket.
+
+The protocol is one JSON object per line in each direction:
+
+    -> {"op": "view-context", "args": {"project": "p", "type": "facts", "name": "x"}}
+    <- {"ok": true, "result": "# X\\n..."}
+    <- {"ok": false, "error": "File '...' does not exist.", "kind": "ContextError"}
+
+File contents are kept in memory and revalidated with a stat on every read,
+so edits made behind the daemon's back are picked up immediately.
+"""
+import json
+import os
+import socket
+import socketserver
+from pathlib import Path
+
+from context_core import operations
+from context_core.constants import DATA_DIR
+from context_core.store import ContentCache
+
+SOCKET_ENV = "CONTEXT_SOCKET"
+DEFAULT_SOCKET = DATA_DIR / ".context.sock"
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                result = operations.execute(request["op"], request.get("args", {}), self.server.data_path, self.server.cache)
+                response = {"ok": True, "result": result}
+            except operations.ContextError as e:
+                response = {"ok": False, "error": str(e), "kind": type(e).__name__}
+            except Exception as e:
+                response = {"ok": False, "error": f"Daemon error: {e!r}", "kind": "ContextError"}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            self.wfile.flush()
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, data_path: Path = DATA_DIR):
+        self.data_path = data_path
+        self.cache = ContentCache()
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            if _is_alive(socket_path):
+                raise operations.ContextError(f"A daemon is already listening on '{socket_path}'.")
+            socket_path.unlink()
+        super().__init__(str(socket_path), _RequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        Path(self.server_address).unlink(missing_ok=True)
+
+
+def _is_alive(socket_path: Path) -> bool:
+    try:
+        request(socket_path, "ping")
+        return True
+    except OSError:
+        return False
+
+
+def request(socket_path: Path, op: str, **args):
+    """
+    Send one operation to a running daemon and return its result.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps({"op": op, "args": args}) + "\n").encode())
+        with sock.makefile("rb") as f:
+            response = json.loads(f.readline())
+
+    if not response["ok"]:
+        error = getattr(operations, response.get("kind", ""), operations.ContextError)
+        if not (isinstance(error, type) and issubclass(error, operations.ContextError)):
+            error = operations.ContextError
+        raise error(response["error"])
+    return response["result"]
+
+
+def forward(op: str, **args):
+    """
+    Run an operation on the daemon named by $CONTEXT_SOCKET, or in-process if
+    none is configured or reachable.
+    """
+    socket_path = os.environ.get(SOCKET_ENV)
+    if socket_path:
+        try:
+            return request(Path(socket_path), op, **args)
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+    return operations.execute(op, args)
@@ -0,0 +1,290 @@
+"""
+Near-duplicate paragraphs across a project, found with MinHash and LSH.
+
+Each context file is split into units: paragraphs, and every list item on
+its own, since copied bullet points are the usual culprit. Headings and
+units under MIN_WORDS words are ignored. A unit's word 3-grams are hashed
+and summarised by a NUM_PERM-value MinHash signature; the share of equal
+values between two signatures estimates the Jaccard similarity of their
+shingle sets.
+
+Signatures are cached per file content hash under `.cache/minhash.json`,
+so only edited files are shingled again. Candidate pairs come from LSH
+banding (BANDS bands of ROWS values: units sharing any band land in the
+same bucket), which keeps the search close to linear in the number of
+units; candidates are then confirmed against `threshold`.
+
+Signatures are computed with NumPy when it is installed, in pure Python
+otherwise; both give the same values.
+"""
+import base64
+import hashlib
+import json
+import random
+import re
+import struct
+from itertools import chain
+from pathlib import Path
+
+from context_core import fileio, manifest, trace
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+CACHE_PATH = Path(".cache") / "minhash.json"
+CACHE_VERSION = 1
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+MIN_WORDS = 5
+DEFAULT_THRESHOLD = 0.8
+# Units in one bucket a new unit is checked against, so boilerplate repeated
+# thousands of times cannot make the search quadratic
+BUCKET_PROBES = 8
+
+# h(x) = (a * x + b) mod P per permutation; a, b < 2**29 and x < 2**32 keep
+# a * x + b below 2**62, so NumPy's uint64 arithmetic cannot overflow
+_P = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_A = [_rng.randrange(1, 1 << 29) for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, 1 << 29) for _ in range(NUM_PERM)]
+_MASK = 0xFFFFFFFF
+_SIGNATURE = struct.Struct(f"<{NUM_PERM}I")
+
+WORD_RE = re.compile(r"\w+")
+LIST_ITEM_RE = re.compile(r" {0,3}(?:[-*+]|\d+[.)])\s")
+
+
+def split_units(lines) -> list:
+    """
+    Return the (start, end) line ranges of the units of a file's lines:
+    paragraphs, with every list item as a unit of its own. Headings and
+    blank lines belong to no unit.
+    """
+    units = []
+    start = None
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        boundary = not stripped or stripped.startswith("#") or LIST_ITEM_RE.match(line)
+        if boundary and start is not None:
+            units.append((start, index))
+            start = None
+        if stripped and not stripped.startswith("#") and start is None:
+            start = index
+    if start is not None:
+        units.append((start, len(lines)))
+    return units
+
+
+def shingles(text: str) -> list:
+    """
+    32-bit hashes of the unit's distinct word 3-grams, or None if it is too
+    short to compare.
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    grams = {" ".join(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+    return [int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in sorted(grams)]
+
+
+def signatures(shingle_sets) -> list:
+    """
+    MinHash signatures (tuples of NUM_PERM ints) for lists of shingle hashes.
+    """
+    if not shingle_sets:
+        return []
+    if np is None:
+        return [
+            tuple(min((a * x + b) % _P for x in hashes) & _MASK for a, b in zip(_A, _B))
+            for hashes in shingle_sets
+        ]
+    lengths = [len(hashes) for hashes in shingle_sets]
+    flat = np.fromiter(chain.from_iterable(shingle_sets), dtype=np.uint64, count=sum(lengths))
+    starts = np.concatenate(([0], np.cumsum(lengths[:-1]))).astype(np.intp)
+    a = np.array(_A, dtype=np.uint64)[:, None]
+    b = np.array(_B, dtype=np.uint64)[:, None]
+    values = (a * flat + b) % np.uint64(_P)
+    mins = np.minimum.reduceat(values, starts, axis=1) & np.uint64(_MASK)
+    return [tuple(int(v) for v in column) for column in mins.T]
+
+
+def similarity(first, second) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+def file_units(text: str) -> list:
+    """
+    [(line, end, chars, signature)] for the comparable units of a file;
+    `line` is 1-based and `end` the last line of the unit.
+    """
+    # Split on "\n" only, as reading the file line by line does
+    lines = text.split("\n")
+    found, sets = [], []
+    for start, end in split_units(lines):
+        unit = "\n".join(lines[start:end])
+        hashes = shingles(unit)
+        if hashes:
+            found.append((start + 1, end, len(unit)))
+            sets.append(hashes)
+    return [(line, end, chars, sig) for (line, end, chars), sig in zip(found, signatures(sets))]
+
+
+class SignatureCache:
+    """File content hash -> the file's units and signatures."""
+
+    def __init__(self, project_path: Path):
+        self.path = project_path / CACHE_PATH
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        valid = data.get("version") == CACHE_VERSION and data.get("num_perm") == NUM_PERM
+        self.files = data.get("files", {}) if valid else {}
+
+    def get(self, key: str):
+        units = self.files.get(key)
+        if units is None:
+            return None
+        return [(line, end, chars, _SIGNATURE.unpack(base64.b64decode(sig))) for line, end, chars, sig in units]
+
+    def put(self, key: str, units):
+        self.files[key] = [
+            [line, end, chars, base64.b64encode(_SIGNATURE.pack(*sig)).decode()] for line, end, chars, sig in units
+        ]
+        self.dirty = True
+
+    def keep(self, keys):
+        """Forget files whose content is no longer in the project."""
+        stale = set(self.files) - set(keys)
+        for key in stale:
+            del self.files[key]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fileio.atomic_write_json(self.path, {"version": CACHE_VERSION, "num_perm": NUM_PERM, "files": self.files})
+        self.dirty = False
+
+
+def project_units(project_path: Path, types=None) -> list:
+    """
+    [(path, line, end, chars, signature)] for every unit of the project's
+    loose context files (or only those of `types`), by path then line.
+    """
+    cache = SignatureCache(project_path)
+    folders = manifest.refresh(project_path, deep=True)["folders"]
+    units = []
+    with trace.span("dedup"):
+        for folder, record in sorted(folders.items()):
+            if types and folder not in types:
+                continue
+            for name, entry in sorted(record["files"].items()):
+                found = cache.get(entry["hash"])
+                if found is None:
+                    trace.count("files_read")
+                    text = (project_path / entry["path"]).read_text(encoding="utf-8", errors="replace")
+                    found = file_units(text)
+                    cache.put(entry["hash"], found)
+                units.extend((entry["path"], *unit) for unit in found)
+    cache.keep(entry["hash"] for record in folders.values() for entry in record["files"].values())
+    cache.save()
+    return units
+
+
+def clusters(units, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Group near-duplicate units: lists of indexes into `units`, each sorted,
+    largest groups first.
+    """
+    parent = list(range(len(units)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets = {}
+    for index, unit in enumerate(units):
+        sig = unit[-1]
+        for band in range(BANDS):
+            members = buckets.setdefault((band, sig[band * ROWS:(band + 1) * ROWS]), [])
+            for other in members[:BUCKET_PROBES]:
+                if root(other) != root(index) and similarity(units[other][-1], sig) >= threshold:
+                    parent[root(index)] = root(other)
+                    break
+            members.append(index)
+
+    groups = {}
+    for index in range(len(units)):
+        groups.setdefault(root(index), []).append(index)
+    found = [sorted(group) for group in groups.values() if len(group) > 1]
+    return sorted(found, key=lambda group: (-len(group), group[0]))
+
+
+def report(project_path: Path, types=None, threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """
+    Return {"units", "clusters", "duplicates", "tokens"}: each cluster lists
+    its copies ({path, line, end, chars}) and the tokens the extra copies cost.
+    """
+    from context_core.loader import CHARS_PER_TOKEN
+
+    units = project_units(project_path, types)
+    found = []
+    for group in clusters(units, threshold):
+        copies = [dict(zip(("path", "line", "end", "chars"), units[i][:4])) for i in group]
+        extra = sum(copy["chars"] for copy in copies[1:])
+        found.append({"copies": copies, "tokens": (extra + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN})
+    return {
+        "units": len(units),
+        "clusters": found,
+        "duplicates": sum(len(cluster["copies"]) - 1 for cluster in found),
+        "tokens": sum(cluster["tokens"] for cluster in found),
+    }
+
+
+def collapse_plan(project_path: Path, paths, threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """
+    For files emitted in the order of `paths` ("type/name.md"), map each
+    path to {first line: (last line, "path:line" of the copy kept)} for the
+    units that repeat one emitted earlier.
+    """
+    position = {path: index for index, path in enumerate(paths)}
+    types = {path.split("/", 1)[0] for path in paths}
+    units = [unit for unit in project_units(project_path, types) if unit[0] in position]
+    plan = {}
+    for group in clusters(units, threshold):
+        ordered = sorted(group, key=lambda i: (position[units[i][0]], units[i][1]))
+        kept = units[ordered[0]]
+        for i in ordered[1:]:
+            path, line, end = units[i][:3]
+            plan.setdefault(path, {})[line] = (end, f"{kept[0]}:{kept[1]}")
+    return plan
+
+
+def collapse(lines, drops: dict):
+    """
+    Yield a file's lines with each unit in `drops` (see collapse_plan)
+    replaced by a one-line pointer to the copy kept.
+    """
+    lines = list(lines)
+    index = 0
+    while index < len(lines):
+        dropped = drops.get(index + 1)
+        if dropped is None:
+            yield lines[index]
+            index += 1
+            continue
+        end, kept = dropped
+        yield f"[near-duplicate of {kept}]\n"
+        index = end
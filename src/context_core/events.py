@@ -0,0 +1,208 @@
+"""
+Append-only event log behind the `timeline/` context type.
+
+Events live in `timeline/.log/`:
+
+- `events.jsonl`: one JSON object per event, appended, never rewritten
+- `events.idx`: one fixed-size record per event, (timestamp ns, byte offset
+  of its line), in timestamp order
+
+A time-range query binary-searches the index for its first and last record,
+then reads just that slice of the log, so its cost depends on the number of
+matching events rather than on the length of the history.
+
+Projects can opt in (`"record_events": true` in meta.json, set with
+`context timeline PROJECT --record`) to have every create, delete and edit of
+a context file appended automatically.
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+from context_core import fileio, manifest
+
+LOG_DIR = Path("timeline") / ".log"
+LOG_NAME = "events.jsonl"
+INDEX_NAME = "events.idx"
+RECORD = struct.Struct("<qQ")
+
+
+class _Timestamps:
+    """Read-only sequence view of the timestamps in a mapped index."""
+
+    def __init__(self, mapped):
+        self.mapped = mapped
+
+    def __len__(self):
+        return len(self.mapped) // RECORD.size
+
+    def __getitem__(self, i):
+        return RECORD.unpack_from(self.mapped, i * RECORD.size)[0]
+
+
+def _log_path(project_path: Path) -> Path:
+    return project_path / LOG_DIR
+
+
+def append(project_path: Path, kind: str, message: str = None, type: str = None, name: str = None,
+           when_ns: int = None) -> dict:
+    """
+    Append one event and return it.
+
+    Timestamps never go backwards in the index: an event stamped earlier
+    than the last one (clock skew, concurrent writers) is stored at the last
+    event's time.
+    """
+    log_path = _log_path(project_path)
+    log_path.mkdir(parents=True, exist_ok=True)
+    index_path = log_path / INDEX_NAME
+
+    with fileio.lock(index_path):
+        ts = time.time_ns() if when_ns is None else when_ns
+        with open(index_path, "ab+") as index:
+            size = index.seek(0, os.SEEK_END)
+            size -= size % RECORD.size  # ignore a torn trailing record
+            if size:
+                index.seek(size - RECORD.size)
+                ts = max(ts, RECORD.unpack(index.read(RECORD.size))[0])
+
+            event = {"time": datetime.fromtimestamp(ts / 1e9).isoformat(timespec="seconds"), "kind": kind}
+            if type:
+                event["type"] = type
+            if name:
+                event["name"] = name
+            if message:
+                event["message"] = message
+
+            with open(log_path / LOG_NAME, "ab") as log:
+                offset = log.seek(0, os.SEEK_END)
+                log.write(json.dumps(event).encode("utf-8") + b"\n")
+                log.flush()
+                os.fsync(log.fileno())
+
+            index.truncate(size)
+            index.seek(size)
+            index.write(RECORD.pack(ts, offset))
+            index.flush()
+            os.fsync(index.fileno())
+    return event
+
+
+def query(project_path: Path, since_ns: int = None, until_ns: int = None, limit: int = None):
+    """
+    Return the events with since_ns <= timestamp < until_ns, oldest first.
+    With `limit`, only the most recent `limit` of them.
+    """
+    log_path = _log_path(project_path)
+    try:
+        index = open(log_path / INDEX_NAME, "rb")
+    except FileNotFoundError:
+        return []
+
+    with index:
+        if os.fstat(index.fileno()).st_size < RECORD.size:
+            return []
+        with mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            stamps = _Timestamps(mapped)
+            first = 0 if since_ns is None else bisect.bisect_left(stamps, since_ns)
+            last = len(stamps) if until_ns is None else bisect.bisect_left(stamps, until_ns)
+            if limit is not None:
+                first = max(first, last - limit)
+            if first >= last:
+                return []
+            offsets = [RECORD.unpack_from(mapped, i * RECORD.size)[1] for i in range(first, last)]
+            end = RECORD.unpack_from(mapped, last * RECORD.size)[1] if last < len(stamps) else None
+
+    # Parse each event at its indexed offset: a writer that died between
+    # appending a line and indexing it leaves an unindexed line in the slice
+    start = offsets[0]
+    with open(log_path / LOG_NAME, "rb") as log:
+        log.seek(start)
+        data = log.read() if end is None else log.read(end - start)
+    found = []
+    for offset in offsets:
+        line_end = data.find(b"\n", offset - start)
+        found.append(json.loads(data[offset - start:line_end if line_end >= 0 else None]))
+    return found
+
+
+def retract(project_path: Path, kind: str, type: str = None, name: str = None) -> bool:
+    """
+    Drop the newest event if it is a `kind` event for type/name, as when a
+    batch rolls back the change that recorded it. Returns whether it did.
+    """
+    log_path = _log_path(project_path)
+    index_path = log_path / INDEX_NAME
+    if not index_path.exists():
+        return False
+
+    with fileio.lock(index_path):
+        with open(index_path, "rb+") as index:
+            size = index.seek(0, os.SEEK_END)
+            size -= size % RECORD.size
+            if not size:
+                return False
+            index.seek(size - RECORD.size)
+            offset = RECORD.unpack(index.read(RECORD.size))[1]
+            with open(log_path / LOG_NAME, "rb+") as log:
+                log.seek(offset)
+                try:
+                    event = json.loads(log.readline())
+                except ValueError:
+                    return False
+                if (event.get("kind"), event.get("type"), event.get("name")) != (kind, type, name):
+                    return False
+                log.truncate(offset)
+                log.flush()
+                os.fsync(log.fileno())
+            index.truncate(size - RECORD.size)
+            index.flush()
+            os.fsync(index.fileno())
+    return True
+
+
+def parse_time(text: str, end: bool = False) -> int:
+    """
+    Parse an ISO date or datetime (local time) into ns since the epoch.
+
+    With `end`, a bare date means the end of that day, so `--until 2025-05-22`
+    includes the whole day.
+    """
+    moment = datetime.fromisoformat(text)
+    ns = int(moment.timestamp() * 1e9)
+    if end and len(text) <= len("2025-05-22"):
+        ns += 86_400 * 10**9
+    return ns
+
+
+# ── automatic recording ─────────────────────────────────────
+def recording(project_path: Path) -> bool:
+    try:
+        with open(project_path / "meta.json") as f:
+            return bool(json.load(f).get("record_events"))
+    except (OSError, ValueError):
+        return False
+
+
+def set_recording(project_path: Path, enabled: bool):
+    with manifest.project_lock(project_path):
+        try:
+            with open(project_path / "meta.json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"project": project_path.name}
+        meta["record_events"] = enabled
+        fileio.atomic_write(project_path / "meta.json", json.dumps(meta, indent=2))
+
+
+def record(project_path: Path, kind: str, type: str, name: str):
+    """
+    Append a create/delete/edit event if the project records them.
+    """
+    if recording(project_path):
+        append(project_path, kind, type=type, name=name)
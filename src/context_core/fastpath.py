@@ -0,0 +1,227 @@
+"""
+Fast entry point for the `context` command.
+
+Importing Typer (and with it Click and Rich) costs well over 100ms, which
+dominates short scripted invocations. The plain positional forms of the most
+common read commands are handled here with the standard library only.
+Anything else (options, --help, usage errors, interactive prompts, the editor
+or the pager) falls through to the full Typer app in `__main__`.
+"""
+import os
+import sys
+import time
+
+_STARTED = time.perf_counter()
+
+from context_core import operations, trace  # noqa: E402
+from context_core.constants import DATA_DIR, VALID_CONTEXT_TYPES  # noqa: E402
+
+
+def render_listing(project: str, type, folders: dict):
+    """
+    Yield the lines `list-contexts` prints for a folder -> files mapping.
+    """
+    if type:
+        files = folders[type]
+        if not files:
+            yield f"📂 No context files found in '{type}/'"
+        else:
+            yield f"📂 {type}/"
+            for file in files:
+                yield f"  - {file}"
+        return
+
+    found = False
+    for folder, files in folders.items():
+        if files:
+            found = True
+            yield f"📂 {folder}/"
+            for file in files:
+                yield f"  - {file}"
+    if not found:
+        yield f"📦 No context files found in project '{project}'."
+
+
+def render_search(query: str, results: list):
+    """
+    Yield the lines `search` prints for a list of ranked results.
+    """
+    if not results:
+        yield f"🔎 No matches for '{query}'."
+        return
+
+    yield f"🔎 {len(results)} result(s) for '{query}':"
+    for r in results:
+        yield f"  {r['project']}/{r['type']}/{r['file']}:{r['line']}  (score {r['score']:.2f})"
+        yield f"      {r['snippet']}"
+
+
+def run_operation(op: str, **args):
+    """
+    Run an operation in-process, or on the daemon if CONTEXT_SOCKET is set.
+    """
+    if os.environ.get("CONTEXT_SOCKET"):
+        from context_core import daemon
+
+        return daemon.forward(op, **args)
+
+    return operations.execute(op, args)
+
+
+def view_blocks(project: str, type: str, name: str, section: str = None, byte_range: str = None):
+    """
+    Return the text of a context file (or section/byte range) as an iterable
+    of blocks: streamed from disk, or in one piece from the daemon.
+    """
+    if os.environ.get("CONTEXT_SOCKET") or os.environ.get("CONTEXT_STORAGE", "files") != "files":
+        return [run_operation("view-context", project=project, type=type, name=name,
+                              section=section, range=byte_range)]
+    return operations.stream_context(project, type, name, section, byte_range)
+
+
+def _positional(args, *counts):
+    """Return `args` if they are plain positionals of an accepted count."""
+    if len(args) in counts and not any(a.startswith("-") for a in args):
+        return args
+    return None
+
+
+def _hello(args):
+    if args:
+        return None
+    with trace.span("output"):
+        print("👋 Hello from Context Utility!")
+    return 0
+
+
+def _list_contexts(args):
+    if not _positional(args, 1, 2):
+        return None
+    project, type = args[0], (args[1] if len(args) == 2 else None)
+    folders = run_operation("list-contexts", project=project, type=type)
+    with trace.span("output"):
+        print("\n".join(render_listing(project, type, folders)))
+    return 0
+
+
+def _view_context(args):
+    if not _positional(args, 3):
+        return None
+    blocks = view_blocks(*args)
+    with trace.span("output"):
+        sys.stdout.writelines(blocks)
+        sys.stdout.write("\n")
+    return 0
+
+
+def _search(args):
+    if not _positional(args, 1):
+        return None
+    query = args[0]
+    results = run_operation("search", query=query, limit=10) if DATA_DIR.exists() else []
+    with trace.span("output"):
+        print("\n".join(render_search(query, results)))
+    return 0
+
+
+def _parse_load(args):
+    """
+    Parse `load` options, or return None if anything needs Typer's parser.
+    """
+    options = {"project": None, "types": [], "max_tokens": None, "priority": []}
+    it = iter(args)
+    for arg in it:
+        if arg in ("--project", "-p"):
+            options["project"] = next(it, None)
+        elif arg == "--max-tokens":
+            value = next(it, "")
+            if not value.isdigit() or int(value) < 1:
+                return None
+            options["max_tokens"] = int(value)
+        elif arg == "--priority":
+            value = next(it, None)
+            if value is None:
+                return None
+            options["priority"] = [t.strip() for t in value.split(",") if t.strip()]
+        elif arg.startswith("--") and arg[2:] in VALID_CONTEXT_TYPES:
+            options["types"].append(arg[2:])
+        else:
+            return None
+    if not options["project"]:
+        return None
+    return options
+
+
+def _load(args):
+    options = _parse_load(args)
+    if options is None:
+        return None
+
+    for t in options["priority"]:
+        operations.require_type(t)
+    types = [t for t in VALID_CONTEXT_TYPES if t in options["types"]]
+
+    if os.environ.get("CONTEXT_SOCKET") or os.environ.get("CONTEXT_STORAGE", "files") != "files":
+        text = run_operation(
+            "load", project=options["project"], types=types,
+            max_tokens=options["max_tokens"], priority=options["priority"],
+        )
+        with trace.span("output"):
+            sys.stdout.write(text)
+        return 0
+
+    from context_core.loader import iter_context
+
+    project_path = operations.require_project(options["project"])
+    chunks = iter_context(project_path, types, options["max_tokens"], options["priority"])
+    with trace.span("output"):
+        sys.stdout.writelines(chunks)
+    return 0
+
+
+FAST_COMMANDS = {
+    "hello": _hello,
+    "list-contexts": _list_contexts,
+    "view-context": _view_context,
+    "search": _search,
+    "load": _load,
+}
+
+
+def main(argv=None):
+    """
+    Console entry point: try the fast path, otherwise hand over to Typer.
+
+    A leading `--profile` flag (or CONTEXT_TRACE) turns on tracing.
+    """
+    args = sys.argv[1:] if argv is None else list(argv)
+
+    destination = None
+    if args[:1] == ["--profile"]:
+        args, destination = args[1:], "stderr"
+
+    started = trace.start(destination, began=_STARTED)
+    trace.record("import", _STARTED, time.perf_counter())
+    try:
+        with trace.span("command"):
+            return _dispatch(args)
+    finally:
+        if started:
+            trace.finish()
+
+
+def _dispatch(args):
+    handler = FAST_COMMANDS.get(args[0]) if args else None
+    if handler:
+        try:
+            code = handler(args[1:])
+        except operations.ContextError as e:
+            print(f"❌ {e}")
+            return 1
+        if code is not None:
+            return code
+
+    with trace.span("import"):
+        from context_core.__main__ import app
+
+    return app(args=args)
@@ -0,0 +1,125 @@
+"""
+Crash- and concurrency-safe file writes.
+
+Every write goes to a uniquely named temporary file in the target's folder,
+is flushed to disk and then renamed over the target, so readers see either
+the old or the new content, never a torn file. `create=True` publishes with a
+hard link instead, which fails if the target already exists, so two agents
+creating the same context cannot both succeed.
+
+`lock(path)` takes an advisory `fcntl` lock on a hidden `.<name>.lock` file
+next to `path`. Locks are per file, so independent contexts are written in
+parallel; read-modify-write cycles on shared files (meta.json and the
+manifest, the archive index) hold the lock for their whole cycle. Locks are
+re-entrant within a thread.
+
+The lock file only exists while someone holds or waits for the lock: an
+exclusive holder unlinks it before unlocking, and a waiter that then gets
+the unlinked file starts over on a fresh one. Deleted, trashed or demoted
+files therefore leave no lock files behind.
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; writes stay atomic, just unlocked
+    fcntl = None
+
+_held = threading.local()
+
+
+def lock_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.lock")
+
+
+@contextmanager
+def lock(path: Path, shared: bool = False):
+    """
+    Hold an advisory lock for `path` (exclusive unless `shared`).
+    """
+    held = getattr(_held, "locks", None)
+    if held is None:
+        held = _held.locks = {}
+    key = os.path.abspath(lock_path(path))
+    if fcntl is None or key in held:
+        held[key] = held.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            held[key] -= 1
+            if not held[key]:
+                del held[key]
+        return
+
+    while True:
+        fd = os.open(key, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            if not _is_linked(fd, key):
+                continue  # the previous holder removed it; lock a fresh file
+            held[key] = 1
+            try:
+                yield
+            finally:
+                del held[key]
+                if not shared:
+                    try:
+                        os.unlink(key)
+                    except FileNotFoundError:
+                        pass  # its folder was moved meanwhile
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            return
+        finally:
+            os.close(fd)
+
+
+def _is_linked(fd: int, key: str) -> bool:
+    """Whether the open lock file `fd` is still the one at `key`."""
+    try:
+        st = os.stat(key)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(fd)
+    return (st.st_dev, st.st_ino) == (opened.st_dev, opened.st_ino)
+
+
+def atomic_write(path: Path, data, create: bool = False, fsync: bool = True):
+    """
+    Write `data` (str or bytes) to `path` atomically.
+
+    With `create`, raise FileExistsError instead of replacing an existing file.
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        if create:
+            os.link(tmp_name, path)
+            os.unlink(tmp_name)
+        else:
+            os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_json(path: Path, data, fsync: bool = False, **dump_options):
+    """
+    Atomically write `data` as JSON. Derived caches skip the fsync by default.
+    """
+    dump_options.setdefault("separators", (",", ":"))
+    atomic_write(path, json.dumps(data, **dump_options), fsync=fsync)
@@ -0,0 +1,299 @@
+"""
+Snapshot history of a project's context files.
+
+History lives in `<project>/.history/`:
+
+- `objects/<2 hex>/<sha256>`: one file version, addressed by content hash
+- `snapshots/<id>.json`: snapshot id, time, message and {"type/name.md": hash}
+
+A snapshot reuses the manifest's content hashes, so only files whose size
+or mtime moved are read again, and only versions not already stored are
+written. A new version of a file is stored as a delta against the version
+the previous snapshot had: the common prefix and suffix are kept as lengths
+and only the middle is compressed, with the replaced region as zlib's
+preset dictionary. Delta chains are capped at MAX_DEPTH, after which a full
+copy is stored again.
+
+Diffing two snapshots compares their hash maps; file contents are only
+rebuilt for a patch.
+"""
+import difflib
+import hashlib
+import json
+import os
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from context_core import events, fileio, manifest, tiering, trace
+from context_core.operations import ContextError
+
+HISTORY_DIR = ".history"
+MAX_DEPTH = 16
+ZDICT_BYTES = 32 * 1024  # zlib only looks back 32 KiB into its dictionary
+
+FULL = b"F"
+DELTA = b"D"
+DELTA_HEADER = struct.Struct("<BQQ32s")  # depth, prefix length, suffix length, base digest
+
+
+def _longest(matches, limit: int) -> int:
+    """
+    Largest n <= limit with matches(n), for a predicate that holds up to some
+    point and fails after it. Binary search keeps the byte comparisons in C.
+    """
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if matches(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class History:
+    """Content-addressed, delta-compressed snapshots of one project."""
+
+    def __init__(self, project_path: Path):
+        self.project_path = project_path
+        self.path = project_path / HISTORY_DIR
+        self.objects = self.path / "objects"
+        self.snapshots = self.path / "snapshots"
+        self._contents = {}
+
+    # ── objects ──────────────────────────────────────────────
+    def _object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def _depth(self, digest: str) -> int:
+        with open(self._object_path(digest), "rb") as f:
+            header = f.read(1 + DELTA_HEADER.size)
+        return DELTA_HEADER.unpack_from(header, 1)[0] if header[:1] == DELTA else 0
+
+    def _encode(self, data: bytes, base: str = None) -> bytes:
+        if base is None or not self._object_path(base).exists():
+            return FULL + zlib.compress(data, 9)
+        depth = self._depth(base) + 1
+        if depth > MAX_DEPTH:
+            return FULL + zlib.compress(data, 9)
+
+        old = self.read(base)
+        limit = min(len(old), len(data))
+        prefix = _longest(lambda n: old[:n] == data[:n], limit)
+        suffix = _longest(lambda n: old[len(old) - n:] == data[len(data) - n:], limit - prefix)
+
+        replaced = old[prefix:len(old) - suffix][-ZDICT_BYTES:]
+        compressor = zlib.compressobj(9, zdict=replaced) if replaced else zlib.compressobj(9)
+        middle = compressor.compress(data[prefix:len(data) - suffix]) + compressor.flush()
+        delta = DELTA + DELTA_HEADER.pack(depth, prefix, suffix, bytes.fromhex(base)) + middle
+        full = FULL + zlib.compress(data, 9)
+        return delta if len(delta) < len(full) else full
+
+    def store(self, data: bytes, base: str = None) -> str:
+        """
+        Store one version (as a delta against `base` if that helps) and return its hash.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        if object_path.exists():
+            return digest
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        trace.count("objects_written")
+        try:
+            fileio.atomic_write(object_path, self._encode(data, base), create=True)
+        except FileExistsError:  # stored concurrently by someone else
+            pass
+        self._contents[digest] = data
+        return digest
+
+    def read(self, digest: str) -> bytes:
+        """
+        Rebuild one version by walking its delta chain back to a full copy.
+        """
+        chain = []
+        current = digest
+        while current not in self._contents:
+            try:
+                with open(self._object_path(current), "rb") as f:
+                    blob = f.read()
+            except FileNotFoundError:
+                raise ContextError(f"History object {current[:12]} is missing.")
+            if blob[:1] == FULL:
+                self._contents[current] = zlib.decompress(blob[1:])
+                break
+            depth, prefix, suffix, base = DELTA_HEADER.unpack_from(blob, 1)
+            chain.append((current, prefix, suffix, blob[1 + DELTA_HEADER.size:]))
+            current = base.hex()
+
+        data = self._contents[current]
+        for current, prefix, suffix, middle in reversed(chain):
+            replaced = data[prefix:len(data) - suffix][-ZDICT_BYTES:]
+            decompressor = zlib.decompressobj(zdict=replaced) if replaced else zlib.decompressobj()
+            rebuilt = data[:prefix] + decompressor.decompress(middle) + decompressor.flush()
+            if suffix:
+                rebuilt += data[len(data) - suffix:]
+            if hashlib.sha256(rebuilt).hexdigest() != current:
+                raise ContextError(f"History object {current[:12]} is corrupt.")
+            self._contents[current] = data = rebuilt
+        return data
+
+    # ── snapshots ────────────────────────────────────────────
+    def ids(self):
+        if not self.snapshots.exists():
+            return []
+        return sorted(int(p.stem) for p in self.snapshots.glob("*.json"))
+
+    def load(self, snapshot_id: int) -> dict:
+        try:
+            with open(self.snapshots / f"{snapshot_id:06d}.json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ContextError(f"Snapshot {snapshot_id} does not exist.")
+
+    def latest(self):
+        ids = self.ids()
+        return self.load(ids[-1]) if ids else None
+
+    def resolve(self, ref) -> dict:
+        """
+        Load a snapshot by id, or the latest one for "latest" / None.
+        """
+        if ref in (None, "latest"):
+            snapshot = self.latest()
+            if snapshot is None:
+                raise ContextError(f"Project '{self.project_path.name}' has no snapshots yet.")
+            return snapshot
+        try:
+            return self.load(int(ref))
+        except ValueError:
+            raise ContextError(f"'{ref}' is not a snapshot id.")
+
+    def take(self, message: str = None, allow_empty: bool = False):
+        """
+        Snapshot the current files. Returns the new snapshot, with the paths
+        added, changed and removed since the previous one, or None if nothing
+        changed (unless `allow_empty`).
+        """
+        current = working_files(self.project_path)
+        self.path.mkdir(exist_ok=True)
+        with fileio.lock(self.path / "snapshots.json"):
+            previous = self.latest()
+            before = previous["files"] if previous else {}
+            changes = compare(before, current)
+            if previous and not allow_empty and not any(changes.values()):
+                return None
+
+            for rel in changes["added"] + changes["changed"]:
+                with open(self.project_path / rel, "rb") as f:
+                    data = f.read()
+                # The manifest hash can be stale if the file moved since it was hashed
+                current[rel] = self.store(data, before.get(rel))
+
+            snapshot_id = (previous["id"] if previous else 0) + 1
+            snapshot = {
+                "id": snapshot_id,
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "message": message or "",
+                "files": dict(sorted(current.items())),
+            }
+            self.snapshots.mkdir(parents=True, exist_ok=True)
+            fileio.atomic_write_json(self.snapshots / f"{snapshot_id:06d}.json", snapshot, fsync=True)
+        return dict(snapshot, changes=changes)
+
+    def file_history(self, rel: str):
+        """
+        Return the snapshots in which `rel` ("type/name.md") changed, oldest
+        first, as (snapshot, hash or None if it was removed).
+        """
+        versions = []
+        last = None
+        for snapshot_id in self.ids():
+            snapshot = self.load(snapshot_id)
+            digest = snapshot["files"].get(rel)
+            if digest != last:
+                versions.append((snapshot, digest))
+                last = digest
+        return versions
+
+    def version(self, digest: str) -> bytes:
+        """
+        Content of one version, or nothing for a file a snapshot does not have.
+        """
+        return self.read(digest) if digest else b""
+
+
+def patch(rel: str, old: bytes, new: bytes, old_label: str, new_label: str):
+    """
+    Yield unified diff lines between two versions of `rel`.
+    """
+    before = old.decode("utf-8", errors="replace").splitlines(keepends=True)
+    after = new.decode("utf-8", errors="replace").splitlines(keepends=True)
+    yield from difflib.unified_diff(before, after, f"{old_label}/{rel}", f"{new_label}/{rel}")
+
+
+def working_files(project_path: Path) -> dict:
+    """
+    Map every context file of the project ("type/name.md") to its current hash.
+    """
+    folders = manifest.refresh(project_path, deep=True)["folders"]
+    return {entry["path"]: entry["hash"] for record in folders.values() for entry in record["files"].values()}
+
+
+def compare(before: dict, after: dict) -> dict:
+    """
+    Return the sorted paths added, changed and removed between two hash maps.
+    """
+    return {
+        "added": sorted(rel for rel in after if rel not in before),
+        "changed": sorted(rel for rel in after if rel in before and before[rel] != after[rel]),
+        "removed": sorted(rel for rel in before if rel not in after),
+    }
+
+
+def diff(project_path: Path, old_ref, new_ref=None):
+    """
+    Compare two snapshots, or a snapshot with the working files when
+    `new_ref` is None. Returns (old hash map, new hash map, changes).
+    """
+    history = History(project_path)
+    old = history.resolve(old_ref)["files"]
+    new = working_files(project_path) if new_ref is None else history.resolve(new_ref)["files"]
+    return old, new, compare(old, new)
+
+
+def rollback(project_path: Path, ref) -> dict:
+    """
+    Make the working files match a snapshot.
+
+    The current state is snapshotted first, so a rollback can itself be
+    rolled back; files the snapshot does not have go to the trash.
+    """
+    from context_core import trash
+
+    history = History(project_path)
+    target = history.resolve(ref)
+    history.take(f"before rollback to {target['id']}")
+    changes = compare(working_files(project_path), target["files"])
+
+    for rel in changes["added"] + changes["changed"]:
+        file_path = project_path / rel
+        file_path.parent.mkdir(exist_ok=True)
+        type, name = rel.split("/", 1)
+        with fileio.lock(file_path):
+            fileio.atomic_write(file_path, history.read(target["files"][rel]))
+            # A file demoted since the snapshot comes back warm; drop its stale cold copy
+            tiering.cold_path(project_path, type, os.path.splitext(name)[0]).unlink(missing_ok=True)
+    for rel in changes["removed"]:
+        file_path = project_path / rel
+        type, name = rel.split("/", 1)
+        with fileio.lock(file_path):
+            trash.move_to_trash(project_path.parent, file_path, {
+                "kind": "context", "project": project_path.name, "type": type, "name": os.path.splitext(name)[0],
+            })
+
+    manifest.refresh(project_path, deep=True)
+    if events.recording(project_path):
+        events.append(project_path, "rollback", message=f"to snapshot {target['id']}")
+    return dict(target, changes=changes)
@@ -0,0 +1,229 @@
+"""
+Streaming context loader.
+
+Assembles the context files of a project into one output, type by type,
+reading line by line and stopping as soon as the token budget is spent.
+
+`assemble` is the prompt-cache-friendly layout: stable types first, every
+file normalised and in byte order, so an unchanged prefix is byte-identical
+from one request to the next and providers can reuse their cached copy.
+"""
+import hashlib
+from itertools import chain
+from pathlib import Path
+
+from context_core import access, trace
+from context_core.constants import DEFAULT_LOAD_PRIORITY, STABLE_CONTEXT_TYPES, VALID_CONTEXT_TYPES
+from context_core.manifest import context_files
+
+# Rough characters-per-token ratio for English text and markdown.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the number of tokens in a piece of text.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def order_types(types, priority=None):
+    """
+    Return the requested context types sorted by priority.
+
+    Types missing from the priority list keep their default order after
+    the prioritised ones.
+    """
+    priority = list(priority or [])
+    ranked = priority + [t for t in DEFAULT_LOAD_PRIORITY if t not in priority]
+    wanted = set(types or VALID_CONTEXT_TYPES)
+    return [t for t in ranked if t in wanted]
+
+
+def _read_lines(path: Path):
+    trace.count("files_read")
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            trace.count("bytes_read", len(line))
+            yield line
+
+
+def iter_context(project_path: Path, types=None, max_tokens=None, priority=None, reader=None, dedup=None):
+    """
+    Yield the project's context as text chunks, never exceeding `max_tokens`.
+
+    Files are opened lazily, so nothing past the budget is ever read.
+    `reader` maps a path to its lines and defaults to streaming from disk.
+    With `dedup` (a similarity threshold), paragraphs that nearly repeat one
+    already emitted are replaced by a pointer to it.
+    """
+    reader = reader or _read_lines
+    folders = context_files(project_path)
+    ordered = order_types(types, priority)
+
+    plan = {}
+    if dedup:
+        from context_core import dedup as duplicates
+
+        paths = [f"{t}/{name}" for t in ordered for name in folders.get(t, [])]
+        plan = duplicates.collapse_plan(project_path, paths, dedup)
+
+    def files():
+        for context_type in ordered:
+            names = folders.get(context_type, [])
+            packed = None
+            if context_type == "archives":
+                from context_core.archives import ArchiveStore
+
+                packed = ArchiveStore(project_path)
+                names = sorted(set(names) | {f"{n}.md" for n in packed.names()})
+
+            for name in names:
+                path = project_path / context_type / name
+                access.record(project_path, f"{context_type}/{name}")
+                if packed is not None and not path.exists():
+                    lines = packed.read(name[:-len(".md")]).splitlines(keepends=True)
+                else:
+                    lines = reader(path)
+                    drops = plan.get(f"{context_type}/{name}")
+                    if drops:
+                        lines = duplicates.collapse(lines, drops)
+                yield f"==> {context_type}/{name} <==\n", lines
+
+    return budgeted(files(), max_tokens)
+
+
+def _spendable(max_tokens, note: str):
+    """The budget left for content once the truncation note is paid for."""
+    return None if max_tokens is None else max_tokens - estimate_tokens(note)
+
+
+def budgeted(files, max_tokens=None):
+    """
+    Yield (header, lines) pairs as text chunks, each file followed by a blank
+    line, ending with a truncation note where `max_tokens` would be exceeded.
+    The note's cost is reserved up front, so the output never exceeds
+    `max_tokens` (a budget too small for the note yields nothing).
+    """
+    note = f"\n[... truncated: token budget of {max_tokens} reached]\n"
+    limit = _spendable(max_tokens, note)
+    used = 0
+    for header, lines in files:
+        for line in chain([header], lines, ["\n"]):
+            cost = estimate_tokens(line)
+            if limit is not None and used + cost > limit:
+                if limit >= 0:
+                    yield note
+                return
+            used += cost
+            yield line
+
+
+def _normalise(text: str) -> str:
+    """
+    One canonical form per file: no BOM, LF line endings, exactly one
+    trailing newline.
+    """
+    text = text.lstrip("\ufeff").replace("\r\n", "\n").replace("\r", "\n")
+    return text.rstrip("\n") + "\n"
+
+
+def _fingerprint(digest) -> str:
+    return f"sha256:{digest.hexdigest()[:16]}"
+
+
+def assemble(project_path: Path, types=None, max_tokens=None, priority=None, reader=None) -> dict:
+    """
+    Lay out the project's context for provider-side prompt caching.
+
+    Stable types (STABLE_CONTEXT_TYPES) come first, then the volatile ones;
+    `priority` only reorders types within each group. Files are sorted by
+    name and normalised, and are included whole or not at all, so a token
+    budget never leaves a partial file in the prefix.
+
+    Returns {"text", "blocks", "prefix_bytes", "prefix_fingerprint"}. Each
+    block is one type: {type, stable, files, bytes, fingerprint}, and stable
+    blocks also carry `prefix_fingerprint`, covering everything up to and
+    including them. A caller whose cached prefix fingerprint still matches
+    can rely on the provider's cached prefix.
+    """
+    reader = reader or _read_lines
+    folders = context_files(project_path)
+    # Stable types sort first; the sort is stable, so `priority` still orders each group
+    ordered = sorted(order_types(types, priority), key=lambda t: t not in STABLE_CONTEXT_TYPES)
+
+    note = f"[... truncated: token budget of {max_tokens} reached]\n"
+    limit = _spendable(max_tokens, note)
+    parts, blocks = [], []
+    prefix = hashlib.sha256()
+    prefix_bytes = used = 0
+    truncated = False
+    for context_type in ordered:
+        names = folders.get(context_type, [])
+        packed = None
+        if context_type == "archives":
+            from context_core.archives import ArchiveStore
+
+            packed = ArchiveStore(project_path)
+            names = sorted(set(names) | {f"{n}.md" for n in packed.names()})
+
+        stable = context_type in STABLE_CONTEXT_TYPES
+        block = {"type": context_type, "stable": stable, "files": [], "bytes": 0}
+        digest = hashlib.sha256()
+        for name in sorted(names):
+            path = project_path / context_type / name
+            if packed is not None and not path.exists():
+                content = packed.read(name[:-len(".md")])
+            else:
+                content = "".join(reader(path))
+            text = f"==> {context_type}/{name} <==\n{_normalise(content)}\n"
+            cost = estimate_tokens(text)
+            if limit is not None and used + cost > limit:
+                truncated = True
+                break
+            used += cost
+            access.record(project_path, f"{context_type}/{name}")
+            data = text.encode("utf-8")
+            digest.update(data)
+            block["files"].append(name)
+            block["bytes"] += len(data)
+            parts.append(text)
+            if stable:
+                prefix.update(data)
+                prefix_bytes += len(data)
+
+        if block["files"]:
+            block["fingerprint"] = _fingerprint(digest)
+            if stable:
+                block["prefix_fingerprint"] = _fingerprint(prefix)
+            blocks.append(block)
+        if truncated:
+            break
+
+    if truncated and limit >= 0:
+        parts.append(note)
+    return {
+        "text": "".join(parts),
+        "blocks": blocks,
+        "prefix_bytes": prefix_bytes,
+        "prefix_fingerprint": _fingerprint(prefix) if prefix_bytes else None,
+    }
+
+
+def iter_relevant(project_path: Path, query: str, types=None, max_tokens=None, limit=None):
+    """
+    Yield the project's heading-level chunks that match `query`, most
+    relevant first, never exceeding `max_tokens`.
+
+    Only loose files are ranked; packed archives are not chunked.
+    """
+    from context_core.relevance import rank_project, read_chunk
+
+    def chunks():
+        for result in rank_project(project_path, query, types, limit):
+            header = f"==> {result['type']}/{result['file']}:{result['line']} (score {result['score']:.2f}) <==\n"
+            text = read_chunk(project_path, result)
+            access.record(project_path, f"{result['type']}/{result['file']}")
+            yield header, text.splitlines(keepends=True)
+
+    return budgeted(chunks(), max_tokens)
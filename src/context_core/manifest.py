@@ -0,0 +1,224 @@
+"""
+Per-project manifest of context files.
+
+The manifest lives next to `meta.json` and records path, size, mtime_ns and
+content hash for every context file. It is revalidated against folder mtimes,
+so only folders that changed since the last scan are listed again.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from context_core import fileio, trace
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Filesystem timestamps can be coarse: a folder modified within this window of
+# its last scan may have changed again without its mtime moving, so rescan it.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def hash_file(path: Path) -> str:
+    """
+    Return the sha256 hex digest of a file, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+            trace.count("bytes_read", len(block))
+    return digest.hexdigest()
+
+
+def _empty():
+    return {"version": MANIFEST_VERSION, "folders": {}}
+
+
+def read_manifest(project_path: Path) -> dict:
+    """
+    Read the stored manifest without revalidating it. A missing or corrupt
+    manifest reads as empty.
+    """
+    try:
+        with open(project_path / MANIFEST_NAME) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return _empty()
+    if manifest.get("version") != MANIFEST_VERSION:
+        return _empty()
+    return manifest
+
+
+def project_lock(project_path: Path):
+    """
+    Lock guarding the project's metadata (meta.json and the manifest).
+    """
+    return fileio.lock(project_path / "meta.json")
+
+
+def write_manifest(project_path: Path, manifest: dict):
+    fileio.atomic_write_json(project_path / MANIFEST_NAME, manifest)
+
+
+def _file_entry(folder: str, entry: os.DirEntry, previous) -> dict:
+    trace.count("files_stat")
+    st = entry.stat()
+    if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+        return previous
+    return {
+        "path": f"{folder}/{entry.name}",
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "hash": hash_file(entry.path),
+    }
+
+
+def _scan_folder(folder_path: Path, name: str, previous) -> dict:
+    trace.count("dirs_scanned")
+    scanned_at = time.time_ns()
+    mtime_ns = os.stat(folder_path).st_mtime_ns
+    old_files = previous["files"] if previous else {}
+    files = {}
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".md") and entry.is_file():
+                files[entry.name] = _file_entry(name, entry, old_files.get(entry.name))
+    return {"mtime_ns": mtime_ns, "scanned_at_ns": scanned_at, "files": files}
+
+
+def _is_current(folder_path: Path, record) -> bool:
+    if record is None:
+        return False
+    trace.count("files_stat")
+    mtime_ns = os.stat(folder_path).st_mtime_ns
+    if mtime_ns != record["mtime_ns"]:
+        return False
+    return mtime_ns < record["scanned_at_ns"] - RACY_WINDOW_NS
+
+
+def _restat_files(project_path: Path, record: dict) -> bool:
+    changed = False
+    for name, entry in list(record["files"].items()):
+        trace.count("files_stat")
+        try:
+            st = os.stat(project_path / entry["path"])
+        except FileNotFoundError:
+            del record["files"][name]
+            changed = True
+            continue
+        if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime_ns"]:
+            entry.update(
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+                hash=hash_file(project_path / entry["path"]),
+            )
+            changed = True
+    return changed
+
+
+def refresh(project_path: Path, deep: bool = False) -> dict:
+    """
+    Return an up-to-date manifest for the project, saving it if anything changed.
+
+    Only folders whose mtime moved are listed again. With `deep`, every known
+    file is also stat'ed so in-place edits are picked up; files are rehashed
+    only when their size or mtime changed.
+    """
+    with trace.span("fs"):
+        return _refresh(project_path, deep)
+
+
+def _refresh(project_path: Path, deep: bool) -> dict:
+    manifest = read_manifest(project_path)
+    folders = {}
+    dirty = False
+
+    with os.scandir(project_path) as entries:
+        names = sorted(e.name for e in entries if e.is_dir() and not e.name.startswith("."))
+
+    for name in names:
+        folder_path = project_path / name
+        record = manifest["folders"].get(name)
+        if _is_current(folder_path, record):
+            if deep and _restat_files(project_path, record):
+                dirty = True
+            folders[name] = record
+        else:
+            folders[name] = _scan_folder(folder_path, name, record)
+            dirty = dirty or folders[name] != record
+
+    if set(folders) != set(manifest["folders"]):
+        dirty = True
+    manifest["folders"] = folders
+
+    if dirty:
+        with project_lock(project_path):
+            write_manifest(project_path, manifest)
+    return manifest
+
+
+def update_entry(project_path: Path, context_type: str, name: str) -> dict:
+    """
+    Bring one file's entry up to date after it was created, edited or deleted.
+    """
+    return update_entries(project_path, [f"{context_type}/{name}"])
+
+
+def update_entries(project_path: Path, paths) -> dict:
+    """
+    Bring the entries of several files ("type/name.md") up to date, writing
+    the manifest once.
+    """
+    with project_lock(project_path):
+        manifest = refresh(project_path)
+        if any([_update_entry(project_path, manifest, path) for path in paths]):
+            write_manifest(project_path, manifest)
+        return manifest
+
+
+def _update_entry(project_path: Path, manifest: dict, path: str) -> bool:
+    context_type, name = path.split("/", 1)
+    record = manifest["folders"].get(context_type)
+    if record is None:
+        return False
+
+    file_path = project_path / context_type / name
+    if file_path.exists():
+        st = file_path.stat()
+        entry = record["files"].get(name)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            return False
+        record["files"][name] = {
+            "path": path,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "hash": hash_file(file_path),
+        }
+        return True
+    return record["files"].pop(name, None) is not None
+
+
+def context_files(project_path: Path, context_type: str = None, deep: bool = False) -> dict:
+    """
+    Map each context folder (or just `context_type`) to its sorted file names.
+    """
+    folders = refresh(project_path, deep=deep)["folders"]
+    if context_type is not None:
+        folders = {context_type: folders[context_type]} if context_type in folders else {}
+    return {name: sorted(record["files"]) for name, record in folders.items()}
+
+
+def folder_totals(project_path: Path, folders: dict = None) -> dict:
+    """
+    Return {folder: {"files": n, "bytes": size}} for a project, folders sorted.
+    `folders` reuses the folders of a deep refresh the caller already made.
+    """
+    if folders is None:
+        folders = refresh(project_path, deep=True)["folders"]
+    return {
+        name: {"files": len(record["files"]), "bytes": sum(e["size"] for e in record["files"].values())}
+        for name, record in sorted(folders.items())
+    }
@@ -0,0 +1,397 @@
+"""
+Context operations shared by the CLI, the daemon and batch mode.
+
+These functions do the validation and filesystem work of each command and
+raise `ContextError` with a user-facing message instead of printing.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+from context_core import events, fileio, manifest, trace
+from context_core.constants import DATA_DIR, VALID_CONTEXT_TYPES
+
+
+class ContextError(Exception):
+    """An operation failed; the message is meant for the user."""
+
+
+class InvalidContextType(ContextError):
+    """The context type is not one of VALID_CONTEXT_TYPES."""
+
+
+class ContextExists(ContextError):
+    """The file the operation would create already exists."""
+
+
+def require_type(type: str):
+    if type not in VALID_CONTEXT_TYPES:
+        raise InvalidContextType(f"'{type}' is not a valid context type.")
+
+
+def require_project(project: str, data_path: Path = DATA_DIR) -> Path:
+    with trace.span("resolve"):
+        project_path = data_path / project
+        trace.count("files_stat")
+        if not project_path.exists():
+            raise ContextError(f"Project '{project}' does not exist.")
+    return project_path
+
+
+def context_path(project: str, type: str, name: str, data_path: Path = DATA_DIR) -> Path:
+    return data_path / project / type / f"{name}.md"
+
+
+def packed_archive(project: str, type: str, name: str, data_path: Path = DATA_DIR):
+    """
+    Return the project's ArchiveStore if `name` is a packed archive, else None.
+    """
+    if type != "archives":
+        return None
+    from context_core.archives import ArchiveStore
+
+    store = ArchiveStore(data_path / project)
+    return store if name in store else None
+
+
+def existing_context(project: str, type: str, name: str, data_path: Path = DATA_DIR) -> Path:
+    """
+    Return the path of a context file, raising if it does not exist.
+
+    Packed archives count as existing even though no loose file is on disk,
+    and cold files are restored from cold storage.
+    """
+    with trace.span("resolve"):
+        file_path = context_path(project, type, name, data_path)
+        trace.count("files_stat")
+        if not file_path.exists() and not packed_archive(project, type, name, data_path):
+            from context_core import tiering
+
+            # A file moved to cold storage comes back the moment it is asked for
+            if not tiering.promote(data_path / project, type, name):
+                raise ContextError(f"File '{file_path}' does not exist.")
+    return file_path
+
+
+def init_project(project: str, data_path: Path = DATA_DIR) -> Path:
+    """
+    Create a project folder with one sub-folder per context type and meta.json.
+
+    Creating the project folder is the atomic step: of several concurrent
+    callers, exactly one succeeds.
+    """
+    base_path = data_path / project
+    try:
+        base_path.mkdir(parents=True)
+    except FileExistsError:
+        raise ContextExists(f"Project '{project}' already exists.")
+
+    for folder in VALID_CONTEXT_TYPES:
+        (base_path / folder).mkdir(exist_ok=True)
+
+    meta = {
+        "project": project,
+        "created": datetime.now().isoformat(),
+        "context_types": VALID_CONTEXT_TYPES,
+    }
+    with manifest.project_lock(base_path):
+        fileio.atomic_write(base_path / "meta.json", json.dumps(meta, indent=2))
+    return base_path
+
+
+def default_content(name: str) -> str:
+    title = name.replace("-", " ").title()
+    return f"# {title}\n\nCreated on {datetime.now().isoformat()}\n"
+
+
+def create_context(project: str, type: str, name: str, content: str = None, data_path: Path = DATA_DIR,
+                   sync_manifest: bool = True) -> Path:
+    """
+    Create a context file, from the default template unless `content` is given.
+
+    With `sync_manifest=False` the manifest is left to catch up on its next
+    refresh, which lets callers creating many files rescan each folder once.
+    """
+    require_type(type)
+
+    base_path = data_path / project / type
+    file_path = base_path / f"{name}.md"
+
+    if not base_path.exists():
+        raise ContextError(f"The folder '{base_path}' does not exist. Did you run `init`?")
+
+    with fileio.lock(file_path):
+        if file_path.exists() or packed_archive(project, type, name, data_path):
+            raise ContextExists(f"File '{file_path}' already exists.")
+        from context_core import tiering
+
+        if tiering.cold_path(base_path.parent, type, name).exists():
+            raise ContextExists(f"File '{file_path}' already exists in cold storage; view it to restore it.")
+        try:
+            fileio.atomic_write(file_path, default_content(name) if content is None else content, create=True)
+        except FileExistsError:
+            raise ContextExists(f"File '{file_path}' already exists.")
+    if sync_manifest:
+        manifest.update_entry(base_path.parent, type, file_path.name)
+    events.record(base_path.parent, "create", type, name)
+    return file_path
+
+
+def write_context(project: str, type: str, name: str, content: str, data_path: Path = DATA_DIR) -> Path:
+    """
+    Replace a context file's content, creating the file if needed. A packed
+    archive is unpacked to a loose file first.
+    """
+    require_type(type)
+    project_path = require_project(project, data_path)
+    file_path = context_path(project, type, name, data_path)
+    if not file_path.parent.exists():
+        raise ContextError(f"The folder '{file_path.parent}' does not exist. Did you run `init`?")
+
+    with fileio.lock(file_path):
+        existed = file_path.exists()
+        packed = None if existed else packed_archive(project, type, name, data_path)
+        fileio.atomic_write(file_path, content)
+        if packed:
+            packed.delete(name)
+        from context_core import tiering
+
+        # The new content supersedes any cold copy
+        tiering.cold_path(project_path, type, name).unlink(missing_ok=True)
+    manifest.update_entry(project_path, type, file_path.name)
+    events.record(project_path, "edit" if existed or packed else "create", type, name)
+    return file_path
+
+
+def delete_context(project: str, type: str, name: str, data_path: Path = DATA_DIR,
+                   sync_manifest: bool = True) -> Path:
+    """
+    Move a context file to the trash (see `restore_context`).
+
+    A packed archive is written out to the trash as a loose file before its
+    index entry is dropped.
+    """
+    from context_core import trash
+
+    file_path = existing_context(project, type, name, data_path)
+    info = {"kind": "context", "project": project, "type": type, "name": name}
+    if not file_path.exists():
+        store = packed_archive(project, type, name, data_path)
+        staged = file_path.with_name(f".{file_path.name}.trash")
+        fileio.atomic_write(staged, store.read_bytes(name))
+        trash.move_to_trash(data_path, staged, info)
+        store.delete(name)
+        events.record(data_path / project, "delete", type, name)
+        return file_path
+
+    with fileio.lock(file_path):
+        try:
+            trash.move_to_trash(data_path, file_path, info)
+        except FileNotFoundError:
+            raise ContextError(f"File '{file_path}' does not exist.")
+    if sync_manifest:
+        manifest.update_entry(file_path.parent.parent, type, file_path.name)
+    events.record(data_path / project, "delete", type, name)
+    return file_path
+
+
+def delete_project(project: str, data_path: Path = DATA_DIR) -> Path:
+    """
+    Move a whole project to the trash with one rename (see `restore_project`).
+    """
+    from context_core import trash
+
+    project_path = require_project(project, data_path)
+    try:
+        trash.move_to_trash(data_path, project_path, {"kind": "project", "project": project})
+    except FileNotFoundError:
+        raise ContextError(f"Project '{project}' does not exist.")
+    return project_path
+
+
+def restore_project(project: str, data_path: Path = DATA_DIR) -> Path:
+    """
+    Bring back the most recently deleted project of that name.
+    """
+    from context_core import trash
+
+    entry = trash.find(data_path, "project", project)
+    if entry is None:
+        raise ContextError(f"No deleted project '{project}' in the trash.")
+    project_path = data_path / project
+    if project_path.exists():
+        raise ContextExists(f"Project '{project}' already exists.")
+    trash.restore(entry, project_path)
+    return project_path
+
+
+def restore_context(project: str, type: str, name: str, data_path: Path = DATA_DIR) -> Path:
+    """
+    Bring back the most recently deleted version of a context file.
+    """
+    from context_core import trash
+
+    require_type(type)
+    project_path = require_project(project, data_path)
+    entry = trash.find(data_path, "context", project, type, name)
+    if entry is None:
+        raise ContextError(f"No deleted context '{type}/{name}' of project '{project}' in the trash.")
+    file_path = context_path(project, type, name, data_path)
+    with fileio.lock(file_path):
+        if file_path.exists() or packed_archive(project, type, name, data_path):
+            raise ContextExists(f"File '{file_path}' already exists.")
+        from context_core import tiering
+
+        if tiering.cold_path(project_path, type, name).exists():
+            raise ContextExists(f"File '{file_path}' already exists in cold storage; view it to restore it.")
+        trash.restore(entry, file_path)
+    manifest.update_entry(project_path, type, file_path.name)
+    events.record(project_path, "restore", type, name)
+    return file_path
+
+
+def read_context(project: str, type: str, name: str, data_path: Path = DATA_DIR) -> str:
+    file_path = existing_context(project, type, name, data_path)
+    with trace.span("read"):
+        if not file_path.exists():
+            content = packed_archive(project, type, name, data_path).read(name)
+        else:
+            content = file_path.read_text()
+        trace.count("bytes_read", len(content))
+    return content
+
+
+def stream_context(project: str, type: str, name: str, section: str = None, byte_range: str = None,
+                   data_path: Path = DATA_DIR):
+    """
+    Return an iterator over the text of a context file, or of one of its
+    sections (`section`, a heading title) or byte ranges (`byte_range`,
+    "START:END").
+
+    Loose files are memory-mapped and read in blocks; packed archives are
+    decompressed and sliced in memory.
+    """
+    from context_core import access, sections
+
+    file_path = existing_context(project, type, name, data_path)
+    access.record(data_path / project, f"{type}/{name}.md")
+    if file_path.exists():
+        data = None
+        size = file_path.stat().st_size
+    else:
+        data = packed_archive(project, type, name, data_path).read_bytes(name)
+        size = len(data)
+
+    offset, length = 0, size
+    if section:
+        if data is None:
+            found = sections.file_sections(data_path / project, f"{type}/{name}.md")
+        else:
+            found = sections.sections_of(data)
+        located = sections.find_section(found, section)
+        if located is None:
+            titles = ", ".join(f"'{title}'" for _, title, _, _ in found) or "none"
+            raise ContextError(f"Section '{section}' not found in '{file_path}'. Sections: {titles}.")
+        offset, length = located
+    if byte_range:
+        try:
+            start, length = sections.parse_range(byte_range, length)
+        except ValueError as e:
+            raise ContextError(str(e))
+        offset += start
+
+    if data is None:
+        return sections.iter_text(file_path, offset, length)
+    return iter([data[offset:offset + length].decode("utf-8", errors="replace")])
+
+
+def list_contexts(project: str, type: str = None, data_path: Path = DATA_DIR) -> dict:
+    """
+    Map each context folder of a project (or only `type`) to its file names.
+    """
+    project_path = require_project(project, data_path)
+    folders = manifest.context_files(project_path, type)
+    if type and type not in folders:
+        raise ContextError(f"Context type '{type}' does not exist in project '{project}'.")
+
+    if "archives" in folders:
+        from context_core.archives import ArchiveStore
+
+        packed = [f"{name}.md" for name in ArchiveStore(project_path).names()]
+        if packed:
+            folders["archives"] = sorted(set(folders["archives"]) | set(packed))
+    return folders
+
+
+def execute(op: str, args: dict, data_path: Path = DATA_DIR, cache=None, sync_manifest: bool = True):
+    """
+    Run one operation by name and return its JSON-serialisable result.
+
+    `cache` is the daemon's content cache; without it files are read from disk.
+    With CONTEXT_STORAGE set to another backend, the operation runs there.
+    """
+    from context_core import storage
+
+    if storage.selected() != "files":
+        return storage.open_storage(data_path).execute(op, args)
+    return execute_files(op, args, data_path, cache, sync_manifest)
+
+
+def execute_files(op: str, args: dict, data_path: Path = DATA_DIR, cache=None, sync_manifest: bool = True):
+    """
+    `execute` against the flat-file layout, whatever backend is selected.
+    """
+    if op == "ping":
+        return "pong"
+    if op == "list-contexts":
+        return list_contexts(args["project"], args.get("type"), data_path)
+    if op == "view-context":
+        if args.get("section") or args.get("range"):
+            return "".join(stream_context(
+                args["project"], args["type"], args["name"], args.get("section"), args.get("range"), data_path
+            ))
+        from context_core import access
+
+        file_path = existing_context(args["project"], args["type"], args["name"], data_path)
+        access.record(data_path / args["project"], f"{args['type']}/{args['name']}.md")
+        if cache and file_path.exists():
+            return cache.read(file_path)
+        return read_context(args["project"], args["type"], args["name"], data_path)
+    if op == "create-context":
+        file_path = create_context(
+            args["project"], args["type"], args["name"], args.get("content"), data_path, sync_manifest
+        )
+        return str(file_path)
+    if op == "delete-context":
+        return str(delete_context(args["project"], args["type"], args["name"], data_path, sync_manifest))
+    if op == "load":
+        from context_core.loader import iter_context, iter_relevant
+
+        project_path = require_project(args["project"], data_path)
+        if args.get("query"):
+            return "".join(iter_relevant(project_path, args["query"], args.get("types"), args.get("max_tokens")))
+        chunks = iter_context(
+            project_path, args.get("types"), args.get("max_tokens"), args.get("priority"),
+            reader=cache.lines if cache else None, dedup=args.get("dedup"),
+        )
+        return "".join(chunks)
+    if op == "assemble":
+        from context_core.loader import assemble
+
+        project_path = require_project(args["project"], data_path)
+        return assemble(
+            project_path, args.get("types"), args.get("max_tokens"), args.get("priority"),
+            reader=cache.lines if cache else None,
+        )
+    if op == "search":
+        from context_core.search import search
+
+        projects = [args["project"]] if args.get("project") else None
+        return search(data_path, args["query"], projects, args.get("type"), args.get("limit", 10))
+    if op == "rank":
+        from context_core.relevance import rank_project
+
+        project_path = require_project(args["project"], data_path)
+        types = [args["type"]] if args.get("type") else None
+        return rank_project(project_path, args["query"], types, args.get("limit", 10))
+    raise ContextError(f"Unknown operation '{op}'.")
@@ -0,0 +1,281 @@
+"""
+Relevance ranking of heading-level chunks with BM25 on NumPy.
+
+Every context file is split at its markdown headings into chunks. Each
+project keeps a sparse chunk x term matrix under `.cache/relevance/`:
+
+- `meta.json`: indexed file -> id and content hash, and the file id of each path
+- `vocab.json`: term -> column
+- `col_ptr.npy`, `rows.npy`, `tf.npy`: term frequencies in compressed sparse
+  column form
+- `file_id.npy`, `folder_id.npy`, `line.npy`, `offset.npy`, `length.npy`,
+  `terms.npy`: per-chunk file, folder, first line, byte range and length in
+  terms
+
+A query reads only the columns of its own terms and scores every chunk with
+one `np.bincount`. Only files whose hash changed are chunked again; their old
+rows are dropped with a mask and the new ones appended before the columns are
+re-sorted.
+
+As with search, a query refreshes the manifest shallowly; `update_matrix`
+and `watch` revalidate every file.
+
+NumPy is an optional dependency (`pip install 'context-core[rank]'`).
+"""
+import io
+import json
+from collections import Counter
+from pathlib import Path
+
+from context_core import fileio, manifest, trace
+from context_core.operations import ContextError
+from context_core.search import B, K1, tokenize
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+MATRIX_DIR = Path(".cache") / "relevance"
+MATRIX_VERSION = 1
+
+CHUNK_ARRAYS = ("file_id", "folder_id", "line", "offset", "length", "terms")
+ARRAYS = CHUNK_ARRAYS + ("col_ptr", "rows", "tf")
+
+
+def require_numpy():
+    if np is None:
+        raise ContextError("Relevance ranking needs NumPy. Install it with: pip install 'context-core[rank]'")
+
+
+def split_chunks(data: bytes):
+    """
+    Split a markdown file at its headings.
+
+    Yields (first_line, offset, length) per chunk; text before the first
+    heading is a chunk of its own.
+    """
+    start_line, start_offset = 1, 0
+    offset = 0
+    for number, line in enumerate(data.splitlines(keepends=True), start=1):
+        if line.startswith(b"#") and offset > start_offset:
+            yield start_line, start_offset, offset - start_offset
+            start_line, start_offset = number, offset
+        offset += len(line)
+    if offset > start_offset:
+        yield start_line, start_offset, offset - start_offset
+
+
+def _read_json(path: Path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _empty_meta():
+    return {"version": MATRIX_VERSION, "files": {}, "paths": [], "folders": []}
+
+
+def _empty_arrays():
+    arrays = {name: np.zeros(0, dtype=np.int64) for name in CHUNK_ARRAYS}
+    arrays.update(
+        col_ptr=np.zeros(1, dtype=np.int64),
+        rows=np.zeros(0, dtype=np.int32),
+        tf=np.zeros(0, dtype=np.float32),
+    )
+    return arrays
+
+
+def load_matrix(project_path: Path):
+    """
+    Return (meta, vocab, arrays) as stored, or empty ones if missing or stale.
+    Arrays are memory-mapped, so a query only pages in the columns it reads.
+    """
+    matrix_path = project_path / MATRIX_DIR
+    meta = _read_json(matrix_path / "meta.json", None)
+    if not meta or meta.get("version") != MATRIX_VERSION:
+        return _empty_meta(), {}, _empty_arrays()
+    try:
+        arrays = {name: np.load(matrix_path / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+    except (OSError, ValueError):
+        return _empty_meta(), {}, _empty_arrays()
+    return meta, _read_json(matrix_path / "vocab.json", {}), arrays
+
+
+def _save_matrix(project_path: Path, meta: dict, vocab: dict, arrays: dict):
+    matrix_path = project_path / MATRIX_DIR
+    matrix_path.mkdir(parents=True, exist_ok=True)
+    for name in ARRAYS:
+        buffer = io.BytesIO()
+        np.save(buffer, arrays[name])
+        fileio.atomic_write(matrix_path / f"{name}.npy", buffer.getbuffer(), fsync=False)
+    fileio.atomic_write_json(matrix_path / "vocab.json", vocab)
+    # meta.json goes last: it is what marks the matrix as built
+    fileio.atomic_write_json(matrix_path / "meta.json", meta)
+
+
+def update_matrix(project_path: Path, deep: bool = True) -> int:
+    """
+    Bring the project's chunk matrix up to date. Returns how many files were
+    (re)chunked or dropped. Without `deep`, files edited in place since the
+    manifest last saw them are not noticed (see manifest.refresh).
+    """
+    return _refresh_matrix(project_path, deep)[0]
+
+
+def _refresh_matrix(project_path: Path, deep: bool = True):
+    """Update the matrix and return (files updated, meta, vocab, arrays)."""
+    require_numpy()
+    folders = manifest.refresh(project_path, deep=deep)["folders"]
+    current = {
+        entry["path"]: entry["hash"]
+        for record in folders.values()
+        for entry in record["files"].values()
+    }
+
+    meta, vocab, arrays = load_matrix(project_path)
+    files = meta["files"]
+    changed = sorted(rel for rel, digest in current.items() if files.get(rel, {}).get("hash") != digest)
+    removed = sorted(rel for rel in files if rel not in current)
+    if not changed and not removed:
+        return 0, meta, vocab, arrays
+
+    # Drop the rows of every file that changed or disappeared
+    stale = np.array([files[rel]["id"] for rel in changed + removed if rel in files], dtype=np.int64)
+    keep = ~np.isin(arrays["file_id"], stale)
+    remap = np.cumsum(keep) - 1
+    entry_kept = keep[arrays["rows"]]
+    rows = [remap[arrays["rows"][entry_kept]].astype(np.int32)]
+    old_cols = np.repeat(np.arange(len(arrays["col_ptr"]) - 1, dtype=np.int32), np.diff(arrays["col_ptr"]))
+    cols = [old_cols[entry_kept]]
+    tf = [arrays["tf"][entry_kept]]
+    chunk_arrays = {name: [arrays[name][keep]] for name in CHUNK_ARRAYS}
+    for rel in removed:
+        meta["paths"][files.pop(rel)["id"]] = None
+
+    # Chunk and count terms of the changed files
+    next_row = int(keep.sum())
+    new_rows, new_cols, new_tf = [], [], []
+    new_chunks = {name: [] for name in CHUNK_ARRAYS}
+    for rel in changed:
+        if rel not in files:
+            files[rel] = {"id": len(meta["paths"])}
+            meta["paths"].append(rel)
+        files[rel]["hash"] = current[rel]
+        folder = rel.split("/", 1)[0]
+        if folder not in meta["folders"]:
+            meta["folders"].append(folder)
+
+        trace.count("files_read")
+        data = (project_path / rel).read_bytes()
+        trace.count("bytes_read", len(data))
+        for line, offset, length in split_chunks(data):
+            counts = Counter(tokenize(data[offset:offset + length].decode("utf-8", errors="replace")))
+            for term, n in counts.items():
+                new_rows.append(next_row)
+                new_cols.append(vocab.setdefault(term, len(vocab)))
+                new_tf.append(n)
+            for name, value in zip(CHUNK_ARRAYS, (
+                files[rel]["id"], meta["folders"].index(folder), line, offset, length, sum(counts.values()),
+            )):
+                new_chunks[name].append(value)
+            next_row += 1
+
+    rows.append(np.array(new_rows, dtype=np.int32))
+    cols.append(np.array(new_cols, dtype=np.int32))
+    tf.append(np.array(new_tf, dtype=np.float32))
+    rows, cols, tf = np.concatenate(rows), np.concatenate(cols), np.concatenate(tf)
+
+    # Re-sort entries by column so each term's postings are one contiguous
+    # slice. Kept entries are already in (column, row) order and new rows come
+    # after them, so a stable sort on the column alone is enough.
+    order = np.argsort(cols, kind="stable")
+    col_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cols, minlength=len(vocab)), out=col_ptr[1:])
+
+    result = {
+        name: np.concatenate([*chunk_arrays[name], np.array(new_chunks[name], dtype=np.int64)])
+        for name in CHUNK_ARRAYS
+    }
+    result.update(rows=rows[order], tf=tf[order], col_ptr=col_ptr)
+    _save_matrix(project_path, meta, vocab, result)
+    return len(changed) + len(removed), meta, vocab, result
+
+
+def _heading(path: Path, offset: int) -> str:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        line = f.readline().decode("utf-8", errors="replace").strip()
+    return line.lstrip("#").strip() if line.startswith("#") else ""
+
+
+def score_chunks(arrays: dict, columns) -> "np.ndarray":
+    """
+    BM25 score of every chunk for the given term columns, in one pass.
+    """
+    chunk_count = len(arrays["terms"])
+    if not chunk_count or not columns:
+        return np.zeros(chunk_count)
+    columns = np.asarray(columns, dtype=np.int64)
+    starts, ends = arrays["col_ptr"][columns], arrays["col_ptr"][columns + 1]
+    df = ends - starts
+    idf = np.log1p((chunk_count - df + 0.5) / (df + 0.5))
+
+    entries = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+    rows = arrays["rows"][entries]
+    tf = arrays["tf"][entries]
+    lengths = arrays["terms"].astype(np.float64)
+    avg_length = lengths.mean() or 1
+    norm = K1 * (1 - B + B * lengths[rows] / avg_length)
+    weights = np.repeat(idf, df) * tf * (K1 + 1) / (tf + norm)
+    return np.bincount(rows, weights=weights, minlength=chunk_count)
+
+
+def rank_project(project_path: Path, query: str, types=None, limit: int = 10):
+    """
+    Rank a project's heading-level chunks against `query` with BM25.
+
+    Returns dicts with project, type, file, line, heading, offset, length and
+    score, best first. `limit=None` returns every chunk that matches.
+    """
+    require_numpy()
+    with trace.span("index"):
+        _, meta, vocab, arrays = _refresh_matrix(project_path, deep=False)
+
+    columns = sorted({vocab[term] for term in tokenize(query) if term in vocab})
+    scores = score_chunks(arrays, columns)
+    if types:
+        wanted = [meta["folders"].index(t) for t in types if t in meta["folders"]]
+        scores[~np.isin(arrays["folder_id"], wanted)] = 0
+
+    matched = np.flatnonzero(scores > 0)
+    if limit is not None and len(matched) > limit:
+        matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+    matched = matched[np.lexsort((matched, -scores[matched]))]
+
+    results = []
+    for row in matched.tolist():
+        rel = meta["paths"][arrays["file_id"][row]]
+        folder, name = rel.split("/", 1)
+        offset = int(arrays["offset"][row])
+        results.append({
+            "project": project_path.name,
+            "type": folder,
+            "file": name,
+            "line": int(arrays["line"][row]),
+            "heading": _heading(project_path / rel, offset),
+            "offset": offset,
+            "length": int(arrays["length"][row]),
+            "score": round(float(scores[row]), 4),
+        })
+    return results
+
+
+def read_chunk(project_path: Path, result: dict) -> str:
+    with open(project_path / result["type"] / result["file"], "rb") as f:
+        f.seek(result["offset"])
+        data = f.read(result["length"])
+    trace.count("bytes_read", len(data))
+    return data.decode("utf-8", errors="replace")
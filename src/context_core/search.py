@@ -0,0 +1,264 @@
+"""
+Incremental full-text search over context files.
+
+Each project keeps an on-disk inverted index under `.cache/search/`:
+
+- `docs.json`: indexed file -> content hash and length in terms
+- `vocab.json`: indexed file -> its distinct terms (used to retract postings)
+- `postings-XX.json`: term -> {file: [line numbers]}, sharded by term hash
+
+Only files whose hash changed since the last update are tokenized again, and
+a query only loads the posting shards of its own terms.
+
+A query refreshes the manifest shallowly (folder mtimes only), so it stats
+folders rather than every file; edits made through the CLI update the
+manifest themselves, and `watch` (or any deep refresh) picks up files edited
+in place by other tools. Scores use document frequencies and lengths over all
+the projects searched, so rankings from different projects are comparable.
+"""
+import json
+import math
+import os
+import re
+import zlib
+from pathlib import Path
+
+from context_core import fileio, manifest, trace
+
+INDEX_DIR = Path(".cache") / "search"
+SHARD_COUNT = 32
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# BM25 tuning constants
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str):
+    """
+    Split text into lowercase alphanumeric terms.
+    """
+    return TOKEN_RE.findall(text.lower())
+
+
+def shard_of(term: str) -> str:
+    return f"{zlib.crc32(term.encode()) % SHARD_COUNT:02x}"
+
+
+def _read_json(path: Path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_json(path: Path, data):
+    fileio.atomic_write_json(path, data)
+
+
+def _tokenize_file(path: Path) -> dict:
+    """
+    Map each term of a file to the (1-based) lines it appears on.
+    """
+    lines_by_term = {}
+    trace.count("files_read")
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, start=1):
+            trace.count("bytes_read", len(line))
+            for term in set(tokenize(line)):
+                lines_by_term.setdefault(term, []).append(number)
+    return lines_by_term
+
+
+class _Shards:
+    """Lazily loaded posting shards, written back only if touched."""
+
+    def __init__(self, index_path: Path):
+        self.index_path = index_path
+        self.loaded = {}
+        self.dirty = set()
+
+    def get(self, shard: str) -> dict:
+        if shard not in self.loaded:
+            self.loaded[shard] = _read_json(self.index_path / f"postings-{shard}.json", {})
+        return self.loaded[shard]
+
+    def table(self, term: str, touch: bool = False) -> dict:
+        """Return the shard holding `term`, marking it for write-back if touched."""
+        shard = shard_of(term)
+        if touch:
+            self.dirty.add(shard)
+        return self.get(shard)
+
+    def save(self):
+        for shard in self.dirty:
+            _write_json(self.index_path / f"postings-{shard}.json", self.loaded[shard])
+
+
+def update_index(project_path: Path, deep: bool = True) -> int:
+    """
+    Bring the project's search index up to date. Returns how many files were
+    (re)indexed or dropped. Without `deep`, files edited in place since the
+    manifest last saw them are not noticed (see manifest.refresh).
+    """
+    folders = manifest.refresh(project_path, deep=deep)["folders"]
+    current = {
+        entry["path"]: entry["hash"]
+        for record in folders.values()
+        for entry in record["files"].values()
+    }
+    return _update(project_path, current, None)
+
+
+def update_files(project_path: Path, paths) -> int:
+    """
+    Reindex just `paths` ("type/name.md"), e.g. files a watcher saw change,
+    trusting the manifest entries for their hashes.
+    """
+    folders = manifest.read_manifest(project_path)["folders"]
+    current = {}
+    for path in paths:
+        context_type, name = path.split("/", 1)
+        entry = folders.get(context_type, {}).get("files", {}).get(name)
+        if entry:
+            current[path] = entry["hash"]
+    return _update(project_path, current, set(paths))
+
+
+def _update(project_path: Path, current: dict, scope) -> int:
+    """
+    Reindex files whose hash in `current` differs from the index and drop
+    indexed files missing from it. With `scope`, only files in it are considered.
+    """
+    index_path = project_path / INDEX_DIR
+    index_path.mkdir(parents=True, exist_ok=True)
+
+    docs = _read_json(index_path / "docs.json", {})
+    vocab = _read_json(index_path / "vocab.json", {})
+    changed = [rel for rel, digest in current.items() if docs.get(rel, {}).get("hash") != digest]
+    candidates = docs if scope is None else [rel for rel in scope if rel in docs]
+    removed = [rel for rel in candidates if rel not in current]
+    if not changed and not removed:
+        return 0
+
+    shards = _Shards(index_path)
+
+    # Retract the old postings of every file that changed or disappeared
+    for rel in changed + removed:
+        for term in vocab.pop(rel, []):
+            table = shards.table(term, touch=True)
+            postings = table.get(term, {})
+            postings.pop(rel, None)
+            if not postings:
+                table.pop(term, None)
+        docs.pop(rel, None)
+
+    for rel in changed:
+        lines_by_term = _tokenize_file(project_path / rel)
+        for term, lines in lines_by_term.items():
+            shards.table(term, touch=True).setdefault(term, {})[rel] = lines
+        vocab[rel] = sorted(lines_by_term)
+        docs[rel] = {
+            "hash": current[rel],
+            "length": sum(len(lines) for lines in lines_by_term.values()),
+        }
+
+    shards.save()
+    _write_json(index_path / "vocab.json", vocab)
+    _write_json(index_path / "docs.json", docs)
+    return len(changed) + len(removed)
+
+
+def _read_line(path: Path, number: int) -> str:
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for current, line in enumerate(f, start=1):
+            if current == number:
+                return line.strip()
+    return ""
+
+
+def _load_index(project_path: Path, terms) -> tuple:
+    """
+    Return (docs, {term: postings}) from the project's index for the query
+    terms, after a shallow index update.
+    """
+    with trace.span("index"):
+        update_index(project_path, deep=False)
+    index_path = project_path / INDEX_DIR
+    docs = _read_json(index_path / "docs.json", {})
+    shards = _Shards(index_path)
+    return docs, {term: shards.table(term).get(term) or {} for term in terms} if docs else {}
+
+
+def _rank(indexes, terms, context_type: str = None, limit: int = 10):
+    """
+    BM25 over [(project_path, docs, postings)]. Document frequencies and the
+    average length are taken over every index given.
+    """
+    total = sum(len(docs) for _, docs, _ in indexes)
+    if not terms or not total:
+        return []
+
+    prefix = f"{context_type}/" if context_type else ""
+    avg_length = sum(d["length"] for _, docs, _ in indexes for d in docs.values()) / total or 1
+    idf = {}
+    for term in terms:
+        found = sum(len(postings.get(term, {})) for _, _, postings in indexes)
+        idf[term] = math.log(1 + (total - found + 0.5) / (found + 0.5))
+
+    scored = []
+    for project_path, docs, postings in indexes:
+        scores = {}
+        line_hits = {}
+        for term in terms:
+            for rel, lines in postings.get(term, {}).items():
+                if not rel.startswith(prefix):
+                    continue
+                tf = len(lines)
+                norm = K1 * (1 - B + B * docs[rel]["length"] / avg_length)
+                scores[rel] = scores.get(rel, 0.0) + idf[term] * tf * (K1 + 1) / (tf + norm)
+                hits = line_hits.setdefault(rel, {})
+                for line in lines:
+                    hits[line] = hits.get(line, 0) + 1
+        scored.extend((score, project_path, rel, line_hits[rel]) for rel, score in scores.items())
+
+    results = []
+    for score, project_path, rel, hits in sorted(scored, key=lambda s: (-s[0], s[1].name, s[2]))[:limit]:
+        # Show the line matching the most query terms, earliest first
+        line = min(hits.items(), key=lambda item: (-item[1], item[0]))[0]
+        folder, name = rel.split("/", 1)
+        results.append({
+            "project": project_path.name,
+            "type": folder,
+            "file": name,
+            "line": line,
+            "score": round(score, 4),
+            "snippet": _read_line(project_path / rel, line),
+        })
+    return results
+
+
+def search_project(project_path: Path, query: str, context_type: str = None, limit: int = 10):
+    """
+    Rank a project's files against `query` with BM25.
+
+    Returns dicts with project, type, file, line, score and snippet, best first.
+    """
+    terms = sorted(set(tokenize(query)))
+    return _rank([(project_path, *_load_index(project_path, terms))], terms, context_type, limit)
+
+
+def search(data_path: Path, query: str, projects=None, context_type: str = None, limit: int = 10):
+    """
+    Search several projects (all of them by default) and rank their files
+    together, with term statistics over all of them.
+    """
+    if projects is None:
+        with os.scandir(data_path) as entries:
+            projects = sorted(e.name for e in entries if e.is_dir() and not e.name.startswith("."))
+
+    terms = sorted(set(tokenize(query)))
+    indexes = [(data_path / project, *_load_index(data_path / project, terms)) for project in projects]
+    return _rank(indexes, terms, context_type, limit)
@@ -0,0 +1,177 @@
+"""
+Section index and byte-range reads for large context files.
+
+Each file's markdown headings are cached in an index of its own, under
+`.cache/sections/<type>/<name>.md.json`: level, title, byte offset and
+length of each section (up to the next heading of the same or a higher
+level). An index is keyed by the file's size and mtime, so a file is only
+scanned again after it changes, and writing one never touches another, so
+concurrent readers of different files cannot lose each other's entries.
+
+Reads map the file and yield it in blocks, so a section of a multi-megabyte
+archive or timeline is printed without loading the rest of the file.
+"""
+import codecs
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+
+from context_core import fileio, trace
+
+INDEX_DIR = Path(".cache") / "sections"
+INDEX_VERSION = 1
+BLOCK_SIZE = 1 << 20
+
+HEADING_RE = re.compile(rb"^(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*\r?$", re.MULTILINE)
+
+
+def _map(path: Path):
+    """Return a read-only map of `path`, or None for an empty file."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def sections_of(data) -> list:
+    """
+    Return [level, title, offset, length] for every heading in `data`
+    (bytes or a memory map).
+    """
+    headings = [
+        (len(m.group(1)), m.group(2).decode("utf-8", errors="replace"), m.start())
+        for m in HEADING_RE.finditer(data)
+    ]
+
+    # A section ends where the next heading of the same or a higher level starts
+    sections = []
+    open_sections = []
+    for level, title, offset in headings:
+        while open_sections and open_sections[-1][0] >= level:
+            closed = open_sections.pop()
+            closed[3] = offset - closed[2]
+        section = [level, title, offset, None]
+        sections.append(section)
+        open_sections.append(section)
+    for section in open_sections:
+        section[3] = len(data) - section[2]
+    return sections
+
+
+def scan(path: Path) -> list:
+    """Return the sections of a file on disk."""
+    mapped = _map(path)
+    if mapped is None:
+        return []
+    with mapped:
+        trace.count("bytes_read", len(mapped))
+        return sections_of(mapped)
+
+
+def index_path(project_path: Path, rel: str) -> Path:
+    return project_path / INDEX_DIR / f"{rel}.json"
+
+
+def _cached(project_path: Path, rel: str, st):
+    """The cached sections of `rel` if its index matches `st`, else None."""
+    try:
+        with open(index_path(project_path, rel)) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != INDEX_VERSION or entry.get("size") != st.st_size \
+            or entry.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    return entry["sections"]
+
+
+def _rescan(project_path: Path, rel: str, st) -> list:
+    sections = scan(project_path / rel)
+    path = index_path(project_path, rel)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fileio.atomic_write_json(path, {
+        "version": INDEX_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sections": sections,
+    })
+    return sections
+
+
+def file_sections(project_path: Path, rel: str):
+    """
+    Return the cached section list of `project_path / rel`, rescanning it if
+    its size or mtime changed.
+    """
+    st = os.stat(project_path / rel)
+    sections = _cached(project_path, rel, st)
+    return _rescan(project_path, rel, st) if sections is None else sections
+
+
+def update_files(project_path: Path, paths) -> int:
+    """
+    Rescan the sections of just `paths` ("type/name.md"), dropping the
+    indexes of files that are gone. Returns how many indexes changed.
+    """
+    changed = 0
+    for rel in paths:
+        try:
+            st = os.stat(project_path / rel)
+        except FileNotFoundError:
+            try:
+                index_path(project_path, rel).unlink()
+                changed += 1
+            except FileNotFoundError:
+                pass
+            continue
+        if _cached(project_path, rel, st) is None:
+            _rescan(project_path, rel, st)
+            changed += 1
+    return changed
+
+
+def find_section(sections, title: str):
+    """
+    Return (offset, length) of the first section titled `title` (case-insensitive),
+    or None.
+    """
+    wanted = title.strip().lower()
+    for level, heading, offset, length in sections:
+        if heading.strip().lower() == wanted:
+            return offset, length
+    return None
+
+
+def parse_range(text: str, size: int):
+    """
+    Parse a `START:END` byte range (either side optional, END exclusive,
+    negative values count from the end) into (offset, length).
+    """
+    start, sep, end = text.partition(":")
+    try:
+        start = int(start) if start.strip() else 0
+        end = int(end) if end.strip() else size
+    except ValueError:
+        raise ValueError(f"Invalid range '{text}'. Use START:END in bytes, e.g. 0:4096.")
+    if not sep:
+        raise ValueError(f"Invalid range '{text}'. Use START:END in bytes, e.g. 0:4096.")
+    start, end, _ = slice(start, end).indices(size)
+    return start, max(0, end - start)
+
+
+def iter_text(path: Path, offset: int = 0, length: int = None, block_size: int = BLOCK_SIZE):
+    """
+    Yield the decoded text of a byte range of a file, one block at a time.
+    """
+    mapped = _map(path)
+    if mapped is None:
+        return
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with mapped:
+        end = len(mapped) if length is None else min(len(mapped), offset + length)
+        for start in range(offset, end, block_size):
+            block = mapped[start:min(start + block_size, end)]
+            trace.count("bytes_read", len(block))
+            yield decoder.decode(block)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
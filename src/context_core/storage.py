@@ -0,0 +1,571 @@
+"""
+Storage backends for projects and context files.
+
+`Storage` is the interface the CLI's create/view/list/delete commands, the
+daemon and batch mode go through. Two backends implement it:
+
+- `FileStorage` (default): the `projects_data/<project>/<type>/<name>.md`
+  layout, with manifests, packed archives and the trash
+- `SQLiteStorage`: every project and context in one `projects_data/context.db`
+  database, for corpora where millions of small files would make directory
+  operations and inode usage the bottleneck
+
+The SQLite backend runs in WAL mode, so readers never block the writer,
+looks contexts up through a unique (project, type, name) index that also
+covers listings, and inserts in bulk inside a single transaction. Deleted
+projects and contexts move to its own trash tables, restorable until `gc`
+as with the file backend's `.trash/`.
+
+CONTEXT_STORAGE=sqlite selects it. Plain `load`s work on either backend;
+commands built on the file layout (search, rank, stats, history, bundles,
+...) keep working on files only and fail with `files_only` on the other.
+"""
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from context_core.constants import DATA_DIR, VALID_CONTEXT_TYPES
+from context_core.operations import (ContextError, ContextExists, context_path, default_content,
+                                     require_type)
+
+STORAGE_ENV = "CONTEXT_STORAGE"
+BACKENDS = ("files", "sqlite")
+DATABASE_NAME = "context.db"
+
+
+def selected() -> str:
+    backend = os.environ.get(STORAGE_ENV) or "files"
+    if backend not in BACKENDS:
+        raise ContextError(f"Unknown storage backend '{backend}'. Use one of: {', '.join(BACKENDS)}.")
+    return backend
+
+
+def files_only(op: str) -> ContextError:
+    """The error for an operation the selected backend cannot run."""
+    return ContextError(f"'{op}' needs the file storage backend (unset {STORAGE_ENV}).")
+
+
+class Storage(ABC):
+    """
+    Projects and their context files. Paths returned are where the file
+    lives, or would live, in the flat-file layout; they name the context in
+    messages whatever the backend.
+    """
+
+    def __init__(self, data_path: Path = DATA_DIR):
+        self.data_path = data_path
+
+    @abstractmethod
+    def init_project(self, project: str) -> Path:
+        ...
+
+    @abstractmethod
+    def project_exists(self, project: str) -> bool:
+        ...
+
+    @abstractmethod
+    def projects(self) -> list:
+        """Sorted project names."""
+
+    @abstractmethod
+    def list_contexts(self, project: str, type: str = None) -> dict:
+        """Map each context type (or only `type`) to its sorted "name.md" entries."""
+
+    @abstractmethod
+    def locate(self, project: str, type: str, name: str) -> Path:
+        """Return the context's path, raising ContextError if it does not exist."""
+
+    @abstractmethod
+    def read(self, project: str, type: str, name: str) -> str:
+        ...
+
+    @abstractmethod
+    def create(self, project: str, type: str, name: str, content: str = None) -> Path:
+        ...
+
+    @abstractmethod
+    def create_many(self, project: str, items) -> int:
+        """Create (type, name, content) contexts in bulk; returns how many."""
+
+    @abstractmethod
+    def write(self, project: str, type: str, name: str, content: str) -> Path:
+        """Replace a context's content, creating it if needed."""
+
+    @abstractmethod
+    def delete(self, project: str, type: str, name: str) -> Path:
+        """Move a context to the trash."""
+
+    @abstractmethod
+    def delete_project(self, project: str) -> Path:
+        """Move a project and all its contexts to the trash."""
+
+    @abstractmethod
+    def restore_project(self, project: str) -> Path:
+        """Bring back the most recently deleted project of that name."""
+
+    @abstractmethod
+    def restore_context(self, project: str, type: str, name: str) -> Path:
+        """Bring back the most recently deleted version of a context."""
+
+    @abstractmethod
+    def trash_entries(self) -> list:
+        """Info dicts ({kind, project, type, name, deleted}) of the trash entries, oldest first."""
+
+    @abstractmethod
+    def collect_trash(self, older_than: float = None, everything: bool = False, rate: float = None) -> dict:
+        """
+        Permanently delete trash entries older than `older_than` seconds (the
+        retention window by default), or all of them; returns {entries, files, bytes}.
+        """
+
+    def close(self):
+        pass
+
+    def iter_context(self, project: str, types=None, max_tokens=None, priority=None):
+        """
+        `loader.iter_context` over this backend: the requested types in
+        priority order, each file under its "==> type/name.md <==" header.
+        """
+        from context_core.loader import budgeted, order_types
+
+        folders = self.list_contexts(project)
+        files = (
+            (f"==> {t}/{file_name} <==\n", self.read(project, t, file_name[:-len(".md")]).splitlines(keepends=True))
+            for t in order_types(types, priority)
+            for file_name in folders.get(t, [])
+        )
+        return budgeted(files, max_tokens)
+
+    def execute(self, op: str, args: dict):
+        """
+        Run one daemon/batch operation against this backend.
+        """
+        if op == "ping":
+            return "pong"
+        if op == "list-contexts":
+            return self.list_contexts(args["project"], args.get("type"))
+        if op == "view-context":
+            if args.get("section") or args.get("range"):
+                raise ContextError("Sections and byte ranges need the file storage backend.")
+            return self.read(args["project"], args["type"], args["name"])
+        if op == "create-context":
+            return str(self.create(args["project"], args["type"], args["name"], args.get("content")))
+        if op == "delete-context":
+            return str(self.delete(args["project"], args["type"], args["name"]))
+        if op == "load" and not args.get("query") and not args.get("dedup"):
+            return "".join(self.iter_context(
+                args["project"], args.get("types"), args.get("max_tokens"), args.get("priority")
+            ))
+        raise files_only(op)
+
+
+class FileStorage(Storage):
+    """The flat-file layout; every method is the existing file operation."""
+
+    def init_project(self, project: str) -> Path:
+        from context_core import operations
+
+        return operations.init_project(project, self.data_path)
+
+    def project_exists(self, project: str) -> bool:
+        return (self.data_path / project).is_dir()
+
+    def projects(self) -> list:
+        if not self.data_path.exists():
+            return []
+        with os.scandir(self.data_path) as entries:
+            return sorted(e.name for e in entries if e.is_dir() and not e.name.startswith("."))
+
+    def list_contexts(self, project: str, type: str = None) -> dict:
+        from context_core import operations
+
+        return operations.list_contexts(project, type, self.data_path)
+
+    def locate(self, project: str, type: str, name: str) -> Path:
+        from context_core import operations
+
+        return operations.existing_context(project, type, name, self.data_path)
+
+    def read(self, project: str, type: str, name: str) -> str:
+        from context_core import operations
+
+        return operations.read_context(project, type, name, self.data_path)
+
+    def create(self, project: str, type: str, name: str, content: str = None) -> Path:
+        from context_core import operations
+
+        return operations.create_context(project, type, name, content, self.data_path)
+
+    def create_many(self, project: str, items) -> int:
+        from context_core import manifest, operations
+
+        created = 0
+        for type, name, content in items:
+            operations.create_context(project, type, name, content, self.data_path, sync_manifest=False)
+            created += 1
+        manifest.refresh(self.data_path / project)
+        return created
+
+    def write(self, project: str, type: str, name: str, content: str) -> Path:
+        from context_core import operations
+
+        return operations.write_context(project, type, name, content, self.data_path)
+
+    def delete(self, project: str, type: str, name: str) -> Path:
+        from context_core import operations
+
+        return operations.delete_context(project, type, name, self.data_path)
+
+    def delete_project(self, project: str) -> Path:
+        from context_core import operations
+
+        return operations.delete_project(project, self.data_path)
+
+    def restore_project(self, project: str) -> Path:
+        from context_core import operations
+
+        return operations.restore_project(project, self.data_path)
+
+    def restore_context(self, project: str, type: str, name: str) -> Path:
+        from context_core import operations
+
+        return operations.restore_context(project, type, name, self.data_path)
+
+    def trash_entries(self) -> list:
+        from context_core import trash
+
+        # An entry whose info.json is missing is listed by its folder name
+        return [info or {"name": entry.name} for entry, info in trash.entries(self.data_path)]
+
+    def collect_trash(self, older_than: float = None, everything: bool = False, rate: float = None) -> dict:
+        from context_core import trash
+
+        return trash.collect(self.data_path, older_than, everything, rate)
+
+    def execute(self, op: str, args: dict):
+        from context_core import operations
+
+        return operations.execute_files(op, args, self.data_path)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT PRIMARY KEY,
+    meta TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS contexts (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    modified_ns INTEGER NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS contexts_key ON contexts (project, type, name);
+CREATE TABLE IF NOT EXISTS trash (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    project TEXT NOT NULL,
+    type TEXT,
+    name TEXT,
+    deleted_ns INTEGER NOT NULL,
+    meta TEXT
+);
+CREATE TABLE IF NOT EXISTS trashed_contexts (
+    entry INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    modified_ns INTEGER NOT NULL,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trashed_contexts_entry ON trashed_contexts (entry);
+"""
+
+
+class SQLiteStorage(Storage):
+    """All projects in one SQLite database under the data folder."""
+
+    def __init__(self, data_path: Path = DATA_DIR, database: Path = None):
+        import sqlite3
+
+        super().__init__(data_path)
+        self.database = database or data_path / DATABASE_NAME
+        self.database.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the daemon's threads, serialised by a lock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.database, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self.IntegrityError = sqlite3.IntegrityError
+
+    def close(self):
+        self._db.close()
+
+    @contextmanager
+    def _transaction(self):
+        """One write transaction, rolled back if the block raises."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _require_project(self, project: str):
+        if not self.project_exists(project):
+            raise ContextError(f"Project '{project}' does not exist.")
+
+    def init_project(self, project: str) -> Path:
+        meta = {
+            "project": project,
+            "created": datetime.now().isoformat(),
+            "context_types": VALID_CONTEXT_TYPES,
+        }
+        with self._lock:
+            try:
+                self._db.execute("INSERT INTO projects (name, meta) VALUES (?, ?)", (project, json.dumps(meta)))
+            except self.IntegrityError:
+                raise ContextExists(f"Project '{project}' already exists.")
+        return self.data_path / project
+
+    def project_exists(self, project: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM projects WHERE name = ?", (project,)).fetchone()
+        return row is not None
+
+    def projects(self) -> list:
+        with self._lock:
+            return [name for name, in self._db.execute("SELECT name FROM projects ORDER BY name")]
+
+    def list_contexts(self, project: str, type: str = None) -> dict:
+        self._require_project(project)
+        if type is not None and type not in VALID_CONTEXT_TYPES:
+            raise ContextError(f"Context type '{type}' does not exist in project '{project}'.")
+        folders = {t: [] for t in sorted([type] if type else VALID_CONTEXT_TYPES)}
+        with self._lock:
+            if type:
+                rows = self._db.execute(
+                    "SELECT type, name FROM contexts WHERE project = ? AND type = ? ORDER BY name", (project, type)
+                )
+            else:
+                rows = self._db.execute(
+                    "SELECT type, name FROM contexts WHERE project = ? ORDER BY type, name", (project,)
+                )
+            for row_type, name in rows:
+                folders[row_type].append(f"{name}.md")
+        return folders
+
+    def locate(self, project: str, type: str, name: str) -> Path:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM contexts WHERE project = ? AND type = ? AND name = ?", (project, type, name)
+            ).fetchone()
+        file_path = context_path(project, type, name, self.data_path)
+        if row is None:
+            raise ContextError(f"File '{file_path}' does not exist.")
+        return file_path
+
+    def read(self, project: str, type: str, name: str) -> str:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content FROM contexts WHERE project = ? AND type = ? AND name = ?", (project, type, name)
+            ).fetchone()
+        if row is None:
+            raise ContextError(f"File '{context_path(project, type, name, self.data_path)}' does not exist.")
+        return row[0]
+
+    def create(self, project: str, type: str, name: str, content: str = None) -> Path:
+        require_type(type)
+        self._require_project(project)
+        content = default_content(name) if content is None else content
+        with self._lock:
+            try:
+                self._db.execute(
+                    "INSERT INTO contexts (project, type, name, size, modified_ns, content) VALUES (?, ?, ?, ?, ?, ?)",
+                    (project, type, name, len(content.encode("utf-8")), time.time_ns(), content),
+                )
+            except self.IntegrityError:
+                raise ContextExists(f"File '{context_path(project, type, name, self.data_path)}' already exists.")
+        return context_path(project, type, name, self.data_path)
+
+    def create_many(self, project: str, items) -> int:
+        """
+        Insert every item in one transaction; if any already exists, none are kept.
+        """
+        self._require_project(project)
+        now = time.time_ns()
+        rows = []
+        for type, name, content in items:
+            require_type(type)
+            content = default_content(name) if content is None else content
+            rows.append((project, type, name, len(content.encode("utf-8")), now, content))
+
+        try:
+            with self._transaction() as db:
+                db.executemany(
+                    "INSERT INTO contexts (project, type, name, size, modified_ns, content) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+        except self.IntegrityError as e:
+            raise ContextExists(f"Some contexts already exist in project '{project}': {e}")
+        return len(rows)
+
+    def write(self, project: str, type: str, name: str, content: str) -> Path:
+        require_type(type)
+        self._require_project(project)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO contexts (project, type, name, size, modified_ns, content) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (project, type, name) DO UPDATE SET "
+                "size = excluded.size, modified_ns = excluded.modified_ns, content = excluded.content",
+                (project, type, name, len(content.encode("utf-8")), time.time_ns(), content),
+            )
+        return context_path(project, type, name, self.data_path)
+
+    @staticmethod
+    def _trash(db, kind: str, project: str, type: str = None, name: str = None, meta: str = None) -> int:
+        return db.execute(
+            "INSERT INTO trash (kind, project, type, name, deleted_ns, meta) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, project, type, name, time.time_ns(), meta),
+        ).lastrowid
+
+    @staticmethod
+    def _drop_entries(db, entries):
+        db.executemany("DELETE FROM trashed_contexts WHERE entry = ?", [(e,) for e in entries])
+        db.executemany("DELETE FROM trash WHERE id = ?", [(e,) for e in entries])
+
+    def delete(self, project: str, type: str, name: str) -> Path:
+        file_path = context_path(project, type, name, self.data_path)
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id FROM contexts WHERE project = ? AND type = ? AND name = ?", (project, type, name)
+            ).fetchone()
+            if row is None:
+                raise ContextError(f"File '{file_path}' does not exist.")
+            entry = self._trash(db, "context", project, type, name)
+            db.execute(
+                "INSERT INTO trashed_contexts (entry, type, name, size, modified_ns, content) "
+                "SELECT ?, type, name, size, modified_ns, content FROM contexts WHERE id = ?",
+                (entry, row[0]),
+            )
+            db.execute("DELETE FROM contexts WHERE id = ?", (row[0],))
+        return file_path
+
+    def delete_project(self, project: str) -> Path:
+        """
+        Move the project row and all its contexts to the trash in one transaction.
+        """
+        with self._transaction() as db:
+            row = db.execute("SELECT meta FROM projects WHERE name = ?", (project,)).fetchone()
+            if row is None:
+                raise ContextError(f"Project '{project}' does not exist.")
+            entry = self._trash(db, "project", project, meta=row[0])
+            db.execute(
+                "INSERT INTO trashed_contexts (entry, type, name, size, modified_ns, content) "
+                "SELECT ?, type, name, size, modified_ns, content FROM contexts WHERE project = ?",
+                (entry, project),
+            )
+            db.execute("DELETE FROM contexts WHERE project = ?", (project,))
+            db.execute("DELETE FROM projects WHERE name = ?", (project,))
+        return self.data_path / project
+
+    def restore_project(self, project: str) -> Path:
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id, meta FROM trash WHERE kind = 'project' AND project = ? ORDER BY id DESC LIMIT 1",
+                (project,),
+            ).fetchone()
+            if row is None:
+                raise ContextError(f"No deleted project '{project}' in the trash.")
+            try:
+                db.execute("INSERT INTO projects (name, meta) VALUES (?, ?)", (project, row[1]))
+            except self.IntegrityError:
+                raise ContextExists(f"Project '{project}' already exists.")
+            db.execute(
+                "INSERT INTO contexts (project, type, name, size, modified_ns, content) "
+                "SELECT ?, type, name, size, modified_ns, content FROM trashed_contexts WHERE entry = ?",
+                (project, row[0]),
+            )
+            self._drop_entries(db, [row[0]])
+        return self.data_path / project
+
+    def restore_context(self, project: str, type: str, name: str) -> Path:
+        require_type(type)
+        self._require_project(project)
+        file_path = context_path(project, type, name, self.data_path)
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT id FROM trash WHERE kind = 'context' AND project = ? AND type = ? AND name = ? "
+                "ORDER BY id DESC LIMIT 1",
+                (project, type, name),
+            ).fetchone()
+            if row is None:
+                raise ContextError(f"No deleted context '{type}/{name}' of project '{project}' in the trash.")
+            try:
+                db.execute(
+                    "INSERT INTO contexts (project, type, name, size, modified_ns, content) "
+                    "SELECT ?, type, name, size, modified_ns, content FROM trashed_contexts WHERE entry = ?",
+                    (project, row[0]),
+                )
+            except self.IntegrityError:
+                raise ContextExists(f"File '{file_path}' already exists.")
+            self._drop_entries(db, [row[0]])
+        return file_path
+
+    def trash_entries(self) -> list:
+        with self._lock:
+            rows = self._db.execute("SELECT kind, project, type, name, deleted_ns FROM trash ORDER BY id").fetchall()
+        found = []
+        for kind, project, type, name, deleted_ns in rows:
+            info = {"kind": kind, "project": project}
+            if type:
+                info.update(type=type, name=name)
+            info["deleted"] = datetime.fromtimestamp(deleted_ns / 1e9).isoformat(timespec="seconds")
+            info["deleted_ns"] = deleted_ns
+            found.append(info)
+        return found
+
+    def collect_trash(self, older_than: float = None, everything: bool = False, rate: float = None) -> dict:
+        """As `trash.collect`; `rate` does not apply to rows in the database."""
+        from context_core import trash
+
+        cutoff = time.time_ns() - int((trash.retention_seconds() if older_than is None else older_than) * 1e9)
+        with self._transaction() as db:
+            entries = [
+                entry for entry, in db.execute(
+                    "SELECT id FROM trash WHERE ? OR deleted_ns <= ?", (everything, cutoff)
+                )
+            ]
+            files, size = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM trashed_contexts "
+                "WHERE entry IN (SELECT id FROM trash WHERE ? OR deleted_ns <= ?)", (everything, cutoff)
+            ).fetchone()
+            self._drop_entries(db, entries)
+        return {"entries": len(entries), "files": files, "bytes": size}
+
+
+_opened = {}
+
+
+def open_storage(data_path: Path = DATA_DIR, backend: str = None) -> Storage:
+    """
+    Return the selected backend for `data_path`. SQLite connections are kept
+    open for the life of the process.
+    """
+    backend = backend or selected()
+    if backend == "files":
+        return FileStorage(data_path)
+    key = os.path.abspath(data_path)
+    if key not in _opened:
+        _opened[key] = SQLiteStorage(data_path)
+    return _opened[key]
@@ -0,0 +1,244 @@
+"""
+In-process Python API for Context Core.
+
+`ContextStore` is what the CLI, the daemon and embedding services use to
+work with projects and context files without going through Typer:
+
+    from context_core.store import ContextStore
+
+    store = ContextStore("projects_data")
+    store.init_project("notes")
+    store.write("notes", "facts", "deploy", "# Deploy\\n...")
+    for file in store.list("notes", "facts"):
+        print(file.name, store.read(file.project, file.type, file.name))
+
+Methods return `Project` and `ContextFile` objects and raise
+`operations.ContextError` (or a subclass) with a user-facing message.
+
+Reads of loose files go through a `ContentCache`: contents keyed by path
+and validated against (mtime_ns, size), evicted least-recently-used past a
+byte budget. A repeated read of an unchanged file costs one stat. Every
+read of a file is counted for tiering (see access.py), cached or not.
+"""
+import io
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from context_core import access, operations, storage, trace
+from context_core.constants import DATA_DIR, VALID_CONTEXT_TYPES
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Project:
+    name: str
+    path: Path
+
+
+@dataclass(frozen=True)
+class ContextFile:
+    project: str
+    type: str
+    name: str
+    path: Path
+
+    @property
+    def file_name(self) -> str:
+        return f"{self.name}.md"
+
+
+class ContentCache:
+    """
+    File contents keyed by path, valid while (mtime_ns, size) is unchanged,
+    holding at most `max_bytes` of text (least recently used evicted first).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def read(self, path: Path) -> str:
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == key:
+                # Dicts keep insertion order: moving a hit to the end makes the front the least recent
+                del self._entries[path]
+                self._entries[path] = entry
+                self.hits += 1
+                trace.count("cache_hits")
+                return entry[1]
+        text = Path(path).read_text()
+        trace.count("bytes_read", st.st_size)
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old:
+                self.bytes -= old[0][1]
+            if st.st_size <= self.max_bytes:
+                self._entries[path] = (key, text)
+                self.bytes += st.st_size
+                while self.bytes > self.max_bytes:
+                    evicted = self._entries.pop(next(iter(self._entries)))
+                    self.bytes -= evicted[0][1]
+        return text
+
+    def lines(self, path: Path):
+        # Split on "\n" only, as reading the file line by line and
+        # dedup.file_units do, so dedup line numbers match
+        return io.StringIO(self.read(path)).readlines()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+class ContextStore:
+    """Projects and context files under one data folder."""
+
+    def __init__(self, data_path=DATA_DIR, backend: str = None, cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self.data_path = Path(data_path)
+        self.storage = storage.open_storage(self.data_path, backend)
+        self.cache = ContentCache(cache_bytes)
+
+    @property
+    def files_backend(self) -> bool:
+        return isinstance(self.storage, storage.FileStorage)
+
+    def require_files(self, op: str):
+        """Raise `storage.files_only(op)` unless this store is on the file backend."""
+        if not self.files_backend:
+            raise storage.files_only(op)
+
+    def _file(self, project: str, type: str, name: str, path: Path) -> ContextFile:
+        return ContextFile(project, type, name, Path(path))
+
+    # ── projects ─────────────────────────────────────────────
+    def projects(self) -> list:
+        return [Project(name, self.data_path / name) for name in self.storage.projects()]
+
+    def project(self, name: str) -> Project:
+        if not self.storage.project_exists(name):
+            raise operations.ContextError(f"Project '{name}' does not exist.")
+        return Project(name, self.data_path / name)
+
+    def init_project(self, name: str) -> Project:
+        return Project(name, Path(self.storage.init_project(name)))
+
+    def delete_project(self, name: str) -> Project:
+        """Move a project to the trash."""
+        return Project(name, Path(self.storage.delete_project(name)))
+
+    def restore_project(self, name: str) -> Project:
+        return Project(name, Path(self.storage.restore_project(name)))
+
+    def meta(self, name: str) -> dict:
+        project = self.project(name)
+        try:
+            with open(project.path / "meta.json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"project": name}
+
+    # ── context files ────────────────────────────────────────
+    def types(self) -> list:
+        return list(VALID_CONTEXT_TYPES)
+
+    def list(self, project: str, type: str = None) -> list:
+        """
+        Return the project's context files (or only those of `type`), by type then name.
+        """
+        folders = self.storage.list_contexts(project, type)
+        return [
+            self._file(project, folder, file_name[:-len(".md")], operations.context_path(
+                project, folder, file_name[:-len(".md")], self.data_path))
+            for folder, names in sorted(folders.items())
+            for file_name in names
+        ]
+
+    def listing(self, project: str, type: str = None) -> dict:
+        """The {type: ["name.md", ...]} mapping `list-contexts` prints."""
+        return self.storage.list_contexts(project, type)
+
+    def get(self, project: str, type: str, name: str) -> ContextFile:
+        return self._file(project, type, name, self.storage.locate(project, type, name))
+
+    def read(self, project: str, type: str, name: str) -> str:
+        if not self.files_backend:
+            return self.storage.read(project, type, name)
+        try:
+            text = self.cache.read(operations.context_path(project, type, name, self.data_path))
+        except FileNotFoundError:
+            text = self.storage.read(project, type, name)  # packed archive, or missing: the backend knows which
+        access.record(self.data_path / project, f"{type}/{name}.md")
+        return text
+
+    def view(self, project: str, type: str, name: str, section: str = None, byte_range: str = None) -> str:
+        """
+        Read a whole file, or one section (heading title) or byte range ("START:END") of it.
+        """
+        if not section and not byte_range:
+            return self.read(project, type, name)
+        if not self.files_backend:
+            raise operations.ContextError("Sections and byte ranges need the file storage backend.")
+        return "".join(operations.stream_context(project, type, name, section, byte_range, self.data_path))
+
+    def create(self, project: str, type: str, name: str, content: str = None) -> ContextFile:
+        """Create a context file (from the default template unless `content` is given)."""
+        return self._file(project, type, name, self.storage.create(project, type, name, content))
+
+    def write(self, project: str, type: str, name: str, content: str) -> ContextFile:
+        """Replace a context file's content, creating it if needed."""
+        return self._file(project, type, name, self.storage.write(project, type, name, content))
+
+    def delete(self, project: str, type: str, name: str) -> ContextFile:
+        return self._file(project, type, name, self.storage.delete(project, type, name))
+
+    def restore(self, project: str, type: str, name: str) -> ContextFile:
+        return self._file(project, type, name, self.storage.restore_context(project, type, name))
+
+    # ── trash ────────────────────────────────────────────────
+    def trash(self) -> list:
+        """What the trash holds ({kind, project, type, name, deleted}), oldest first."""
+        return self.storage.trash_entries()
+
+    def collect_trash(self, older_than: float = None, everything: bool = False, rate: float = None) -> dict:
+        """Permanently delete expired trash entries (see trash.collect)."""
+        return self.storage.collect_trash(older_than, everything, rate)
+
+    # ── higher-level reads ───────────────────────────────────
+    def search(self, query: str, project: str = None, type: str = None, limit: int = 10) -> list:
+        return self.execute("search", {"query": query, "project": project, "type": type, "limit": limit})
+
+    def load(self, project: str, types=None, max_tokens: int = None, priority=None, query: str = None,
+             dedup: float = None) -> str:
+        """The prompt-ready text `context load` prints."""
+        return self.execute("load", {
+            "project": project, "types": types or [], "max_tokens": max_tokens,
+            "priority": priority or [], "query": query, "dedup": dedup,
+        })
+
+    def assemble(self, project: str, types=None, max_tokens: int = None, priority=None) -> dict:
+        """
+        The prompt-cache-friendly layout of `load --cache-friendly`, with
+        per-block fingerprints (see loader.assemble).
+        """
+        return self.execute("assemble", {
+            "project": project, "types": types or [], "max_tokens": max_tokens, "priority": priority or [],
+        })
+
+    def execute(self, op: str, args: dict):
+        """Run one daemon/batch operation, reads served from this store's cache."""
+        if self.files_backend:
+            return operations.execute_files(op, args, self.data_path, self.cache)
+        return self.storage.execute(op, args)
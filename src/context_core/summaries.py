@@ -0,0 +1,153 @@
+"""
+Incremental cumulative summary over a project's session summaries.
+
+Session summaries are date-named files (`summaries/2025-05-22.md`). Folding
+them into `summaries/cumulative.md` keeps a checkpoint under
+`.cache/cumulative.json` with the content hash of every folded file and the
+merged sections, so each run only reads the sessions written since then.
+If a session at or before the checkpoint was edited, removed or back-dated
+in, the whole history is folded again:
+
+- Key Accomplishments and Insights accumulate (deduplicated, tagged with the
+  session date they came from)
+- Next Steps are replaced by the newest session's list, since older ones are
+  either done or carried forward by the sessions that followed
+"""
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from context_core import fileio, manifest
+
+CHECKPOINT_PATH = Path(".cache") / "cumulative.json"
+CHECKPOINT_VERSION = 2
+CUMULATIVE_NAME = "cumulative.md"
+
+ACCUMULATED_SECTIONS = ["Key Accomplishments", "Insights"]
+LATEST_SECTIONS = ["Next Steps"]
+
+SESSION_RE = re.compile(r"^\d{4}-\d{2}-\d{2}.*\.md$")
+HEADING_RE = re.compile(r"^#{2,}\s+(.*?)\s*$")
+BULLET_RE = re.compile(r"^\s*[-*+]\s+(.*?)\s*$")
+
+
+def _empty():
+    return {
+        "version": CHECKPOINT_VERSION,
+        "last": None,
+        "folded": {},
+        "sessions": 0,
+        "first_session": None,
+        "sections": {name: [] for name in ACCUMULATED_SECTIONS + LATEST_SECTIONS},
+    }
+
+
+def read_checkpoint(project_path: Path) -> dict:
+    try:
+        with open(project_path / CHECKPOINT_PATH) as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return _empty()
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        return _empty()
+    return checkpoint
+
+
+def parse_sections(text: str) -> dict:
+    """
+    Map each `## Heading` of a summary to the bullet points under it.
+    """
+    sections = {}
+    current = None
+    for line in text.splitlines():
+        heading = HEADING_RE.match(line)
+        if heading:
+            current = sections.setdefault(heading.group(1), [])
+            continue
+        bullet = BULLET_RE.match(line)
+        if bullet and current is not None and bullet.group(1):
+            current.append(bullet.group(1))
+    return sections
+
+
+def session_hashes(project_path: Path) -> dict:
+    """
+    Map each date-named session summary, oldest first, to its content hash
+    (from a deep manifest refresh, so in-place edits are noticed).
+    """
+    record = manifest.refresh(project_path, deep=True)["folders"].get("summaries", {"files": {}})
+    return {name: record["files"][name]["hash"] for name in sorted(record["files"]) if SESSION_RE.match(name)}
+
+
+def _fold(checkpoint: dict, session: str, text: str):
+    sections = parse_sections(text)
+    for name in ACCUMULATED_SECTIONS:
+        merged = checkpoint["sections"][name]
+        seen = {item["text"] for item in merged}
+        for bullet in sections.get(name, []):
+            if bullet not in seen:
+                seen.add(bullet)
+                merged.append({"text": bullet, "session": session})
+    for name in LATEST_SECTIONS:
+        if sections.get(name):
+            checkpoint["sections"][name] = [{"text": bullet, "session": session} for bullet in sections[name]]
+    checkpoint["sessions"] += 1
+    checkpoint["first_session"] = checkpoint["first_session"] or session
+
+
+def render(project: str, checkpoint: dict) -> str:
+    last = checkpoint["last"][:-3] if checkpoint["last"] else None
+    lines = [
+        f"# Cumulative Summary – {project}",
+        "",
+        f"Sessions folded: {checkpoint['sessions']} ({checkpoint['first_session']} → {last})",
+    ]
+    for name in ACCUMULATED_SECTIONS + LATEST_SECTIONS:
+        lines += ["", f"## {name}"]
+        lines += [f"- {item['text']} ({item['session']})" for item in checkpoint["sections"][name]]
+    return "\n".join(lines) + "\n"
+
+
+def update_cumulative(project_path: Path, rebuild: bool = False) -> dict:
+    """
+    Fold session summaries newer than the checkpoint into the cumulative
+    document. If a session at or before the checkpoint changed, appeared or
+    was removed since, the whole history is folded again.
+
+    Returns {"folded": [...], "sessions": total, "rebuilt": bool, "path": Path}.
+    """
+    checkpoint = read_checkpoint(project_path)
+    folder = project_path / "summaries"
+    sessions = session_hashes(project_path)
+
+    last = checkpoint["last"]
+    if last and not rebuild:
+        earlier = {name: digest for name, digest in sessions.items() if name <= last}
+        rebuild = earlier != checkpoint["folded"]
+    if rebuild or not last:
+        checkpoint = _empty()
+        pending = list(sessions)
+    else:
+        # Names sort chronologically, so everything after the checkpoint is new
+        pending = [name for name in sessions if name > last]
+
+    for name in pending:
+        data = (folder / name).read_bytes()
+        _fold(checkpoint, name[:-3], data.decode("utf-8"))
+        checkpoint["last"] = name
+        checkpoint["folded"][name] = hashlib.sha256(data).hexdigest()
+
+    output_path = folder / CUMULATIVE_NAME
+    if pending or not output_path.exists():
+        fileio.atomic_write(output_path, render(project_path.name, checkpoint))
+        (project_path / CHECKPOINT_PATH).parent.mkdir(parents=True, exist_ok=True)
+        fileio.atomic_write_json(project_path / CHECKPOINT_PATH, checkpoint)
+        manifest.update_entry(project_path, "summaries", CUMULATIVE_NAME)
+
+    return {
+        "folded": [name[:-3] for name in pending],
+        "sessions": checkpoint["sessions"],
+        "rebuilt": bool(rebuild and last),
+        "path": output_path,
+    }
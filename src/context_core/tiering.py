@@ -0,0 +1,198 @@
+"""
+Hot/cold tiering: keep the active working set small without manual curation.
+
+A file is cold once neither a read (see access.py) nor an edit has touched
+it for `days` days. Cold files move to `archives/.cold/<type>/<name>.md`,
+out of every listing, load, search and stats total, and every derived index
+is updated for them. Asking for one again (view, edit, delete) moves it
+straight back.
+
+Nothing is called cold before access accounting has run for `days` days,
+so a project whose access log is new or was lost is left alone.
+Instructions, personas and archives are never tiered.
+
+`context tier PROJECT --auto DAYS` stores the policy in meta.json; the
+policy then runs at most once a day, when a command flushes its access
+counters.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+from context_core import access, events, fileio, manifest
+from context_core.constants import VALID_CONTEXT_TYPES
+
+COLD_DIR = Path("archives") / ".cold"
+DEFAULT_COLD_DAYS = 30
+PINNED_TYPES = ("instructions", "personas", "archives")
+POLICY_KEY = "tier_after_days"
+STATE_PATH = Path(".cache") / "tiering.json"
+DAY_NS = 24 * 3600 * 10**9
+RUN_INTERVAL_NS = DAY_NS
+
+
+def cold_path(project_path: Path, type: str, name: str) -> Path:
+    return project_path / COLD_DIR / type / f"{name}.md"
+
+
+def cold_files(project_path: Path) -> list:
+    """Sorted "type/name.md" paths of the project's cold files."""
+    found = []
+    root = project_path / COLD_DIR
+    if not root.exists():
+        return found
+    with os.scandir(root) as folders:
+        for folder in folders:
+            if not folder.is_dir():
+                continue
+            with os.scandir(folder.path) as entries:
+                found.extend(f"{folder.name}/{e.name}" for e in entries if e.name.endswith(".md") and e.is_file())
+    return sorted(found)
+
+
+def _cold_days(project_path: Path, days):
+    """`days` if given, else the project's policy, else DEFAULT_COLD_DAYS."""
+    if days is None:
+        days = policy(project_path)
+    return DEFAULT_COLD_DAYS if days is None else days
+
+
+def has_history(project_path: Path, days: float = None, now_ns: int = None) -> bool:
+    """
+    True once access accounting has covered `days` days (default: the
+    project's policy, else DEFAULT_COLD_DAYS).
+    """
+    days = _cold_days(project_path, days)
+    now_ns = time.time_ns() if now_ns is None else now_ns
+    started = access.since(project_path)
+    return started is not None and started <= now_ns - int(days * DAY_NS)
+
+
+def candidates(project_path: Path, days: float, now_ns: int = None) -> list:
+    """
+    Return [{path, last_used_ns, reads}] for the files unused for `days`
+    days, least recently used first.
+    """
+    now_ns = time.time_ns() if now_ns is None else now_ns
+    if not has_history(project_path, days, now_ns):
+        return []  # too little history to tell cold from unrecorded
+    cutoff = now_ns - int(days * DAY_NS)
+    counts = access.counters(project_path)
+    found = []
+    for folder, record in manifest.refresh(project_path, deep=True)["folders"].items():
+        if folder in PINNED_TYPES or folder not in VALID_CONTEXT_TYPES:
+            continue
+        for entry in record["files"].values():
+            seen = counts.get(entry["path"], {"count": 0, "last_ns": 0})
+            last_used = max(seen["last_ns"], entry["mtime_ns"])
+            if last_used < cutoff:
+                found.append({"path": entry["path"], "last_used_ns": last_used, "reads": seen["count"]})
+    return sorted(found, key=lambda c: (c["last_used_ns"], c["path"]))
+
+
+def _sync(project_path: Path, paths):
+    from context_core import watch
+
+    watch.sync_files(project_path, paths)
+
+
+def demote(project_path: Path, paths) -> list:
+    """
+    Move `paths` ("type/name.md") into cold storage; returns those moved.
+    """
+    moved = []
+    for path in paths:
+        source = project_path / path
+        target = project_path / COLD_DIR / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with fileio.lock(source):
+            try:
+                os.replace(source, target)
+            except FileNotFoundError:
+                continue
+        moved.append(path)
+    if moved:
+        _sync(project_path, moved)
+        for path in moved:
+            type, name = path.split("/", 1)
+            events.record(project_path, "cold", type, name[:-len(".md")])
+    return moved
+
+
+def promote(project_path: Path, type: str, name: str):
+    """
+    Move a cold file back into its type folder and return its path, or None
+    if it is not in cold storage.
+    """
+    source = cold_path(project_path, type, name)
+    target = project_path / type / f"{name}.md"
+    if not source.exists() or not target.parent.is_dir():
+        return None
+    with fileio.lock(target):
+        if target.exists():
+            return target
+        try:
+            os.replace(source, target)
+        except FileNotFoundError:
+            return None
+    _sync(project_path, [f"{type}/{name}.md"])
+    access.record(project_path, f"{type}/{name}.md")
+    events.record(project_path, "warm", type, name)
+    return target
+
+
+def policy(project_path: Path):
+    """The project's automatic tiering age in days, or None."""
+    try:
+        with open(project_path / "meta.json") as f:
+            return json.load(f).get(POLICY_KEY)
+    except (OSError, ValueError):
+        return None
+
+
+def set_policy(project_path: Path, days):
+    with manifest.project_lock(project_path):
+        try:
+            with open(project_path / "meta.json") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {"project": project_path.name}
+        if days:
+            meta[POLICY_KEY] = days
+        else:
+            meta.pop(POLICY_KEY, None)
+        fileio.atomic_write(project_path / "meta.json", json.dumps(meta, indent=2))
+
+
+def apply(project_path: Path, days: float = None, dry_run: bool = False, now_ns: int = None) -> list:
+    """
+    Demote every file unused for `days` (default: the project's policy, else
+    DEFAULT_COLD_DAYS). Returns the candidates; with `dry_run` nothing moves.
+    """
+    days = _cold_days(project_path, days)
+    now_ns = time.time_ns() if now_ns is None else now_ns
+    found = candidates(project_path, days, now_ns)
+    if not dry_run:
+        demote(project_path, [c["path"] for c in found])
+        state_path = project_path / STATE_PATH
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        fileio.atomic_write_json(state_path, {"last_run_ns": now_ns, "days": days})
+    return found
+
+
+def run_due(project_path: Path, now_ns: int = None) -> list:
+    """
+    Apply the project's policy if it has one and has not run in the last day.
+    """
+    if not policy(project_path):
+        return []
+    now_ns = time.time_ns() if now_ns is None else now_ns
+    try:
+        with open(project_path / STATE_PATH) as f:
+            last_run = json.load(f).get("last_run_ns", 0)
+    except (OSError, ValueError):
+        last_run = 0
+    if now_ns - last_run < RUN_INTERVAL_NS:
+        return []
+    return apply(project_path, now_ns=now_ns)
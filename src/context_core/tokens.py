@@ -0,0 +1,181 @@
+"""
+Token accounting with a per-project cache keyed by content hash.
+
+Counts are cached under `.cache/tokens.json`, one LRU table per tokenizer:
+content hash -> token count. A file is only tokenized again once its content
+changes, so totals for a whole project come from the cache after the first
+run. Packed archives are keyed by `ArchiveStore.content_hash`, the same
+hash the loose file had, so packing or compacting them costs no recount.
+
+Tokenizers are plain `text -> int` functions registered by name:
+
+- `approx` (default): characters / 4, the same estimate `load` budgets with
+- `words`: words and punctuation marks, closer for code and dense notes
+- `tiktoken`: OpenAI's cl100k_base encoding, if `tiktoken` is installed
+
+Others can be added with `register_tokenizer`. CONTEXT_TOKENIZER picks the
+default.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+from context_core import fileio, manifest, trace
+from context_core.loader import estimate_tokens
+from context_core.operations import ContextError
+
+CACHE_PATH = Path(".cache") / "tokens.json"
+CACHE_VERSION = 1
+CACHE_LIMIT = 20_000
+TOKENIZER_ENV = "CONTEXT_TOKENIZER"
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _count_words(text: str) -> int:
+    return sum(1 for _ in WORD_RE.finditer(text))
+
+
+def _count_tiktoken(text: str) -> int:
+    try:
+        import tiktoken
+    except ImportError:
+        raise ContextError("The 'tiktoken' tokenizer needs the tiktoken package: pip install tiktoken")
+    return len(tiktoken.get_encoding("cl100k_base").encode(text, disallowed_special=()))
+
+
+TOKENIZERS = {
+    "approx": estimate_tokens,
+    "words": _count_words,
+    "tiktoken": _count_tiktoken,
+}
+
+
+def register_tokenizer(name: str, count):
+    """
+    Make `count(text) -> int` available as tokenizer `name`.
+    """
+    TOKENIZERS[name] = count
+
+
+def get_tokenizer(name: str = None):
+    name = name or os.environ.get(TOKENIZER_ENV) or "approx"
+    if name not in TOKENIZERS:
+        raise ContextError(f"Unknown tokenizer '{name}'. Use one of: {', '.join(sorted(TOKENIZERS))}.")
+    return name, TOKENIZERS[name]
+
+
+class TokenCache:
+    """LRU tables of content hash -> token count, one per tokenizer."""
+
+    def __init__(self, project_path: Path, limit: int = CACHE_LIMIT):
+        self.path = project_path / CACHE_PATH
+        self.limit = limit
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.tables = data.get("tokenizers", {}) if data.get("version") == CACHE_VERSION else {}
+
+    def get(self, tokenizer: str, key: str):
+        table = self.tables.get(tokenizer)
+        if not table or key not in table:
+            return None
+        # Dicts keep insertion order: moving a hit to the end makes the front the least recent
+        count = table.pop(key)
+        table[key] = count
+        return count
+
+    def put(self, tokenizer: str, key: str, count: int):
+        table = self.tables.setdefault(tokenizer, {})
+        table.pop(key, None)
+        table[key] = count
+        while len(table) > self.limit:
+            del table[next(iter(table))]
+        self.dirty = True
+
+    def save(self):
+        # Recency changes alone are not worth a write; they are saved with the next miss
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fileio.atomic_write_json(self.path, {"version": CACHE_VERSION, "tokenizers": self.tables})
+        self.dirty = False
+
+
+def _count_entry(project_path: Path, entry: dict, cache: TokenCache, name: str, count) -> int:
+    tokens = cache.get(name, entry["hash"])
+    if tokens is None:
+        trace.count("files_read")
+        text = (project_path / entry["path"]).read_text(encoding="utf-8", errors="replace")
+        tokens = count(text)
+        cache.put(name, entry["hash"], tokens)
+    return tokens
+
+
+def count_files(project_path: Path, tokenizer: str = None, folders: dict = None) -> dict:
+    """
+    Map every context file of a project ("type/name.md") to its token count,
+    tokenizing only content the cache has not seen. `folders` reuses the
+    folders of a deep manifest refresh the caller already made.
+    """
+    name, count = get_tokenizer(tokenizer)
+    cache = TokenCache(project_path)
+    counts = {}
+
+    if folders is None:
+        folders = manifest.refresh(project_path, deep=True)["folders"]
+    for record in folders.values():
+        for entry in record["files"].values():
+            counts[entry["path"]] = _count_entry(project_path, entry, cache, name, count)
+
+    if "archives" in folders:
+        from context_core.archives import ArchiveStore
+
+        store = ArchiveStore(project_path)
+        for archive in store.names():
+            rel = f"archives/{archive}.md"
+            if rel in counts:
+                continue
+            key = store.content_hash(archive)
+            tokens = cache.get(name, key)
+            if tokens is None:
+                tokens = count(store.read(archive))
+                cache.put(name, key, tokens)
+            counts[rel] = tokens
+
+    cache.save()
+    return counts
+
+
+def count_paths(project_path: Path, paths, tokenizer: str = None) -> dict:
+    """
+    Map just `paths` ("type/name.md") to their token counts, from the cache
+    where their current hash is known. Files that are gone are skipped.
+    """
+    name, count = get_tokenizer(tokenizer)
+    cache = TokenCache(project_path)
+    folders = manifest.read_manifest(project_path)["folders"]
+    counts = {}
+    for path in paths:
+        context_type, file_name = path.split("/", 1)
+        entry = folders.get(context_type, {}).get("files", {}).get(file_name)
+        if entry is not None:
+            counts[path] = _count_entry(project_path, entry, cache, name, count)
+    cache.save()
+    return counts
+
+
+def project_totals(project_path: Path, tokenizer: str = None, folders: dict = None) -> dict:
+    """
+    Return {type: {"files": n, "tokens": t}} for a project, types sorted.
+    """
+    totals = {}
+    for rel, tokens in count_files(project_path, tokenizer, folders).items():
+        folder = totals.setdefault(rel.split("/", 1)[0], {"files": 0, "tokens": 0})
+        folder["files"] += 1
+        folder["tokens"] += tokens
+    return dict(sorted(totals.items()))
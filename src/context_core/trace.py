@@ -0,0 +1,169 @@
+"""
+Opt-in timing instrumentation.
+
+Tracing is off unless enabled with the global `--profile` flag or the
+CONTEXT_TRACE environment variable:
+
+    CONTEXT_TRACE=1 context list-contexts my-work           # summary on stderr
+    CONTEXT_TRACE=trace.json context load -p my-work        # Chrome trace-event JSON
+    CONTEXT_PROFILE=out.prof context search editor          # also dump cProfile stats
+
+Code marks work with `span(name)` (import, resolve, fs, read, output, ...)
+and `count(name, n)` (bytes_read, files_stat, ...). While tracing is off both
+return immediately, so the instrumentation can stay in hot paths. While it
+is on, spans and counters from the daemon's and scan's worker threads are
+recorded under a lock.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = "CONTEXT_TRACE"
+PROFILE_ENV = "CONTEXT_PROFILE"
+
+_active = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "began")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.began = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if _active is not None:
+            _active.record(self.name, self.began, time.perf_counter())
+        return False
+
+
+class _Trace:
+    def __init__(self, destination: str, began: float, profile_path: str = None):
+        self.destination = destination
+        self.began = began
+        self.totals = {}
+        self.counters = {}
+        self.events = []
+        self.lock = threading.Lock()
+        self.profiler = None
+        self.profile_path = profile_path
+        if profile_path:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def record(self, name: str, began: float, ended: float):
+        with self.lock:
+            calls, total = self.totals.get(name, (0, 0.0))
+            self.totals[name] = (calls + 1, total + ended - began)
+            self.events.append((name, began, ended))
+
+    def count(self, name: str, n: int):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self):
+        ended = time.perf_counter()
+        if self.profiler:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profile_path)
+
+        if self.destination in ("1", "stderr"):
+            self._write_summary(ended)
+        else:
+            self._write_json(ended)
+
+    def _write_summary(self, ended: float):
+        lines = [f"⏱️ trace: {(ended - self.began) * 1000:.2f} ms total", f"  {'span':<12}{'calls':>7}{'total ms':>11}"]
+        for name, (calls, total) in sorted(self.totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {name:<12}{calls:>7}{total * 1000:>11.3f}")
+        if self.counters:
+            lines.append("  counters: " + " ".join(f"{k}={v}" for k, v in sorted(self.counters.items())))
+        print("\n".join(lines), file=sys.stderr, flush=True)
+
+    def _write_json(self, ended: float):
+        # Chrome trace-event format, viewable in chrome://tracing or Perfetto
+        events = [
+            {"name": name, "ph": "X", "pid": os.getpid(), "tid": 0,
+             "ts": round((began - self.began) * 1e6, 1), "dur": round((end - began) * 1e6, 1)}
+            for name, began, end in self.events
+        ]
+        data = {
+            "traceEvents": events,
+            "total_ms": round((ended - self.began) * 1000, 3),
+            "spans": {name: {"calls": c, "total_ms": round(t * 1000, 3)} for name, (c, t) in self.totals.items()},
+            "counters": self.counters,
+        }
+        with open(self.destination, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+def span(name: str):
+    """
+    Time a block: `with span("read"): ...`. Free when tracing is off.
+    """
+    if _active is None:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def count(name: str, n: int = 1):
+    active = _active
+    if active is not None:
+        active.count(name, n)
+
+
+def record(name: str, began: float, ended: float):
+    """
+    Record a span measured elsewhere (e.g. module imports before tracing began).
+    """
+    if _active is not None:
+        _active.record(name, began, ended)
+
+
+def start(destination: str = None, began: float = None) -> bool:
+    """
+    Start tracing if requested by `destination` or CONTEXT_TRACE. Returns
+    True if this call started it.
+    """
+    global _active
+    destination = destination or os.environ.get(TRACE_ENV)
+    if not destination and os.environ.get(PROFILE_ENV):
+        destination = "stderr"
+    if _active is not None or not destination or destination == "0":
+        return False
+    _active = _Trace(destination, began or time.perf_counter(), os.environ.get(PROFILE_ENV))
+    return True
+
+
+def finish():
+    """
+    Stop tracing and write the report.
+    """
+    global _active
+    if _active is not None:
+        trace, _active = _active, None
+        trace.report()
@@ -0,0 +1,160 @@
+"""
+Deferred deletion through `projects_data/.trash/`.
+
+Deleting a project or a context file renames it into a fresh trash entry,
+which is O(1) however big it is:
+
+    .trash/<deleted ns>-<label>/info.json   what was deleted, from where, when
+    .trash/<deleted ns>-<label>/item        the project folder or context file
+
+`restore` renames it back. `collect` reclaims entries older than the
+retention window (7 days unless CONTEXT_TRASH_DAYS says otherwise), deleting
+file by file and optionally sleeping to stay under a byte rate, so it can
+run in the background without starving other I/O.
+"""
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+from context_core import fileio
+
+TRASH_NAME = ".trash"
+ITEM_NAME = "item"
+INFO_NAME = "info.json"
+RETENTION_ENV = "CONTEXT_TRASH_DAYS"
+DEFAULT_RETENTION_DAYS = 7
+
+
+def retention_seconds() -> float:
+    try:
+        return float(os.environ.get(RETENTION_ENV, DEFAULT_RETENTION_DAYS)) * 86_400
+    except ValueError:
+        return DEFAULT_RETENTION_DAYS * 86_400
+
+
+def move_to_trash(data_path: Path, source: Path, info: dict) -> Path:
+    """
+    Rename `source` into a new trash entry described by `info` and return the entry.
+    """
+    trash_path = data_path / TRASH_NAME
+    trash_path.mkdir(exist_ok=True)
+    deleted_ns = time.time_ns()
+    label = "--".join(info[key] for key in ("project", "type", "name") if info.get(key))
+    entry = trash_path / f"{deleted_ns}-{label}"
+    entry.mkdir()
+
+    info = dict(info, deleted=datetime.now().isoformat(timespec="seconds"), deleted_ns=deleted_ns)
+    try:
+        fileio.atomic_write_json(entry / INFO_NAME, info, fsync=True)
+        os.rename(source, entry / ITEM_NAME)
+    except BaseException:
+        shutil.rmtree(entry, ignore_errors=True)
+        raise
+    return entry
+
+
+def entries(data_path: Path):
+    """
+    Return (entry path, info) for every trash entry, oldest first. Entries
+    whose info is missing (e.g. a collection was interrupted) get an empty dict.
+    """
+    trash_path = data_path / TRASH_NAME
+    if not trash_path.exists():
+        return []
+    found = []
+    for entry in sorted(trash_path.iterdir(), key=lambda p: p.name):
+        if not entry.is_dir():
+            continue
+        try:
+            with open(entry / INFO_NAME) as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            info = {}
+        found.append((entry, info))
+    return found
+
+
+def find(data_path: Path, kind: str, project: str, type: str = None, name: str = None):
+    """
+    Return the most recent trash entry matching, or None.
+    """
+    for entry, info in reversed(entries(data_path)):
+        if info.get("kind") == kind and info.get("project") == project \
+                and info.get("type") == type and info.get("name") == name:
+            return entry
+    return None
+
+
+def restore(entry: Path, target: Path):
+    """
+    Rename a trash entry's item back to `target` and drop the entry.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    os.rename(entry / ITEM_NAME, target)
+    (entry / INFO_NAME).unlink(missing_ok=True)
+    entry.rmdir()
+
+
+def _deleted_ns(entry: Path, info: dict) -> int:
+    # The entry name starts with the deletion time, even before info.json is written
+    try:
+        return info.get("deleted_ns") or int(entry.name.split("-", 1)[0])
+    except ValueError:
+        return 0
+
+
+class _Remover:
+    """Deletes files one by one, sleeping to stay under `rate` bytes per second."""
+
+    def __init__(self, rate: float = None):
+        self.rate = rate
+        self.pending = 0
+        self.files = 0
+        self.bytes = 0
+
+    def remove(self, path: Path):
+        size = path.lstat().st_size
+        path.unlink()
+        self.files += 1
+        self.bytes += size
+        if self.rate:
+            self.pending += size
+            # Sleep in slices of at least 1 MiB so small files do not each pay a syscall
+            if self.pending >= 1 << 20:
+                time.sleep(self.pending / self.rate)
+                self.pending = 0
+
+
+def collect(data_path: Path, older_than: float = None, everything: bool = False, rate: float = None) -> dict:
+    """
+    Permanently delete trash entries older than `older_than` seconds (the
+    retention window by default), or all of them with `everything`.
+
+    `rate` caps deletion at that many bytes per second.
+    """
+    cutoff = time.time_ns() - int((retention_seconds() if older_than is None else older_than) * 1e9)
+    remover = _Remover(rate)
+    collected = 0
+
+    for entry, info in entries(data_path):
+        if not everything and _deleted_ns(entry, info) > cutoff:
+            continue
+        item = entry / ITEM_NAME
+        if item.is_dir() and not item.is_symlink():
+            for root, dirs, files in os.walk(item, topdown=False):
+                for name in files:
+                    remover.remove(Path(root) / name)
+                for name in dirs:
+                    path = Path(root) / name
+                    path.unlink() if path.is_symlink() else path.rmdir()
+            item.rmdir()
+        elif item.exists() or item.is_symlink():
+            remover.remove(item)
+        # info.json goes last so an interrupted collection can be resumed
+        (entry / INFO_NAME).unlink(missing_ok=True)
+        entry.rmdir()
+        collected += 1
+    return {"entries": collected, "files": remover.files, "bytes": remover.bytes}
@@ -0,0 +1,303 @@
+"""
+Keep derived state in sync with context files edited outside the CLI.
+
+`context watch` follows changes under `projects_data/` (editors, git pulls,
+scripts) and, for just the files that changed, updates the manifest, the
+search index, the section index and the token cache. Change notifications
+come from inotify on Linux (through ctypes, no extra dependency) and from
+polling file stats elsewhere or with `--poll`.
+
+Events are debounced: a burst (an editor's save dance, a checkout touching
+hundreds of files) is applied once things have been quiet for `debounce`
+seconds, or after `max_wait` at the latest. A project is only rescanned in
+full when the watcher starts, when a project or type folder appears, or when
+the kernel event queue overflowed.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from context_core import manifest, search, sections, trace
+from context_core.constants import DATA_DIR
+
+DEFAULT_DEBOUNCE = 0.5
+DEFAULT_MAX_WAIT = 5.0
+DEFAULT_INTERVAL = 1.0
+
+# inotify(7) flags
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT = struct.Struct("iIII")
+
+RESCAN = None  # stands for "every file of the project" in a change set
+
+
+def _is_context(name: str) -> bool:
+    return name.endswith(".md") and not name.startswith(".")
+
+
+def _projects(data_path: Path):
+    if not data_path.exists():
+        return []
+    with os.scandir(data_path) as entries:
+        return sorted(e.name for e in entries if e.is_dir() and not e.name.startswith("."))
+
+
+def _folders(project_path: Path):
+    with os.scandir(project_path) as entries:
+        return sorted(e.name for e in entries if e.is_dir() and not e.name.startswith("."))
+
+
+# ── applying changes ─────────────────────────────────────────
+def sync_files(project_path: Path, paths) -> int:
+    """
+    Update every derived index for just `paths` ("type/name.md") of one
+    project. Returns how many of them were re-indexed or dropped.
+    """
+    from context_core import tokens
+
+    paths = sorted(paths)
+    with trace.span("sync"):
+        manifest.update_entries(project_path, paths)
+        changed = search.update_files(project_path, paths)
+        sections.update_files(project_path, paths)
+        tokens.count_paths(project_path, paths)
+    return changed
+
+
+def resync(project_path: Path) -> int:
+    """
+    Recovery path: rescan a whole project and bring every index up to date.
+    """
+    from context_core import tokens
+
+    with trace.span("sync"):
+        folders = manifest.refresh(project_path, deep=True)["folders"]
+        paths = [entry["path"] for record in folders.values() for entry in record["files"].values()]
+        changed = search.update_index(project_path)
+        sections.update_files(project_path, paths)
+        tokens.count_files(project_path, folders=folders)
+    return changed
+
+
+# ── change sources ───────────────────────────────────────────
+class PollingWatcher:
+    """Finds changes by comparing file sizes and mtimes between polls."""
+
+    def __init__(self, data_path: Path, interval: float = DEFAULT_INTERVAL):
+        self.data_path = data_path
+        self.interval = interval
+        self.state = self._stat_all()
+
+    def _stat_project(self, project: str) -> dict:
+        project_path = self.data_path / project
+        stats = {}
+        try:
+            folders = _folders(project_path)
+        except FileNotFoundError:
+            return stats
+        for folder in folders:
+            try:
+                with os.scandir(project_path / folder) as entries:
+                    for entry in entries:
+                        if _is_context(entry.name) and entry.is_file():
+                            st = entry.stat()
+                            stats[f"{folder}/{entry.name}"] = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return stats
+
+    def _stat_all(self) -> dict:
+        return {project: self._stat_project(project) for project in _projects(self.data_path)}
+
+    def poll(self, timeout: float) -> dict:
+        """
+        Wait up to `timeout` seconds and return {project: set of changed paths}.
+        """
+        time.sleep(min(timeout, self.interval))
+        current = self._stat_all()
+        changes = {}
+        for project in set(current) | set(self.state):
+            old, new = self.state.get(project, {}), current.get(project, {})
+            if project not in self.state:
+                changes[project] = RESCAN
+                continue
+            changed = {path for path in set(old) | set(new) if old.get(path) != new.get(path)}
+            if changed:
+                changes[project] = changed
+        self.state = current
+        return changes
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watches on the data folder, projects and type folders."""
+
+    def __init__(self, data_path: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.data_path = data_path
+        self.watches = {}  # wd -> (project, folder); (None, None) for the data folder
+        self._watch(data_path, None, None)
+        for project in _projects(data_path):
+            self._watch_project(project)
+
+    def _watch(self, path: Path, project, folder):
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = (project, folder)
+
+    def _watch_project(self, project: str):
+        project_path = self.data_path / project
+        self._watch(project_path, project, None)
+        try:
+            for folder in _folders(project_path):
+                self._watch(project_path / folder, project, folder)
+        except FileNotFoundError:
+            pass
+
+    def poll(self, timeout: float) -> dict:
+        """
+        Wait up to `timeout` seconds and return {project: set of changed paths}.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return {}
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return {}
+
+        changes = {}
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, offset)
+            raw = data[offset + EVENT.size:offset + EVENT.size + length]
+            offset += EVENT.size + length
+            name = os.fsdecode(raw.rstrip(b"\0"))
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: every project has to be rescanned
+                return {project: RESCAN for project in _projects(self.data_path)}
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if wd not in self.watches or not name:
+                continue
+
+            project, folder = self.watches[wd]
+            if mask & IN_ISDIR:
+                if name.startswith(".") or not mask & (IN_CREATE | IN_MOVED_TO):
+                    continue
+                # A new project or type folder: watch it and rescan, since files
+                # may have landed in it before the watch existed
+                if project is None:
+                    self._watch_project(name)
+                    changes[name] = RESCAN
+                elif folder is None:
+                    self._watch(self.data_path / project / name, project, name)
+                    changes[project] = RESCAN
+                continue
+            if folder is None or not _is_context(name):
+                continue
+            if changes.get(project, set()) is not RESCAN:
+                changes.setdefault(project, set()).add(f"{folder}/{name}")
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(data_path: Path, polling: bool = False, interval: float = DEFAULT_INTERVAL):
+    """
+    Return an inotify watcher where available, else a polling one.
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(data_path)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(data_path, interval)
+
+
+# ── the loop ─────────────────────────────────────────────────
+def _merge(pending: dict, changes: dict):
+    for project, paths in changes.items():
+        if paths is RESCAN or pending.get(project, set()) is RESCAN:
+            pending[project] = RESCAN
+        else:
+            pending.setdefault(project, set()).update(paths)
+
+
+def apply(data_path: Path, pending: dict) -> dict:
+    """
+    Apply a batch of changes; returns {project: files changed}.
+    """
+    results = {}
+    for project, paths in sorted(pending.items()):
+        project_path = data_path / project
+        if not (project_path / "meta.json").exists():
+            continue  # deleted, or not a project
+        results[project] = resync(project_path) if paths is RESCAN else sync_files(project_path, paths)
+    return results
+
+
+def watch(data_path: Path = DATA_DIR, on_sync=None, watcher=None, debounce: float = DEFAULT_DEBOUNCE,
+          max_wait: float = DEFAULT_MAX_WAIT, interval: float = DEFAULT_INTERVAL, stop=None):
+    """
+    Watch `data_path` until `stop` (a threading.Event) is set, calling
+    `on_sync({project: files changed})` after each applied batch.
+
+    `watcher` is a change source from `open_watcher`; it is closed on return.
+    """
+    if watcher is None:
+        data_path.mkdir(parents=True, exist_ok=True)
+        watcher = open_watcher(data_path, interval=interval)
+    try:
+        # Catch up on whatever changed while nobody was watching
+        results = apply(data_path, {project: RESCAN for project in _projects(data_path)})
+        if on_sync:
+            on_sync(results)
+
+        pending = {}
+        first_event = last_event = None
+        while stop is None or not stop.is_set():
+            now = time.monotonic()
+            if pending:
+                timeout = max(0.0, min(last_event + debounce, first_event + max_wait) - now)
+            else:
+                timeout = interval
+            changes = watcher.poll(timeout)
+            now = time.monotonic()
+            if changes:
+                _merge(pending, changes)
+                first_event = first_event or now
+                last_event = now
+            if pending and (now >= last_event + debounce or now >= first_event + max_wait):
+                results = apply(data_path, pending)
+                pending, first_event, last_event = {}, None, None
+                if on_sync:
+                    on_sync(results)
+    finally:
+        watcher.close()
@@ -0,0 +1,73 @@
+from context_core import archives, operations
+from context_core.archives import ArchiveStore
+
+
+def make_project(tmp_path):
+    project_path = tmp_path / "proj"
+    (project_path / "archives").mkdir(parents=True)
+    return project_path
+
+
+def test_append_and_read(tmp_path):
+    store = ArchiveStore(make_project(tmp_path))
+    store.append("chat-1", "hello " * 1000)
+    store.append("chat-2", "lzma text\n", codec="lzma")
+
+    fresh = ArchiveStore(store.folder.parent)
+    assert fresh.names() == ["chat-1", "chat-2"]
+    assert fresh.read("chat-1") == "hello " * 1000
+    assert fresh.read("chat-2") == "lzma text\n"
+    # Compressed, and a single segment holds both
+    assert len(list(store.pack_path.glob("segment-*.pack"))) == 1
+    assert (store.pack_path / "segment-000001.pack").stat().st_size < 1000
+
+
+def test_segments_roll_over(tmp_path, monkeypatch):
+    monkeypatch.setattr(archives, "SEGMENT_MAX_BYTES", 64)
+    store = ArchiveStore(make_project(tmp_path))
+    for i in range(3):
+        store.append(f"c{i}", f"{i}" * 500 + "unique tail text that will not compress well")
+
+    assert len(list(store.pack_path.glob("segment-*.pack"))) == 3
+    assert store.read("c2").startswith("222")
+
+
+def test_compact_reclaims_deleted_blocks_and_packs_loose_files(tmp_path):
+    project_path = make_project(tmp_path)
+    store = ArchiveStore(project_path)
+    store.append("keep", "keep me\n")
+    store.append("drop", "x" * 50_000 + "".join(str(i) for i in range(5000)))
+    store.delete("drop")
+    (project_path / "archives" / "loose.md").write_text("loose log\n")
+
+    stats = store.compact()
+
+    assert stats["packed_files"] == 1
+    assert stats["bytes_after"] < stats["bytes_before"]
+    assert not (project_path / "archives" / "loose.md").exists()
+    fresh = ArchiveStore(project_path)
+    assert fresh.names() == ["keep", "loose"]
+    assert fresh.read("keep") == "keep me\n"
+    assert fresh.read("loose") == "loose log\n"
+
+
+def test_operations_see_packed_archives(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "archives" / "loose.md").write_text("loose\n")
+    ArchiveStore(project_path).append("packed", "packed log\n")
+
+    assert operations.list_contexts("proj", "archives", tmp_path) == {"archives": ["loose.md", "packed.md"]}
+    assert operations.read_context("proj", "archives", "packed", tmp_path) == "packed log\n"
+
+    operations.delete_context("proj", "archives", "packed", tmp_path)
+    assert "packed" not in ArchiveStore(project_path)
+
+
+def test_extract_moves_archive_to_loose_file(tmp_path):
+    project_path = make_project(tmp_path)
+    store = ArchiveStore(project_path)
+    store.append("edit-me", "body\n")
+
+    file_path = store.extract("edit-me")
+    assert file_path.read_text() == "body\n"
+    assert "edit-me" not in ArchiveStore(project_path)
@@ -0,0 +1,92 @@
+import json
+
+from context_core import batch, events, manifest, trash
+
+
+def make_project(tmp_path):
+    for folder in ["facts", "goals"]:
+        (tmp_path / "proj" / folder).mkdir(parents=True)
+    return tmp_path
+
+
+def lines(*ops):
+    return [json.dumps(op) + "\n" for op in ops]
+
+
+def test_batch_runs_operations_in_order(tmp_path):
+    data_path = make_project(tmp_path)
+    results = list(batch.run_batch(lines(
+        {"op": "create-context", "project": "proj", "type": "facts", "name": "a", "content": "alpha\n"},
+        {"op": "view-context", "project": "proj", "type": "facts", "name": "a"},
+        {"op": "list-contexts", "project": "proj", "type": "facts"},
+        {"op": "delete-context", "project": "proj", "type": "facts", "name": "a"},
+    ), data_path=data_path))
+
+    assert [r["ok"] for r in results] == [True, True, True, True]
+    assert results[1]["result"] == "alpha\n"
+    assert results[2]["result"] == {"facts": ["a.md"]}
+    assert not (data_path / "proj" / "facts" / "a.md").exists()
+
+
+def test_batch_reports_failures_and_continues(tmp_path):
+    data_path = make_project(tmp_path)
+    results = list(batch.run_batch(lines(
+        {"op": "create-context", "project": "proj", "type": "bogus", "name": "a"},
+        {"op": "view-context", "project": "proj", "type": "facts"},
+        {"op": "create-context", "project": "proj", "type": "goals", "name": "g"},
+    ) + ["not json\n"], data_path=data_path))
+
+    assert [r["ok"] for r in results] == [False, False, True, False]
+    assert "is not a valid context type" in results[0]["error"]
+    assert "Missing argument 'name'" in results[1]["error"]
+    assert (data_path / "proj" / "goals" / "g.md").exists()
+
+
+def test_batch_refreshes_manifest_once_done(tmp_path):
+    data_path = make_project(tmp_path)
+    ops = [{"op": "create-context", "project": "proj", "type": "facts", "name": f"n{i}"} for i in range(5)]
+    list(batch.run_batch(lines(*ops), data_path=data_path))
+
+    stored = manifest.read_manifest(data_path / "proj")
+    assert sorted(stored["folders"]["facts"]["files"]) == [f"n{i}.md" for i in range(5)]
+
+
+def test_atomic_batch_rolls_back(tmp_path):
+    data_path = make_project(tmp_path)
+    keep = data_path / "proj" / "goals" / "keep.md"
+    keep.write_text("precious\n")
+
+    results = list(batch.run_batch(lines(
+        {"op": "create-context", "project": "proj", "type": "facts", "name": "new"},
+        {"op": "delete-context", "project": "proj", "type": "goals", "name": "keep"},
+        {"op": "view-context", "project": "proj", "type": "facts", "name": "missing"},
+        {"op": "create-context", "project": "proj", "type": "facts", "name": "never"},
+    ), atomic=True, data_path=data_path))
+
+    assert [r["ok"] for r in results] == [True, True, False, False]
+    assert results[0]["rolled_back"] and results[1]["rolled_back"]
+    assert "Skipped" in results[3]["error"]
+    assert not (data_path / "proj" / "facts" / "new.md").exists()
+    assert not (data_path / "proj" / "facts" / "never.md").exists()
+    assert keep.read_text() == "precious\n"
+
+
+def test_atomic_batch_rolls_back_after_os_error(tmp_path):
+    data_path = make_project(tmp_path)
+    project_path = data_path / "proj"
+    (project_path / "meta.json").write_text(json.dumps({"project": "proj", "record_events": True}))
+    keep = project_path / "goals" / "keep.md"
+    keep.write_text("precious\n")
+
+    results = list(batch.run_batch(lines(
+        {"op": "create-context", "project": "proj", "type": "facts", "name": "ok1"},
+        {"op": "delete-context", "project": "proj", "type": "goals", "name": "keep"},
+        {"op": "create-context", "project": "proj", "type": "facts", "name": "sub/x"},
+    ), atomic=True, data_path=data_path))
+
+    assert [r["ok"] for r in results] == [True, True, False]
+    assert results[0]["rolled_back"] and results[1]["rolled_back"]
+    assert not (project_path / "facts" / "ok1.md").exists()
+    assert keep.read_text() == "precious\n"
+    assert trash.entries(data_path) == []
+    assert events.query(project_path) == []
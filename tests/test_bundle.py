@@ -0,0 +1,93 @@
+import io
+import tarfile
+
+import pytest
+
+from context_core import bundle, operations
+from context_core.archives import ArchiveStore
+
+
+def make_project(root):
+    operations.init_project("proj", root)
+    operations.create_context("proj", "facts", "a", "alpha\n", root)
+    operations.create_context("proj", "goals", "b", "beta\n" * 1000, root)
+    ArchiveStore(root / "proj").append("chat", "old chat\n")
+    return root / "proj"
+
+
+def export(root) -> bytes:
+    stream = io.BytesIO()
+    bundle.export_project("proj", stream, root)
+    return stream.getvalue()
+
+
+def test_round_trip(tmp_path):
+    source = make_project(tmp_path / "a")
+    data = export(tmp_path / "a")
+
+    result = bundle.import_project(io.BytesIO(data), tmp_path / "b")
+    assert result["project"] == "proj"
+    target = tmp_path / "b" / "proj"
+    assert (target / "goals" / "b.md").read_text() == "beta\n" * 1000
+    assert (target / "meta.json").read_bytes() == (source / "meta.json").read_bytes()
+    assert ArchiveStore(target).read("chat") == "old chat\n"
+    assert (target / "manifest.json").exists()
+
+    with tarfile.open(fileobj=io.BytesIO(data), mode="r|gz") as tar:
+        names = [member.name for member in tar]
+    assert "proj/facts/a.md" in names
+    assert not [name for name in names if name.endswith(".lock") or name == "proj/manifest.json"]
+
+
+def test_reimport_only_writes_changes(tmp_path):
+    make_project(tmp_path / "a")
+    data = export(tmp_path / "a")
+    target = tmp_path / "b"
+    first = bundle.import_project(io.BytesIO(data), target)
+
+    (target / "proj" / "facts" / "a.md").write_text("local edit\n")
+    again = bundle.import_project(io.BytesIO(data), target)
+    assert again["written"] == 1
+    assert again["unchanged"] == first["written"] - 1
+    assert (target / "proj" / "facts" / "a.md").read_text() == "alpha\n"
+
+
+def test_import_under_another_name(tmp_path):
+    make_project(tmp_path)
+    bundle.import_project(io.BytesIO(export(tmp_path)), tmp_path, name="copy")
+    assert (tmp_path / "copy" / "facts" / "a.md").read_text() == "alpha\n"
+
+
+def test_checksum_mismatch_is_rejected(tmp_path):
+    stream = io.BytesIO()
+    with tarfile.open(fileobj=stream, mode="w|gz", format=tarfile.PAX_FORMAT) as tar:
+        info = tarfile.TarInfo("proj/facts/a.md")
+        info.size = 5
+        info.pax_headers = {bundle.CHECKSUM_KEY: "0" * 64}
+        tar.addfile(info, io.BytesIO(b"evil\n"))
+
+    with pytest.raises(operations.ContextError, match="Checksum mismatch"):
+        bundle.import_project(io.BytesIO(stream.getvalue()), tmp_path)
+    assert not (tmp_path / "proj" / "facts" / "a.md").exists()
+
+
+def test_entries_outside_the_project_are_rejected(tmp_path):
+    stream = io.BytesIO()
+    with tarfile.open(fileobj=stream, mode="w|gz", format=tarfile.PAX_FORMAT) as tar:
+        for name in ("proj/meta.json", "proj/../../escape.md"):
+            info = tarfile.TarInfo(name)
+            info.pax_headers = {bundle.CHECKSUM_KEY: "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"}
+            tar.addfile(info, io.BytesIO(b""))
+
+    with pytest.raises(operations.ContextError, match="outside the project"):
+        bundle.import_project(io.BytesIO(stream.getvalue()), tmp_path / "data")
+    assert not (tmp_path / "escape.md").exists()
+
+
+def test_truncated_bundle(tmp_path):
+    make_project(tmp_path / "a")
+    data = export(tmp_path / "a")
+    with pytest.raises(operations.ContextError):
+        bundle.import_project(io.BytesIO(data[:len(data) // 2]), tmp_path / "b")
+    with pytest.raises(operations.ContextError, match="Not a project bundle"):
+        bundle.import_project(io.BytesIO(b"not a bundle"), tmp_path / "b")
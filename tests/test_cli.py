@@ -1,61 +1,92 @@
+import json
 import os
-import shutil
 import subprocess
+import pytest
 from pathlib import Path
 from typer.testing import CliRunner
 from unittest.mock import patch
+from context_core import operations, storage
 from context_core.__main__ import app
+from context_core.store import ContextStore
 from typer import Typer
 
 runner = CliRunner()
 DATA_DIR = Path("projects_data")
 
 
+@pytest.fixture(autouse=True, params=storage.BACKENDS)
+def backend(request, tmp_path, monkeypatch):
+    # Every test runs once per storage backend, each in its own projects_data,
+    # so deletes, the trash and caches never touch the repo
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(storage.STORAGE_ENV, request.param)
+    return request.param
+
+
+def write(project, type, name, content):
+    ContextStore(DATA_DIR).write(project, type, name, content)
+
+
+def read(project, type, name):
+    return ContextStore(DATA_DIR).read(project, type, name)
+
+
+def exists(project, type, name):
+    try:
+        ContextStore(DATA_DIR).get(project, type, name)
+    except operations.ContextError:
+        return False
+    return True
+
+
+def project_exists(project):
+    return ContextStore(DATA_DIR).storage.project_exists(project)
+
+
+def refused(backend, *args, input=None):
+    """
+    On backends other than files, check that a command built on the file
+    layout is refused with the explicit error; True if the test stops there.
+    """
+    if backend == "files":
+        return False
+    result = runner.invoke(app, list(args), input=input)
+    assert result.exit_code != 0
+    assert f"'{args[0]}' needs the file storage backend" in result.output
+    return True
+
+
 def test_hello_command():
     result = runner.invoke(app, ["hello"])
     assert result.exit_code == 0
     assert "👋 Hello from Context Utility!" in result.output
 
 # INIT PROJECT TESTS
-def test_init_creates_project_structure():
+def test_init_creates_project_structure(backend):
     project_name = "test-project"
     project_path = DATA_DIR / project_name
 
-    # Clean before test
-    if project_path.exists():
-        shutil.rmtree(project_path)
-
     result = runner.invoke(app, ["init-project", project_name])
     assert result.exit_code == 0
-    assert project_path.exists()
-    assert (project_path / "facts").exists()
-    assert (project_path / "meta.json").exists()
+    assert project_exists(project_name)
+    if backend == "files":
+        assert (project_path / "facts").exists()
+        assert (project_path / "meta.json").exists()
     assert "✅ Initialized project" in result.output
 
-    # Clean up after
-    shutil.rmtree(project_path)
-
 def test_init_fails_if_project_exists():
     project_name = "test-existing"
-    project_path = DATA_DIR / project_name
-
-    # Clean up before test
-    if project_path.exists():
-        shutil.rmtree(project_path)
 
     # First run: create the project
     result1 = runner.invoke(app, ["init-project", project_name])
     assert result1.exit_code == 0
-    assert project_path.exists()
+    assert project_exists(project_name)
 
     # Second run: try to re-create it
     result2 = runner.invoke(app, ["init-project", project_name])
     assert result2.exit_code != 0
     assert "already exists" in result2.output
 
-    # Clean up
-    shutil.rmtree(project_path)
-
 def test_init_fails_without_project_name():
     result = runner.invoke(app, ["init-project"])
     assert result.exit_code != 0
@@ -64,27 +95,18 @@ def test_init_fails_without_project_name():
 # DELETE PROJECT TESTS
 def test_delete_project_command():
     project_name = "test-delete"
-    project_path = DATA_DIR / project_name
-
-    # Setup: manually create a dummy project
-    (project_path / "facts").mkdir(parents=True, exist_ok=True)
-    (project_path / "meta.json").write_text("{}")
-
-    assert project_path.exists()
+    runner.invoke(app, ["init-project", project_name])
+    assert project_exists(project_name)
 
     # Use --force to skip confirmation
     result = runner.invoke(app, ["delete-project", project_name, "--force"])
     assert result.exit_code == 0
-    assert not project_path.exists()
+    assert not project_exists(project_name)
+    assert not (DATA_DIR / project_name).exists()
     assert "🗑️ Deleted project" in result.output
 
 def test_delete_project_fails_if_missing():
     project_name = "nonexistent-project"
-    project_path = DATA_DIR / project_name
-
-    # Ensure it really doesn't exist
-    if project_path.exists():
-        shutil.rmtree(project_path)
 
     result = runner.invoke(app, ["delete-project", project_name, "--force"])
     assert result.exit_code != 0
@@ -92,51 +114,87 @@ def test_delete_project_fails_if_missing():
 
 def test_delete_project_cancelled_on_prompt():
     project_name = "test-cancel"
-    project_path = DATA_DIR / project_name
-
-    # Setup dummy project
-    (project_path / "facts").mkdir(parents=True, exist_ok=True)
+    runner.invoke(app, ["init-project", project_name])
 
     # Simulate user typing 'n' when prompted
     result = runner.invoke(app, ["delete-project", project_name], input="n\n")
 
     assert result.exit_code != 0
     assert "❎ Cancelled." in result.output
-    assert project_path.exists()
-
-    shutil.rmtree(project_path)
+    assert project_exists(project_name)
 
 def test_delete_project_confirmed_prompt():
     project_name = "test-confirm"
-    project_path = DATA_DIR / project_name
-
-    (project_path / "facts").mkdir(parents=True, exist_ok=True)
+    runner.invoke(app, ["init-project", project_name])
 
     result = runner.invoke(app, ["delete-project", project_name], input="y\n")
     assert result.exit_code == 0
-    assert not project_path.exists()
+    assert not project_exists(project_name)
     assert "🗑️ Deleted project" in result.output
 
+def test_restore_project_and_context():
+    project = "test-restore"
+    runner.invoke(app, ["init-project", project])
+    runner.invoke(app, ["create-context", project, "facts", "undo-me"])
+    write(project, "facts", "kept", "still here\n")
+
+    result = runner.invoke(app, ["delete-project", project, "--force"])
+    assert "restore-project" in result.output
+    assert not exists(project, "facts", "kept")
+    result = runner.invoke(app, ["restore-project", project])
+    assert result.exit_code == 0
+    assert "♻️ Restored project" in result.output
+    assert read(project, "facts", "kept") == "still here\n"
+    result = runner.invoke(app, ["restore-project", project])
+    assert result.exit_code != 0
+    assert "No deleted project" in result.output
+
+    runner.invoke(app, ["delete-context", project, "facts", "undo-me", "--force"])
+    assert not exists(project, "facts", "undo-me")
+    result = runner.invoke(app, ["gc", "--list"])
+    assert "context  test-restore/facts/undo-me" in result.output
+    result = runner.invoke(app, ["restore-context", project, "facts", "undo-me"])
+    assert result.exit_code == 0
+    assert exists(project, "facts", "undo-me")
+
+    result = runner.invoke(app, ["restore-context", project, "facts", "undo-me"])
+    assert result.exit_code != 0
+    assert "No deleted context" in result.output
+
+    runner.invoke(app, ["delete-context", project, "facts", "undo-me", "--force"])
+    result = runner.invoke(app, ["gc", "--older-than-days", "1"])
+    assert result.exit_code == 0
+    assert "🧹 Reclaimed 0 trash entries" in result.output
+    result = runner.invoke(app, ["gc", "--all"])
+    assert "🧹 Reclaimed 1 trash entry: 1 files" in result.output
+    result = runner.invoke(app, ["gc", "--list"])
+    assert "Trash is empty" in result.output
+    result = runner.invoke(app, ["restore-context", project, "facts", "undo-me"])
+    assert "No deleted context" in result.output
+
+def test_restore_context_refuses_to_overwrite():
+    project = "test-restore-clash"
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "clash", "old\n")
+    runner.invoke(app, ["delete-context", project, "facts", "clash", "--force"])
+    write(project, "facts", "clash", "new\n")
+
+    result = runner.invoke(app, ["restore-context", project, "facts", "clash"])
+    assert result.exit_code != 0
+    assert "already exists" in result.output
+    assert read(project, "facts", "clash") == "new\n"
+
 # CREATE FILE TESTS
 def test_create_context_file():
     project_name = "test-create"
-    project_path = DATA_DIR / project_name
-    facts_path = project_path / "facts"
-    file_path = facts_path / "my-topic.md"
-
-    # Ensure clean start
-    if project_path.exists():
-        shutil.rmtree(project_path)
 
     runner.invoke(app, ["init-project", project_name])
     result = runner.invoke(app, ["create-context", project_name, "facts", "my-topic"])
 
     assert result.exit_code == 0
-    assert file_path.exists()
+    assert exists(project_name, "facts", "my-topic")
     assert "✅ Created file" in result.output
-    assert "# My Topic" in file_path.read_text()
-
-    shutil.rmtree(project_path)
+    assert "# My Topic" in read(project_name, "facts", "my-topic")
 
 def test_create_context_file_already_exists():
     project = "test-duplicate"
@@ -147,8 +205,6 @@ def test_create_context_file_already_exists():
     assert result.exit_code != 0
     assert "already exists" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
-
 def test_create_context_missing_folder():
     project = "nonexistent-project"
     result = runner.invoke(app, ["create-context", project, "facts", "missing-folder-test"])
@@ -161,11 +217,8 @@ def test_create_context_invalid_characters():
 
     result = runner.invoke(app, ["create-context", project, "facts", "bad@name!"])
     assert result.exit_code == 0  # Should still allow file creation
-    file_path = DATA_DIR / project / "facts" / "bad@name!.md"
-    assert file_path.exists()
-    assert "# Bad@Name!" in file_path.read_text()
-
-    shutil.rmtree(DATA_DIR / project)
+    assert exists(project, "facts", "bad@name!")
+    assert "# Bad@Name!" in read(project, "facts", "bad@name!")
 
 def test_create_context_invalid_type():
     project = "test-invalid-type"
@@ -175,43 +228,33 @@ def test_create_context_invalid_type():
     assert result.exit_code != 0
     assert "is not a valid context type" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
-
 def test_create_context_template_format():
     project = "test-template"
     runner.invoke(app, ["init-project", project])
 
     result = runner.invoke(app, ["create-context", project, "facts", "test-format"])
-    file_path = DATA_DIR / project / "facts" / "test-format.md"
-    content = file_path.read_text()
+    content = read(project, "facts", "test-format")
 
     assert "# Test Format" in content
     assert "Created on" in content
 
-    shutil.rmtree(DATA_DIR / project)
-
 
 # DELETE FILE TESTS
 def test_delete_context_file():
     project_name = "test-delete-context"
-    project_path = DATA_DIR / project_name
-    facts_path = project_path / "facts"
-    file_path = facts_path / "delete-me.md"
 
     # Setup
     runner.invoke(app, ["init-project", project_name])
     runner.invoke(app, ["create-context", project_name, "facts", "delete-me"])
-    assert file_path.exists()
+    assert exists(project_name, "facts", "delete-me")
 
     # Delete with --force
     result = runner.invoke(app, ["delete-context", project_name, "facts", "delete-me", "--force"])
 
     assert result.exit_code == 0
-    assert not file_path.exists()
+    assert not exists(project_name, "facts", "delete-me")
     assert "🗑️ Deleted file" in result.output
 
-    shutil.rmtree(project_path)
-
 def test_delete_context_file_does_not_exist():
     project = "test-delete-missing"
     runner.invoke(app, ["init-project", project])
@@ -220,66 +263,70 @@ def test_delete_context_file_does_not_exist():
     assert result.exit_code != 0
     assert "does not exist" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
-
 def test_delete_context_prompt_rejection():
     project = "test-prompt-reject"
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "keep-me"])
 
-    file_path = DATA_DIR / project / "facts" / "keep-me.md"
     result = runner.invoke(app, ["delete-context", project, "facts", "keep-me"], input="n\n")
 
     assert result.exit_code != 0
     assert "❎ Cancelled." in result.output
-    assert file_path.exists()
-
-    shutil.rmtree(DATA_DIR / project)
+    assert exists(project, "facts", "keep-me")
 
 def test_delete_context_prompt_confirmation():
     project = "test-prompt-confirm"
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "go-ahead"])
 
-    file_path = DATA_DIR / project / "facts" / "go-ahead.md"
     result = runner.invoke(app, ["delete-context", project, "facts", "go-ahead"], input="y\n")
 
     assert result.exit_code == 0
     assert "🗑️ Deleted file" in result.output
-    assert not file_path.exists()
-
-    shutil.rmtree(DATA_DIR / project)
+    assert not exists(project, "facts", "go-ahead")
 
 def test_delete_context_folder_remains_after_file_deletion():
     project = "test-folder-persists"
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "one-file"])
 
-    file_path = DATA_DIR / project / "facts" / "one-file.md"
     result = runner.invoke(app, ["delete-context", project, "facts", "one-file", "--force"])
 
     assert result.exit_code == 0
-    assert not file_path.exists()
-    assert (DATA_DIR / project / "facts").exists()
-
-    shutil.rmtree(DATA_DIR / project)
+    assert not exists(project, "facts", "one-file")
+    assert "facts" in ContextStore(DATA_DIR).listing(project)
 
 # EDIT FILE TESTS
-def test_edit_context_opens_editor():
+def test_edit_context_opens_editor(backend):
     project = "test-edit"
     file_path = DATA_DIR / project / "facts" / "edit-me.md"
 
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "edit-me"])
-    assert file_path.exists()  # ensure file was created
+    assert exists(project, "facts", "edit-me")  # ensure file was created
 
     with patch("subprocess.run") as mock_run:
         result = runner.invoke(app, ["edit-context", project, "facts", "edit-me"])
         assert result.exit_code == 0, result.output
         mock_run.assert_called_once()
-        assert str(file_path) in mock_run.call_args[0][0]
+        if backend == "files":
+            assert str(file_path) in mock_run.call_args[0][0]
+        else:
+            # Other backends hand the editor a temporary copy
+            assert mock_run.call_args[0][0][1].endswith("edit-me.md")
+
+def test_edit_context_saves_changes(backend, tmp_path):
+    project = "test-edit-save"
+    runner.invoke(app, ["init-project", project])
+    runner.invoke(app, ["create-context", project, "facts", "saved"])
+    editor = tmp_path / "editor.sh"
+    editor.write_text('#!/bin/sh\necho "edited line" >> "$1"\n')
+    editor.chmod(0o755)
 
-    shutil.rmtree(DATA_DIR / project)
+    with patch.dict(os.environ, {"EDITOR": str(editor)}):
+        result = runner.invoke(app, ["edit-context", project, "facts", "saved"])
+    assert result.exit_code == 0, result.output
+    assert "edited line" in read(project, "facts", "saved")
 
 def test_edit_context_fails_if_missing():
     project = "test-edit-missing"
@@ -290,12 +337,10 @@ def test_edit_context_fails_if_missing():
 
 def test_edit_context_respects_editor_env():
     project = "test-edit-env"
-    file_path = DATA_DIR / project / "facts" / "env-editor.md"
-
 
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "env-editor"])
-    assert file_path.exists()  # ensure file was created
+    assert exists(project, "facts", "env-editor")  # ensure file was created
 
     with patch.dict(os.environ, {"EDITOR": "mock-editor"}), patch("subprocess.run") as mock_run:
         result = runner.invoke(app, ["edit-context", project, "facts", "env-editor"])
@@ -303,38 +348,51 @@ def test_edit_context_respects_editor_env():
         mock_run.assert_called_once()
         assert mock_run.call_args[0][0][0] == "mock-editor"
 
-    shutil.rmtree(DATA_DIR / project)
-
-def test_edit_context_falls_back_to_nano():
+def test_edit_context_falls_back_to_nano(backend):
     project = "test-edit-fallback"
-    file_path = DATA_DIR / project / "facts" / "fallback-editor.md"
 
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "fallback-editor"])
-    assert file_path.exists()  # ensure file was created
+    assert exists(project, "facts", "fallback-editor")  # ensure file was created
 
     # Clear EDITOR env for this test
-    with patch.dict(os.environ, {}, clear=True), patch("subprocess.run") as mock_run:
+    with patch.dict(os.environ, {storage.STORAGE_ENV: backend}, clear=True), patch("subprocess.run") as mock_run:
         result = runner.invoke(app, ["edit-context", project, "facts", "fallback-editor"])
         assert result.exit_code == 0
         mock_run.assert_called_once()
         assert mock_run.call_args[0][0][0] == "nano"
 
-    shutil.rmtree(DATA_DIR / project)
-
 # VIEW FILE TESTS
 def test_view_context_prints_file_contents():
     project = "test-view"
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "view-me"])
-    file_path = DATA_DIR / project / "facts" / "view-me.md"
-    file_path.write_text("Hello from view test!\n")
+    write(project, "facts", "view-me", "Hello from view test!\n")
 
     result = runner.invoke(app, ["view-context", project, "facts", "view-me"])
     assert result.exit_code == 0
     assert "Hello from view test!" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
+def test_view_context_section_and_range(backend):
+    project = "test-view-section"
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "notes", "# Notes\n\n## Setup\ninstall it\n\n## Usage\nrun it\n")
+    if backend != "files":
+        result = runner.invoke(app, ["view-context", project, "facts", "notes", "--section", "usage"])
+        assert result.exit_code != 0
+        assert "need the file storage backend" in result.output
+        return
+
+    result = runner.invoke(app, ["view-context", project, "facts", "notes", "--section", "usage"])
+    assert result.exit_code == 0
+    assert result.output == "## Usage\nrun it\n\n"
+
+    result = runner.invoke(app, ["view-context", project, "facts", "notes", "--range", "0:7"])
+    assert result.output == "# Notes\n"
+
+    result = runner.invoke(app, ["view-context", project, "facts", "notes", "--section", "nope"])
+    assert result.exit_code != 0
+    assert "not found" in result.output
 
 def test_view_context_fails_on_missing_file():
     project = "test-view-missing"
@@ -346,8 +404,7 @@ def test_view_context_uses_pager():
     project = "test-view-pager"
     runner.invoke(app, ["init-project", project])
     runner.invoke(app, ["create-context", project, "facts", "paged"])
-    file_path = DATA_DIR / project / "facts" / "paged.md"
-    file_path.write_text("Content to be paged\n")
+    write(project, "facts", "paged", "Content to be paged\n")
 
     with patch("subprocess.Popen") as mock_popen:
         mock_process = mock_popen.return_value
@@ -358,8 +415,6 @@ def test_view_context_uses_pager():
         mock_popen.assert_called_once_with(["less"], stdin=subprocess.PIPE)
         mock_process.communicate.assert_called_once()
 
-    shutil.rmtree(DATA_DIR / project)
-
 # LIST FILES TESTS
 def test_list_contexts_by_type():
     project = "test-list-type"
@@ -373,8 +428,6 @@ def test_list_contexts_by_type():
     assert "file-one.md" in result.output
     assert "file-two.md" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
-
 def test_list_contexts_whole_project():
     project = "test-list-all"
     runner.invoke(app, ["init-project", project])
@@ -391,8 +444,6 @@ def test_list_contexts_whole_project():
     assert "📂 decisions/" in result.output
     assert "c.md" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
-
 def test_list_contexts_type_not_found():
     project = "test-list-missing-type"
     runner.invoke(app, ["init-project", project])
@@ -401,8 +452,6 @@ def test_list_contexts_type_not_found():
     assert result.exit_code != 0
     assert "does not exist" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
-
 def test_list_contexts_project_not_found():
     project = "not-a-project"
     result = runner.invoke(app, ["list-contexts", project])
@@ -417,8 +466,6 @@ def test_list_contexts_type_no_files():
     assert result.exit_code == 0
     assert "No context files found in 'facts/'" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
-
 def test_list_contexts_project_no_files():
     project = "test-empty-project"
     runner.invoke(app, ["init-project", project])  # creates empty folders
@@ -427,7 +474,397 @@ def test_list_contexts_project_no_files():
     assert result.exit_code == 0
     assert f"No context files found in project '{project}'" in result.output
 
-    shutil.rmtree(DATA_DIR / project)
+# LOAD TESTS
+def test_load_selected_types():
+    project = "test-load"
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "f", "fact line\n")
+    write(project, "goals", "g", "goal line\n")
+    write(project, "decisions", "d", "decision line\n")
+
+    result = runner.invoke(app, ["load", "--project", project, "--facts", "--goals"])
+    assert result.exit_code == 0
+    assert "==> facts/f.md <==" in result.output
+    assert "fact line" in result.output
+    assert "goal line" in result.output
+    assert "decision line" not in result.output
+
+def test_load_respects_priority():
+    project = "test-load-priority"
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "f", "fact line\n")
+    write(project, "goals", "g", "goal line\n")
+
+    result = runner.invoke(app, ["load", "-p", project, "--priority", "goals,facts"])
+    assert result.exit_code == 0
+    assert result.output.index("goal line") < result.output.index("fact line")
+
+def test_load_stops_at_token_budget():
+    project = "test-load-budget"
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "big", "".join(f"line {i}\n" for i in range(1000)))
+    write(project, "goals", "never", "never loaded\n")
+
+    result = runner.invoke(app, ["load", "-p", project, "--max-tokens", "50"])
+    assert result.exit_code == 0
+    assert "truncated: token budget of 50 reached" in result.output
+    assert (len(result.output) + 3) // 4 <= 50
+    assert "line 999" not in result.output
+    assert "never loaded" not in result.output
+
+def test_load_cache_friendly_with_fingerprints(backend):
+    project = "test-load-cache"
+    runner.invoke(app, ["init-project", project])
+    write(project, "summaries", "s", "summary line\n")
+    write(project, "facts", "f", "fact line\n")
+    if refused(backend, "load", "-p", project, "--cache-friendly"):
+        return
+
+    result = runner.invoke(app, ["load", "-p", project, "--cache-friendly", "--fingerprints",
+                                 "--priority", "summaries"])
+    assert result.exit_code == 0
+    assert result.output.index("fact line") < result.output.index("summary line")
+    assert '"prefix_fingerprint": "sha256:' in result.output
+
+    result = runner.invoke(app, ["load", "-p", project, "--cache-friendly", "--query", "x"])
+    assert result.exit_code != 0
+
+def test_load_invalid_priority_type():
+    project = "test-load-bad-priority"
+    runner.invoke(app, ["init-project", project])
+
+    result = runner.invoke(app, ["load", "-p", project, "--priority", "facts,bogus"])
+    assert result.exit_code != 0
+    assert "is not a valid context type" in result.output
+
+def test_load_project_not_found():
+    result = runner.invoke(app, ["load", "--project", "not-a-project"])
+    assert result.exit_code != 0
+    assert "does not exist" in result.output
+
+# SEARCH TESTS
+def test_search_finds_context(backend):
+    project = "test-search"
+    if refused(backend, "search", "zebracorn"):
+        return
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "s", "# Search\n\nThe zebracorn lives here.\n")
+
+    result = runner.invoke(app, ["search", "zebracorn", "--project", project])
+    assert result.exit_code == 0
+    assert f"{project}/facts/s.md:3" in result.output
+    assert "The zebracorn lives here." in result.output
+
+    result = runner.invoke(app, ["search", "nothing-matches-this", "--project", project])
+    assert result.exit_code == 0
+    assert "No matches" in result.output
+
+def test_search_project_not_found(backend):
+    if refused(backend, "search", "anything", "--project", "not-a-project"):
+        return
+    result = runner.invoke(app, ["search", "anything", "--project", "not-a-project"])
+    assert result.exit_code != 0
+    assert "does not exist" in result.output
+
+# RANK TESTS
+def test_rank_and_load_by_query(backend):
+    pytest.importorskip("numpy")
+    project = "test-rank"
+    if refused(backend, "rank", "deploy script", "--project", project):
+        return
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "notes", "# Deploy\nRun the deploy script.\n\n# Lunch\nPizza on Fridays.\n")
+
+    result = runner.invoke(app, ["rank", "deploy script", "--project", project])
+    assert result.exit_code == 0
+    assert "facts/notes.md:1  § Deploy" in result.output
+    assert "Lunch" not in result.output
+
+    result = runner.invoke(app, ["load", "--project", project, "--query", "deploy"])
+    assert result.exit_code == 0
+    assert "Run the deploy script." in result.output
+    assert "Pizza" not in result.output
+
+# TIMELINE TESTS
+def test_timeline_records_and_filters(backend):
+    project = "test-timeline"
+    if refused(backend, "timeline", project):
+        return
+    runner.invoke(app, ["init-project", project])
+
+    result = runner.invoke(app, ["timeline", project, "--record"])
+    assert "Automatic events on" in result.output
+    runner.invoke(app, ["create-context", project, "facts", "logged"])
+    runner.invoke(app, ["timeline", project, "--add", "Kickoff meeting"])
+
+    result = runner.invoke(app, ["timeline", project])
+    assert result.exit_code == 0
+    assert "2 event(s)" in result.output
+    assert "create  facts/logged" in result.output
+    assert "note    Kickoff meeting" in result.output
+
+    result = runner.invoke(app, ["timeline", project, "--until", "2000-01-01"])
+    assert "No events" in result.output
+
+    result = runner.invoke(app, ["timeline", project, "--since", "yesterday"])
+    assert result.exit_code != 0
+    assert "Invalid date" in result.output
+
+# HISTORY TESTS
+def test_snapshot_diff_rollback(backend):
+    project = "test-history"
+    if refused(backend, "snapshot", project):
+        return
+    runner.invoke(app, ["init-project", project])
+    file_path = DATA_DIR / project / "facts" / "versioned.md"
+    file_path.write_text("first\n")
+
+    result = runner.invoke(app, ["snapshot", project, "-m", "start"])
+    assert result.exit_code == 0
+    assert "Snapshot 1" in result.output
+    assert "Nothing changed" in runner.invoke(app, ["snapshot", project]).output
+
+    file_path.write_text("second version\n")
+    result = runner.invoke(app, ["diff", project, "--patch"])
+    assert "~ facts/versioned.md" in result.output
+    assert "+second version" in result.output
+
+    result = runner.invoke(app, ["rollback", project, "1", "--force"])
+    assert result.exit_code == 0
+    assert file_path.read_text() == "first\n"
+
+    result = runner.invoke(app, ["history", project])
+    assert "before rollback to 1" in result.output
+    result = runner.invoke(app, ["history", project, "facts", "versioned"])
+    assert "Versions of 'facts/versioned.md'" in result.output
+
+    result = runner.invoke(app, ["rollback", project, "99", "--force"])
+    assert result.exit_code != 0
+    assert "does not exist" in result.output
+
+# STORAGE TESTS
+def test_sqlite_storage_backend(tmp_path, backend):
+    if backend != "sqlite":
+        pytest.skip("checks the SQLite layout")
+
+    assert runner.invoke(app, ["init-project", "db-project"]).exit_code == 0
+    result = runner.invoke(app, ["create-context", "db-project", "facts", "stored"])
+    assert "✅ Created file" in result.output
+    assert (tmp_path / "projects_data" / "context.db").exists()
+    assert not (tmp_path / "projects_data" / "db-project").exists()
+
+    result = runner.invoke(app, ["list-contexts", "db-project", "facts"])
+    assert "stored.md" in result.output
+    result = runner.invoke(app, ["view-context", "db-project", "facts", "stored"])
+    assert "# Stored" in result.output
+
+    result = runner.invoke(app, ["delete-context", "db-project", "facts", "stored", "--force"])
+    assert "🗑️ Deleted file" in result.output
+    result = runner.invoke(app, ["view-context", "db-project", "facts", "stored"])
+    assert result.exit_code != 0
+    assert "does not exist" in result.output
+
+# BUNDLE TESTS
+def test_export_import_project(tmp_path, backend):
+    project = "test-bundle"
+    if refused(backend, "export-project", project):
+        return
+    runner.invoke(app, ["init-project", project])
+    runner.invoke(app, ["create-context", project, "facts", "moved"])
+    bundle_path = tmp_path / "bundle.tar.gz"
+
+    result = runner.invoke(app, ["export-project", project, "-o", str(bundle_path)])
+    assert result.exit_code == 0
+    assert "📦 Exported" in result.output
+
+    result = runner.invoke(app, ["import-project", str(bundle_path)])
+    assert result.exit_code == 0
+    assert "0 written" in result.output
+
+    result = runner.invoke(app, ["import-project", "--as", "test-bundle-copy"], input=bundle_path.read_bytes())
+    assert result.exit_code == 0
+    assert (DATA_DIR / "test-bundle-copy" / "facts" / "moved.md").exists()
+
+# STATS TESTS
+def test_stats_tokens(backend):
+    project = "test-stats"
+    if refused(backend, "stats", project):
+        return
+    runner.invoke(app, ["init-project", project])
+    write(project, "facts", "a", "x" * 400)
+
+    result = runner.invoke(app, ["stats", project, "--tokens"])
+    assert result.exit_code == 0
+    assert "facts" in result.output
+    assert "100 tokens" in result.output
+
+    result = runner.invoke(app, ["stats", project, "--tokens", "--tokenizer", "nope"])
+    assert result.exit_code != 0
+    assert "Unknown tokenizer" in result.output
+
+# DEDUP TESTS
+def test_dedup_report_and_load(backend):
+    project = "test-dedup"
+    if refused(backend, "dedup", project):
+        return
+    runner.invoke(app, ["init-project", project])
+    bullet = "- The staging cluster is rebuilt from scratch every Monday morning\n"
+    write(project, "facts", "infra", bullet)
+    write(project, "summaries", "week", bullet)
+
+    result = runner.invoke(app, ["dedup", project])
+    assert result.exit_code == 0
+    assert "🔁 2 copies" in result.output
+    assert "summaries/week.md:1-1" in result.output
+
+    result = runner.invoke(app, ["load", "-p", project, "--dedup"])
+    assert result.exit_code == 0
+    assert result.output.count("staging cluster") == 1
+    assert "[near-duplicate of facts/infra.md:1]" in result.output
+
+# TIER TESTS
+def test_tier_moves_cold_files_and_view_restores_them(backend):
+    import time
+    from context_core import access, tiering
+
+    project = "test-tier"
+    if refused(backend, "tier", project):
+        return
+    runner.invoke(app, ["init-project", project])
+    cold = DATA_DIR / project / "facts" / "old.md"
+    cold.write_text("# Old\n")
+    os.utime(cold, (0, 0))
+
+    result = runner.invoke(app, ["tier", project])
+    assert "not enough access history" in result.output
+
+    log = DATA_DIR / project / access.LOG_PATH
+    log.parent.mkdir(parents=True, exist_ok=True)
+    log.write_text(f"# since {time.time_ns() - 60 * tiering.DAY_NS}\n")
+    result = runner.invoke(app, ["tier", project, "--dry-run"])
+    assert "would move 1 file(s)" in result.output
+    assert cold.exists()
+
+    result = runner.invoke(app, ["tier", project])
+    assert result.exit_code == 0
+    assert "facts/old.md" in result.output
+    assert not cold.exists()
+    assert "- facts/old.md" in runner.invoke(app, ["tier", project, "--list"]).output
+
+    result = runner.invoke(app, ["view-context", project, "facts", "old"])
+    assert result.exit_code == 0
+    assert "# Old" in result.output
+    assert cold.exists()
+
+    result = runner.invoke(app, ["tier", project, "--auto", "14"])
+    assert "after 14 day(s)" in result.output
+    assert tiering.policy(DATA_DIR / project) == 14
+
+# SCAN TESTS
+def test_scan_streams_projects_and_totals(backend):
+    project = "test-scan"
+    if refused(backend, "scan"):
+        return
+    runner.invoke(app, ["init-project", project])
+    write(project, "goals", "old", "x" * 10)
+    os.utime(DATA_DIR / project / "goals" / "old.md", (0, 0))
+
+    result = runner.invoke(app, ["scan", "--type", "goals", "--workers", "2"])
+    assert result.exit_code == 0
+    assert "📁 test-scan" in result.output
+    assert "📊 Totals by type" in result.output
+
+    result = runner.invoke(app, ["scan", "--type", "goals", "--stale-days", "30", "--json"])
+    lines = [json.loads(line) for line in result.output.splitlines()]
+    assert any(line.get("project") == project for line in lines[:-1])
+    assert lines[-1]["stale"] >= 1
+
+# BATCH TESTS
+def test_batch_from_stdin():
+    project = "test-batch"
+    runner.invoke(app, ["init-project", project])
+    ops = "\n".join([
+        json.dumps({"op": "create-context", "project": project, "type": "facts", "name": "b1"}),
+        json.dumps({"op": "list-contexts", "project": project, "type": "facts"}),
+    ]) + "\n"
+
+    result = runner.invoke(app, ["batch"], input=ops)
+    assert result.exit_code == 0
+    results = [json.loads(line) for line in result.output.splitlines()]
+    assert results[1]["result"] == {"facts": ["b1.md"]}
+
+def test_batch_atomic_failure_exits_nonzero():
+    project = "test-batch-atomic"
+    runner.invoke(app, ["init-project", project])
+    ops = "\n".join([
+        json.dumps({"op": "create-context", "project": project, "type": "facts", "name": "b1"}),
+        json.dumps({"op": "delete-context", "project": project, "type": "facts", "name": "nope"}),
+    ]) + "\n"
+
+    result = runner.invoke(app, ["batch", "--atomic"], input=ops)
+    assert result.exit_code != 0
+    assert not exists(project, "facts", "b1")
+
+# ARCHIVE TESTS
+def test_archive_context_is_transparent(backend):
+    project = "test-archive"
+    if refused(backend, "archive-context", project, "chat-1", input="hi\n"):
+        return
+    runner.invoke(app, ["init-project", project])
+
+    result = runner.invoke(app, ["archive-context", project, "chat-1"], input="User: hi\nAssistant: hello\n")
+    assert result.exit_code == 0
+    assert "📦 Archived 'chat-1'" in result.output
+    assert not (DATA_DIR / project / "archives" / "chat-1.md").exists()
+
+    result = runner.invoke(app, ["list-contexts", project, "archives"])
+    assert "chat-1.md" in result.output
+
+    result = runner.invoke(app, ["view-context", project, "archives", "chat-1"])
+    assert "Assistant: hello" in result.output
+
+    result = runner.invoke(app, ["archive-context", project, "chat-1"], input="again\n")
+    assert result.exit_code != 0
+    assert "already exists" in result.output
+
+    result = runner.invoke(app, ["delete-context", project, "archives", "chat-1", "--force"])
+    assert result.exit_code == 0
+    result = runner.invoke(app, ["view-context", project, "archives", "chat-1"])
+    assert "does not exist" in result.output
+
+def test_compact_archives_command(backend):
+    project = "test-compact"
+    if refused(backend, "compact-archives", project):
+        return
+    runner.invoke(app, ["init-project", project])
+    runner.invoke(app, ["create-context", project, "archives", "old-log"])
+
+    result = runner.invoke(app, ["compact-archives", project])
+    assert result.exit_code == 0
+    assert "packed 1 loose file(s)" in result.output
+    assert not (DATA_DIR / project / "archives" / "old-log.md").exists()
+
+    result = runner.invoke(app, ["view-context", project, "archives", "old-log"])
+    assert "# Old Log" in result.output
+
+# SUMMARIZE TESTS
+def test_summarize_cumulative(backend):
+    project = "test-summarize"
+    if refused(backend, "summarize", project, "--cumulative"):
+        return
+    runner.invoke(app, ["init-project", project])
+    write(project, "summaries", "2025-05-22", "## Key Accomplishments\n- Shipped load\n")
+
+    result = runner.invoke(app, ["summarize", project, "--cumulative"])
+    assert result.exit_code == 0
+    assert "Folded 1 new session(s): 2025-05-22" in result.output
+    assert "Shipped load" in (DATA_DIR / project / "summaries" / "cumulative.md").read_text()
+
+    result = runner.invoke(app, ["summarize", project, "--cumulative"])
+    assert "up to date" in result.output
+
+    result = runner.invoke(app, ["summarize", project])
+    assert result.exit_code != 0
 
 # WALKTHROUGH TESTS
 def test_walkthrough_preview_only():
@@ -457,5 +894,3 @@ def test_run_walkthrough_interactive_flow():
     assert "Project 'test-walkthrough-project' initialized" in result.output
     assert "Created file" in result.output
     assert "You’re ready!" in result.output
-
-    shutil.rmtree(DATA_DIR / "test-walkthrough-project")
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import multiprocessing
+
+from context_core import manifest, operations
+from context_core.archives import ArchiveStore
+
+WRITERS = 8
+FILES_PER_WRITER = 20
+ARCHIVES_PER_WRITER = 5
+
+
+def body(writer: int, index: int) -> str:
+    # Large enough that an unsynchronised write would be visible as a torn file
+    line = f"writer {writer} file {index} " + hashlib.sha256(f"{writer}-{index}".encode()).hexdigest()
+    return "\n".join([line] * 800) + "\n"
+
+
+def writer(data_path, number, results):
+    created = []
+    for index in range(FILES_PER_WRITER):
+        operations.create_context("proj", "facts", f"w{number}-{index}", body(number, index), data_path)
+        created.append(index)
+
+    store = ArchiveStore(data_path / "proj")
+    for index in range(ARCHIVES_PER_WRITER):
+        store.append(f"chat-{number}-{index}", body(number, index))
+
+    # Every writer races to create the same context; exactly one may win
+    try:
+        operations.create_context("proj", "decisions", "shared", f"winner {number}\n", data_path)
+        won = True
+    except operations.ContextExists:
+        won = False
+    results.put((number, len(created), won))
+
+
+def test_concurrent_writers_do_not_corrupt(tmp_path):
+    operations.init_project("proj", tmp_path)
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    processes = [ctx.Process(target=writer, args=(tmp_path, n, results)) for n in range(WRITERS)]
+    for process in processes:
+        process.start()
+    outcomes = [results.get(timeout=60) for _ in processes]
+    for process in processes:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    assert sum(won for _, _, won in outcomes) == 1
+    project_path = tmp_path / "proj"
+
+    for number in range(WRITERS):
+        for index in range(FILES_PER_WRITER):
+            assert (project_path / "facts" / f"w{number}-{index}.md").read_text() == body(number, index)
+
+    store = ArchiveStore(project_path)
+    assert len(store.names()) == WRITERS * ARCHIVES_PER_WRITER
+    for number in range(WRITERS):
+        for index in range(ARCHIVES_PER_WRITER):
+            assert store.read(f"chat-{number}-{index}") == body(number, index)
+
+    assert not list(project_path.rglob("*.tmp"))
+    assert json.loads((project_path / "meta.json").read_text())["project"] == "proj"
+    files = manifest.context_files(project_path, deep=True)
+    assert len(files["facts"]) == WRITERS * FILES_PER_WRITER
+    assert files["decisions"] == ["shared.md"]
@@ -0,0 +1,34 @@
+import hashlib
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from corpus import generate  # noqa: E402
+
+from context_core.constants import VALID_CONTEXT_TYPES  # noqa: E402
+
+
+def tree_digest(root: Path) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.md")):
+        digest.update(str(path.relative_to(root)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def test_generator_is_deterministic(tmp_path):
+    first = generate(tmp_path / "a", files=200, projects=4, seed=7)
+    second = generate(tmp_path / "b", files=200, projects=4, seed=7)
+
+    assert first == second
+    assert tree_digest(tmp_path / "a") == tree_digest(tmp_path / "b")
+
+
+def test_generator_covers_every_type(tmp_path):
+    generate(tmp_path, files=500, projects=3, seed=1)
+    data_path = tmp_path / "projects_data"
+
+    assert len(list(data_path.rglob("*.md"))) == 500
+    for context_type in VALID_CONTEXT_TYPES:
+        assert list(data_path.glob(f"*/{context_type}/*.md")), context_type
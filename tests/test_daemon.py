@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from context_core import daemon, operations
+
+
+@pytest.fixture
+def server(tmp_path):
+    data_path = tmp_path / "data"
+    for folder in ["facts", "goals"]:
+        (data_path / "proj" / folder).mkdir(parents=True)
+    (data_path / "proj" / "facts" / "a.md").write_text("# A\n\nalpha fact\n")
+
+    srv = daemon.Server(tmp_path / "d.sock", data_path)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_ping_and_list(server):
+    sock = server.server_address
+    assert daemon.request(sock, "ping") == "pong"
+    assert daemon.request(sock, "list-contexts", project="proj") == {"facts": ["a.md"], "goals": []}
+
+
+def test_view_is_cached_until_file_changes(server):
+    sock = server.server_address
+    assert "alpha fact" in daemon.request(sock, "view-context", project="proj", type="facts", name="a")
+    assert "alpha fact" in daemon.request(sock, "view-context", project="proj", type="facts", name="a")
+    assert (server.cache.hits, server.cache.misses) == (1, 1)
+
+    (server.data_path / "proj" / "facts" / "a.md").write_text("# A\n\nrewritten fact, longer\n")
+    assert "rewritten" in daemon.request(sock, "view-context", project="proj", type="facts", name="a")
+    assert server.cache.misses == 2
+
+
+def test_create_and_load(server):
+    sock = server.server_address
+    daemon.request(sock, "create-context", project="proj", type="goals", name="g", content="goal text\n")
+
+    text = daemon.request(sock, "load", project="proj", types=["goals"])
+    assert "==> goals/g.md <==" in text
+    assert "alpha fact" not in text
+
+
+def test_errors_are_raised_on_the_client(server):
+    sock = server.server_address
+    with pytest.raises(operations.ContextError, match="does not exist"):
+        daemon.request(sock, "view-context", project="proj", type="facts", name="missing")
+    with pytest.raises(operations.ContextExists):
+        daemon.request(sock, "create-context", project="proj", type="facts", name="a")
+
+
+def test_forward_falls_back_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv(daemon.SOCKET_ENV, str(tmp_path / "nobody-home.sock"))
+    assert daemon.forward("ping") == "pong"
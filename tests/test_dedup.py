@@ -0,0 +1,75 @@
+import random
+
+from context_core import dedup, loader, operations
+
+BULLET = "- Deploys go out on Tuesdays after the staging smoke tests pass"
+
+
+def _project(tmp_path):
+    project_path = operations.init_project("proj", tmp_path)
+    (project_path / "summaries" / "week.md").write_text(
+        "# Week\n\n" + BULLET + "\n- Nothing else of note happened this week at all\n"
+    )
+    (project_path / "facts" / "deploy.md").write_text(
+        "# Deploy\n\n" + BULLET.replace("pass", "pass.") + "\n\nThe database lives in the eu-west region for now.\n"
+    )
+    (project_path / "goals" / "q3.md").write_text("# Q3\n\nShip the new onboarding flow by the end of the quarter.\n")
+    return project_path
+
+
+def test_split_units_separates_list_items_and_skips_headings():
+    lines = ["# Title", "", "para one", "continues here", "", "- item a", "  more a", "- item b", "1. step"]
+    assert dedup.split_units(lines) == [(2, 4), (5, 7), (7, 8), (8, 9)]
+
+
+def test_numpy_and_pure_python_signatures_agree(monkeypatch):
+    sets = [dedup.shingles("the quick brown fox jumps over the lazy dog"), dedup.shingles("one two three four five")]
+    fast = dedup.signatures(sets)
+    monkeypatch.setattr(dedup, "np", None)
+    assert dedup.signatures(sets) == fast
+
+
+def test_report_finds_copied_bullets_across_types(tmp_path):
+    project_path = _project(tmp_path)
+    found = dedup.report(project_path)
+    assert found["units"] == 5
+    assert len(found["clusters"]) == 1
+    copies = found["clusters"][0]["copies"]
+    assert [(c["path"], c["line"]) for c in copies] == [("facts/deploy.md", 3), ("summaries/week.md", 3)]
+    assert found["duplicates"] == 1 and found["tokens"] > 0
+
+    assert dedup.report(project_path, ["facts", "goals"])["clusters"] == []
+
+
+def test_signatures_are_cached_by_content_hash(tmp_path, monkeypatch):
+    project_path = _project(tmp_path)
+    dedup.report(project_path)
+    assert (project_path / dedup.CACHE_PATH).exists()
+
+    def no_shingling(text):
+        raise AssertionError("file was shingled again")
+
+    monkeypatch.setattr(dedup, "file_units", no_shingling)
+    assert len(dedup.report(project_path)["clusters"]) == 1
+
+
+def test_load_with_dedup_collapses_later_copies(tmp_path):
+    project_path = _project(tmp_path)
+    text = "".join(loader.iter_context(project_path, dedup=dedup.DEFAULT_THRESHOLD))
+    assert text.count("Deploys go out on Tuesdays") == 1
+    assert "[near-duplicate of facts/deploy.md:3]" in text
+    assert "Nothing else of note" in text
+
+    plain = "".join(loader.iter_context(project_path))
+    assert plain.count("Deploys go out on Tuesdays") == 2
+
+
+def test_lsh_scales_past_quadratic_pairs(tmp_path):
+    rng = random.Random(1)
+    words = [f"w{i}" for i in range(5000)]
+    units = []
+    for index in range(3000):
+        text = " ".join(rng.choice(words) for _ in range(20))
+        units.append((f"facts/{index}.md", 1, 1, len(text), dedup.signatures([dedup.shingles(text)])[0]))
+    units.append(("goals/copy.md", 1, 1, 0, units[42][-1]))
+    assert dedup.clusters(units) == [[42, 3000]]
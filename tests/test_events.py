@@ -0,0 +1,73 @@
+from datetime import datetime
+
+from context_core import events, operations
+
+DAY = 86_400 * 10**9
+
+
+def make_project(root):
+    operations.init_project("proj", root)
+    return root / "proj"
+
+
+def test_range_query_uses_index(tmp_path):
+    project_path = make_project(tmp_path)
+    for day in range(10):
+        events.append(project_path, "note", message=f"day {day}", when_ns=day * DAY)
+
+    found = events.query(project_path, since_ns=3 * DAY, until_ns=6 * DAY)
+    assert [e["message"] for e in found] == ["day 3", "day 4", "day 5"]
+    assert [e["message"] for e in events.query(project_path, since_ns=8 * DAY)] == ["day 8", "day 9"]
+    assert [e["message"] for e in events.query(project_path, limit=2)] == ["day 8", "day 9"]
+    assert events.query(project_path, since_ns=20 * DAY) == []
+
+
+def test_timestamps_never_go_backwards(tmp_path):
+    project_path = make_project(tmp_path)
+    events.append(project_path, "note", message="late", when_ns=5 * DAY)
+    events.append(project_path, "note", message="skewed", when_ns=2 * DAY)
+
+    assert [e["message"] for e in events.query(project_path, since_ns=5 * DAY)] == ["late", "skewed"]
+
+
+def test_torn_trailing_record_is_ignored(tmp_path):
+    project_path = make_project(tmp_path)
+    events.append(project_path, "note", message="one", when_ns=DAY)
+    with open(project_path / events.LOG_DIR / events.INDEX_NAME, "ab") as f:
+        f.write(b"\x01\x02\x03")
+    events.append(project_path, "note", message="two", when_ns=2 * DAY)
+
+    assert [e["message"] for e in events.query(project_path)] == ["one", "two"]
+
+
+def test_unindexed_log_lines_are_skipped(tmp_path):
+    project_path = make_project(tmp_path)
+    events.append(project_path, "note", message="one", when_ns=DAY)
+    # A writer died after appending its line but before indexing it
+    with open(project_path / events.LOG_DIR / events.LOG_NAME, "ab") as f:
+        f.write(b'{"kind": "note", "message": "orphan"}\n')
+    events.append(project_path, "note", message="two", when_ns=2 * DAY)
+    events.append(project_path, "note", message="three", when_ns=3 * DAY)
+
+    assert [e["message"] for e in events.query(project_path)] == ["one", "two", "three"]
+    assert [e["message"] for e in events.query(project_path, until_ns=3 * DAY)] == ["one", "two"]
+
+
+def test_context_changes_are_recorded_when_enabled(tmp_path):
+    project_path = make_project(tmp_path)
+    operations.create_context("proj", "facts", "before", data_path=tmp_path)
+    assert events.query(project_path) == []
+
+    events.set_recording(project_path, True)
+    operations.create_context("proj", "facts", "a", data_path=tmp_path)
+    operations.delete_context("proj", "facts", "a", data_path=tmp_path)
+
+    found = events.query(project_path)
+    assert [(e["kind"], e["type"], e["name"]) for e in found] == [("create", "facts", "a"), ("delete", "facts", "a")]
+    assert operations.list_contexts("proj", "timeline", tmp_path) == {"timeline": []}
+
+
+def test_parse_time_until_includes_whole_day():
+    start = events.parse_time("2025-05-22")
+    assert events.parse_time("2025-05-22", end=True) - start == DAY
+    assert start == int(datetime(2025, 5, 22).timestamp() * 1e9)
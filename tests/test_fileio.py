@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from context_core import fileio
+
+
+def test_atomic_write_replaces_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "a.md"
+    fileio.atomic_write(path, "one")
+    fileio.atomic_write(path, b"two")
+    assert path.read_text() == "two"
+    assert [p.name for p in tmp_path.iterdir()] == ["a.md"]
+
+
+def test_create_refuses_to_replace(tmp_path):
+    path = tmp_path / "a.md"
+    fileio.atomic_write(path, "first", create=True)
+    with pytest.raises(FileExistsError):
+        fileio.atomic_write(path, "second", create=True)
+    assert path.read_text() == "first"
+    assert [p.name for p in tmp_path.iterdir()] == ["a.md"]
+
+
+def test_lock_is_reentrant(tmp_path):
+    path = tmp_path / "meta.json"
+    with fileio.lock(path):
+        with fileio.lock(path):
+            fileio.atomic_write_json(path, {"ok": True})
+        assert fileio.lock_path(path).exists()
+    assert path.read_text() == '{"ok":true}'
+
+
+def test_lock_files_are_removed_on_release(tmp_path):
+    path = tmp_path / "counter"
+    path.write_text("0")
+
+    def bump():
+        for _ in range(50):
+            with fileio.lock(path):
+                path.write_text(str(int(path.read_text()) + 1))
+
+    threads = [threading.Thread(target=bump) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert path.read_text() == "400"
+    assert [p.name for p in tmp_path.iterdir()] == ["counter"]
@@ -0,0 +1,119 @@
+import hashlib
+import os
+
+import pytest
+
+from context_core import history, operations, tiering, trash
+
+
+# Incompressible enough that a full copy costs far more than a delta
+ALPHA = "".join(hashlib.sha256(str(i).encode()).hexdigest() + "\n" for i in range(200))
+
+
+def make_project(root):
+    operations.init_project("proj", root)
+    operations.create_context("proj", "facts", "a", ALPHA, root)
+    operations.create_context("proj", "goals", "b", "beta\n", root)
+    return root / "proj"
+
+
+def write(path, text):
+    path.write_text(text)
+    # Make the edit visible to the manifest even within one mtime tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_snapshot_stores_only_changes(tmp_path):
+    project_path = make_project(tmp_path)
+    store = history.History(project_path)
+
+    first = store.take("initial")
+    assert first["id"] == 1
+    assert first["changes"]["added"] == ["facts/a.md", "goals/b.md"]
+    assert store.take() is None
+
+    write(project_path / "facts" / "a.md", ALPHA + "one more line\n")
+    second = store.take("append")
+    assert second["changes"] == {"added": [], "changed": ["facts/a.md"], "removed": []}
+    assert second["files"]["goals/b.md"] == first["files"]["goals/b.md"]
+
+    # The new version is a small delta against the previous one
+    blob = (store.objects / second["files"]["facts/a.md"][:2] / second["files"]["facts/a.md"]).read_bytes()
+    assert blob[:1] == history.DELTA
+    assert len(blob) < 120
+
+    fresh = history.History(project_path)
+    assert fresh.read(second["files"]["facts/a.md"]) == (ALPHA + "one more line\n").encode()
+    assert fresh.read(first["files"]["facts/a.md"]) == ALPHA.encode()
+
+
+def test_delta_chain_is_capped(tmp_path):
+    project_path = make_project(tmp_path)
+    store = history.History(project_path)
+    text = ALPHA
+    for i in range(history.MAX_DEPTH + 3):
+        text = text.replace("\n", f" v{i}|", 1)
+        write(project_path / "facts" / "a.md", text)
+        taken = store.take()
+
+    digest = taken["files"]["facts/a.md"]
+    assert store._depth(digest) <= history.MAX_DEPTH
+    assert history.History(project_path).read(digest) == text.encode()
+
+
+def test_diff_and_file_history(tmp_path):
+    project_path = make_project(tmp_path)
+    store = history.History(project_path)
+    store.take()
+    write(project_path / "goals" / "b.md", "beta v2\n")
+    (project_path / "facts" / "a.md").unlink()
+    operations.create_context("proj", "facts", "c", "gamma\n", tmp_path)
+    store.take()
+
+    _, _, changes = history.diff(project_path, 1, 2)
+    assert changes == {"added": ["facts/c.md"], "changed": ["goals/b.md"], "removed": ["facts/a.md"]}
+    _, _, changes = history.diff(project_path, "latest")
+    assert not any(changes.values())
+
+    assert [(s["id"], bool(d)) for s, d in store.file_history("facts/a.md")] == [(1, True), (2, False)]
+    lines = list(history.patch("goals/b.md", b"beta\n", b"beta v2\n", "1", "2"))
+    assert "-beta\n" in lines and "+beta v2\n" in lines
+
+
+def test_rollback(tmp_path):
+    project_path = make_project(tmp_path)
+    history.History(project_path).take()
+    write(project_path / "facts" / "a.md", "rewritten\n")
+    operations.create_context("proj", "facts", "new", "new\n", tmp_path)
+
+    target = history.rollback(project_path, 1)
+    assert target["changes"] == {"added": [], "changed": ["facts/a.md"], "removed": ["facts/new.md"]}
+    assert (project_path / "facts" / "a.md").read_text() == ALPHA
+    assert not (project_path / "facts" / "new.md").exists()
+    assert trash.find(tmp_path, "context", "proj", "facts", "new")
+
+    # The state before the rollback was snapshotted, so it can be brought back
+    history.rollback(project_path, 2)
+    assert (project_path / "facts" / "a.md").read_text() == "rewritten\n"
+    assert (project_path / "facts" / "new.md").read_text() == "new\n"
+
+
+def test_rollback_drops_cold_copies_it_restores(tmp_path):
+    project_path = make_project(tmp_path)
+    history.History(project_path).take()
+    assert tiering.demote(project_path, ["goals/b.md"]) == ["goals/b.md"]
+
+    target = history.rollback(project_path, 1)
+    assert target["changes"]["added"] == ["goals/b.md"]
+    assert (project_path / "goals" / "b.md").read_text() == "beta\n"
+    assert tiering.cold_files(project_path) == []
+
+
+def test_unknown_snapshot(tmp_path):
+    project_path = make_project(tmp_path)
+    with pytest.raises(operations.ContextError):
+        history.diff(project_path, "latest")
+    history.History(project_path).take()
+    with pytest.raises(operations.ContextError):
+        history.rollback(project_path, 7)
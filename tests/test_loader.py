@@ -0,0 +1,58 @@
+from context_core import loader, operations
+
+
+def _project(tmp_path):
+    project_path = operations.init_project("proj", tmp_path)
+    (project_path / "summaries" / "today.md").write_text("summary v1\n")
+    (project_path / "facts" / "b.md").write_text("fact b\r\n\r\n")
+    (project_path / "facts" / "a.md").write_text("\ufefffact a")
+    (project_path / "instructions" / "rules.md").write_text("be brief\n")
+    (project_path / "actions" / "todo.md").write_text("ship it\n")
+    return project_path
+
+
+def test_assemble_puts_stable_types_first_in_canonical_form(tmp_path):
+    project_path = _project(tmp_path)
+    assembled = loader.assemble(project_path, priority=["summaries", "facts"])
+    text = assembled["text"]
+
+    assert [b["type"] for b in assembled["blocks"]] == ["facts", "instructions", "summaries", "actions"]
+    assert text.startswith("==> facts/a.md <==\nfact a\n\n==> facts/b.md <==\nfact b\n\n")
+    assert "\r" not in text and "\ufeff" not in text
+    assert assembled["prefix_bytes"] == len(text[:text.index("==> summaries/")].encode())
+    assert assembled["blocks"][1]["prefix_fingerprint"] == assembled["prefix_fingerprint"]
+    assert "prefix_fingerprint" not in assembled["blocks"][2]
+
+
+def test_prefix_fingerprint_only_moves_with_stable_content(tmp_path):
+    project_path = _project(tmp_path)
+    first = loader.assemble(project_path)
+
+    (project_path / "summaries" / "today.md").write_text("summary v2, much longer\n")
+    second = loader.assemble(project_path)
+    assert second["prefix_fingerprint"] == first["prefix_fingerprint"]
+    assert second["text"][:second["prefix_bytes"]] == first["text"][:first["prefix_bytes"]]
+    assert second["blocks"][-1]["fingerprint"] != first["blocks"][-1]["fingerprint"]
+
+    (project_path / "facts" / "a.md").write_text("fact a, edited\n")
+    third = loader.assemble(project_path)
+    assert third["prefix_fingerprint"] != first["prefix_fingerprint"]
+    assert third["blocks"][0]["fingerprint"] == first["blocks"][0]["fingerprint"]
+    assert third["blocks"][1]["fingerprint"] != first["blocks"][1]["fingerprint"]
+
+
+def test_assemble_budget_keeps_whole_files(tmp_path):
+    project_path = _project(tmp_path)
+    assembled = loader.assemble(project_path, max_tokens=21)
+    assert assembled["text"].endswith("[... truncated: token budget of 21 reached]\n")
+    assert [b["files"] for b in assembled["blocks"]] == [["rules.md"]]
+    assert loader.estimate_tokens(assembled["text"]) <= 21
+
+
+def test_budget_counts_the_truncation_note(tmp_path):
+    project_path = _project(tmp_path)
+    for max_tokens in range(0, 40):
+        text = "".join(loader.iter_context(project_path, max_tokens=max_tokens))
+        assert loader.estimate_tokens(text) <= max_tokens
+        if text:
+            assert text.endswith(f"[... truncated: token budget of {max_tokens} reached]\n")
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+
+from context_core import manifest
+
+
+def make_project(tmp_path):
+    project_path = tmp_path / "proj"
+    for folder in ["facts", "goals"]:
+        (project_path / folder).mkdir(parents=True)
+    return project_path
+
+
+def age_folder(path, seconds=10):
+    # Push a folder's mtime into the past so it falls outside the racy window
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 1_000_000_000))
+
+
+def test_refresh_records_file_entries(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("alpha\n")
+
+    data = manifest.refresh(project_path)
+    entry = data["folders"]["facts"]["files"]["a.md"]
+
+    assert entry["path"] == "facts/a.md"
+    assert entry["size"] == 6
+    assert entry["hash"] == hashlib.sha256(b"alpha\n").hexdigest()
+    assert (project_path / manifest.MANIFEST_NAME).exists()
+
+
+def test_unchanged_folder_is_not_rescanned(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("alpha\n")
+    for folder in ["facts", "goals"]:
+        age_folder(project_path / folder)
+    manifest.refresh(project_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("folder was rescanned")
+
+    monkeypatch.setattr(manifest, "_scan_folder", fail)
+    assert manifest.context_files(project_path) == {"facts": ["a.md"], "goals": []}
+
+
+def test_new_files_are_picked_up(tmp_path):
+    project_path = make_project(tmp_path)
+    manifest.refresh(project_path)
+    (project_path / "goals" / "b.md").write_text("beta\n")
+
+    assert manifest.context_files(project_path, "goals") == {"goals": ["b.md"]}
+
+
+def test_deep_refresh_rehashes_in_place_edits(tmp_path):
+    project_path = make_project(tmp_path)
+    file_path = project_path / "facts" / "a.md"
+    file_path.write_text("alpha\n")
+    age_folder(project_path / "facts")
+    manifest.refresh(project_path)
+
+    file_path.write_text("alpha, edited\n")
+    age_folder(project_path / "facts")
+    entry = manifest.refresh(project_path, deep=True)["folders"]["facts"]["files"]["a.md"]
+
+    assert entry["hash"] == hashlib.sha256(b"alpha, edited\n").hexdigest()
+
+
+def test_update_entry_removes_deleted_files(tmp_path):
+    project_path = make_project(tmp_path)
+    file_path = project_path / "facts" / "a.md"
+    file_path.write_text("alpha\n")
+    manifest.refresh(project_path)
+
+    file_path.unlink()
+    data = manifest.update_entry(project_path, "facts", "a.md")
+    assert "a.md" not in data["folders"]["facts"]["files"]
+
+
+def test_corrupt_manifest_is_rebuilt(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("alpha\n")
+    (project_path / manifest.MANIFEST_NAME).write_text("{not json")
+
+    assert manifest.context_files(project_path, "facts") == {"facts": ["a.md"]}
+    assert json.loads((project_path / manifest.MANIFEST_NAME).read_text())["version"] == manifest.MANIFEST_VERSION
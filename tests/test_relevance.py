@@ -0,0 +1,104 @@
+import os
+import pytest
+
+from context_core import loader, manifest, relevance
+
+np = pytest.importorskip("numpy")
+
+
+def make_project(root, name="proj"):
+    project_path = root / name
+    for folder in ["facts", "decisions"]:
+        (project_path / folder).mkdir(parents=True)
+    return project_path
+
+
+def test_split_chunks_at_headings():
+    data = b"intro\n# One\nalpha\n## Two\nbeta\ngamma\n"
+    chunks = list(relevance.split_chunks(data))
+    assert chunks == [(1, 0, 6), (2, 6, 12), (4, 18, 18)]
+    assert data[18:36] == b"## Two\nbeta\ngamma\n"
+
+
+def test_rank_scores_chunks_not_files(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text(
+        "# Storage\nThe storage engine uses packed segments.\n\n# Team\nAlice owns the roadmap.\n"
+    )
+    (project_path / "decisions" / "b.md").write_text("# Cache\nWe cache the storage index in memory.\n")
+
+    results = relevance.rank_project(project_path, "storage engine")
+
+    assert [(r["file"], r["heading"]) for r in results] == [("a.md", "Storage"), ("b.md", "Cache")]
+    assert results[0]["score"] > results[1]["score"]
+    assert relevance.read_chunk(project_path, results[0]).startswith("# Storage\n")
+    assert relevance.rank_project(project_path, "storage", types=["decisions"])[0]["file"] == "b.md"
+
+
+def test_scores_match_reference_bm25(tmp_path):
+    project_path = make_project(tmp_path)
+    for i in range(5):
+        (project_path / "facts" / f"f{i}.md").write_text(f"# Note {i}\n" + "token " * (i + 1) + "filler words\n")
+
+    scores = {r["file"]: r["score"] for r in relevance.rank_project(project_path, "token", limit=None)}
+
+    lengths = [2 + (i + 1) + 2 for i in range(5)]
+    avg = sum(lengths) / len(lengths)
+    idf = np.log1p((5 - 5 + 0.5) / (5 + 0.5))
+    for i, length in enumerate(lengths):
+        tf = i + 1
+        expected = idf * tf * (relevance.K1 + 1) / (tf + relevance.K1 * (1 - relevance.B + relevance.B * length / avg))
+        assert scores[f"f{i}.md"] == pytest.approx(expected, abs=1e-4)
+
+
+def test_only_changed_files_are_rechunked(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("# A\nalpha\n")
+    (project_path / "facts" / "b.md").write_text("# B\nbeta\n")
+    assert relevance.update_matrix(project_path) == 2
+
+    chunked = []
+    original = relevance.split_chunks
+    monkeypatch.setattr(relevance, "split_chunks", lambda data: chunked.append(data) or original(data))
+
+    (project_path / "facts" / "a.md").write_text("# A\ngamma, edited\n")
+    (project_path / "facts" / "b.md").unlink()
+    assert relevance.update_matrix(project_path) == 2
+    assert chunked == [b"# A\ngamma, edited\n"]
+    assert relevance.update_matrix(project_path) == 0
+
+    assert relevance.rank_project(project_path, "alpha beta") == []
+    assert relevance.rank_project(project_path, "gamma")[0]["file"] == "a.md"
+
+
+def test_queries_do_not_stat_every_file(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("# A\nalpha\n")
+    for folder in project_path.iterdir():
+        os.utime(folder, ns=(0, 0))  # settled, so the manifest trusts its folder listing
+    relevance.update_matrix(project_path)
+
+    def no_restat(*args):
+        raise AssertionError("query revalidated every file")
+
+    monkeypatch.setattr(manifest, "_restat_files", no_restat)
+    assert relevance.rank_project(project_path, "alpha")[0]["file"] == "a.md"
+
+
+def test_iter_relevant_respects_budget(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("# Deploy\ndeploy steps\n\n# Other\nunrelated text\n")
+
+    text = "".join(loader.iter_relevant(project_path, "deploy"))
+    assert "==> facts/a.md:1" in text and "deploy steps" in text
+    assert "unrelated" not in text
+
+    text = "".join(loader.iter_relevant(project_path, "deploy", max_tokens=20))
+    assert "truncated" in text
+    assert loader.estimate_tokens(text) <= 20
+
+
+def test_missing_numpy_is_reported(monkeypatch, tmp_path):
+    monkeypatch.setattr(relevance, "np", None)
+    with pytest.raises(relevance.ContextError, match="NumPy"):
+        relevance.rank_project(make_project(tmp_path), "anything")
@@ -0,0 +1,59 @@
+import os
+
+from context_core import operations, scan
+
+
+def _fleet(tmp_path, count=6):
+    for index in range(count):
+        project = f"proj-{index}"
+        operations.init_project(project, tmp_path)
+        for n in range(index):
+            operations.create_context(project, "facts", f"f{n}", "x" * 10, tmp_path)
+    return tmp_path
+
+
+def test_scan_project_uses_loose_context_files(tmp_path):
+    operations.init_project("proj", tmp_path)
+    operations.create_context("proj", "goals", "ship", "abcd", tmp_path)
+    (tmp_path / "proj" / "goals" / "notes.txt").write_text("ignored")
+    os.utime(tmp_path / "proj" / "goals" / "ship.md", ns=(0, 5))
+
+    folders = scan.scan_project(tmp_path / "proj")
+    assert folders["goals"] == {"files": 1, "bytes": 4, "newest_ns": 5, "oldest_ns": 5}
+    assert folders["facts"]["files"] == 0
+    assert list(scan.scan_project(tmp_path / "proj", "goals")) == ["goals"]
+
+
+def test_scan_streams_every_project_and_totals(tmp_path):
+    data_path = _fleet(tmp_path)
+    totals = scan.Totals()
+    seen = []
+    for result in scan.scan(data_path, workers=3):
+        seen.append(result["project"])
+        totals.add(result)
+    assert sorted(seen) == [f"proj-{i}" for i in range(6)]
+    assert totals.projects == 6
+    assert totals.folders["facts"]["files"] == 15
+    assert totals.total() == {"files": 15, "bytes": 150}
+
+
+def test_fan_out_reports_errors_and_keeps_order(tmp_path):
+    data_path = _fleet(tmp_path, 3)
+    names = ["proj-2", "missing", "proj-0"]
+    results = list(scan.fan_out(data_path, scan.scan_project, names, workers=4, ordered=True))
+    assert [name for name, _, _ in results] == names
+    assert isinstance(results[1][2], FileNotFoundError)
+    assert results[0][1]["facts"]["files"] == 2
+
+    totals = scan.Totals()
+    for result in scan.scan(data_path, names=["missing"]):
+        totals.add(result)
+    assert (totals.projects, totals.failed) == (0, 1)
+
+
+def test_is_stale():
+    folders = {"goals": {"files": 1, "bytes": 1, "newest_ns": 100, "oldest_ns": 100},
+               "facts": {"files": 1, "bytes": 1, "newest_ns": 500, "oldest_ns": 500}}
+    assert scan.is_stale(folders, 200, "goals")
+    assert not scan.is_stale(folders, 200)
+    assert scan.is_stale(folders, 200, "todos")
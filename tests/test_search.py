@@ -0,0 +1,92 @@
+import os
+
+from context_core import manifest, search
+
+
+def make_project(root, name="proj"):
+    project_path = root / name
+    for folder in ["facts", "goals"]:
+        (project_path / folder).mkdir(parents=True)
+    return project_path
+
+
+def test_search_ranks_and_snippets(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("# Alpha\n\nThe storage engine is fast.\nStorage storage storage.\n")
+    (project_path / "goals" / "b.md").write_text("# Beta\n\nImprove the storage layer.\nAnd many other unrelated words here.\n")
+
+    results = search.search_project(project_path, "storage engine")
+
+    assert [r["file"] for r in results] == ["a.md", "b.md"]
+    assert results[0]["line"] == 3
+    assert results[0]["snippet"] == "The storage engine is fast."
+
+
+def test_search_filters_by_type(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("shared term\n")
+    (project_path / "goals" / "b.md").write_text("shared term\n")
+
+    results = search.search_project(project_path, "shared", context_type="goals")
+    assert [r["type"] for r in results] == ["goals"]
+
+
+def test_only_changed_files_are_retokenized(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("alpha\n")
+    (project_path / "goals" / "b.md").write_text("beta\n")
+    assert search.update_index(project_path) == 2
+
+    tokenized = []
+    original = search._tokenize_file
+    monkeypatch.setattr(search, "_tokenize_file", lambda path: tokenized.append(path.name) or original(path))
+
+    (project_path / "facts" / "a.md").write_text("gamma, edited\n")
+    assert search.update_index(project_path) == 1
+    assert tokenized == ["a.md"]
+    assert search.update_index(project_path) == 0
+
+    assert search.search_project(project_path, "alpha") == []
+    assert search.search_project(project_path, "gamma")[0]["file"] == "a.md"
+
+
+def test_deleted_files_leave_the_index(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("ephemeral\n")
+    assert search.search_project(project_path, "ephemeral")
+
+    (project_path / "facts" / "a.md").unlink()
+    assert search.search_project(project_path, "ephemeral") == []
+
+
+def test_search_across_projects(tmp_path):
+    for name in ["one", "two"]:
+        project_path = make_project(tmp_path, name)
+        (project_path / "facts" / "x.md").write_text(f"needle in {name}\n")
+
+    results = search.search(tmp_path, "needle")
+    assert sorted(r["project"] for r in results) == ["one", "two"]
+
+
+def test_scores_are_comparable_across_projects(tmp_path):
+    for name, other in [("one", "needle there\n"), ("two", "hay there\n")]:
+        project_path = make_project(tmp_path, name)
+        (project_path / "facts" / "x.md").write_text("needle here\n")
+        (project_path / "goals" / "y.md").write_text(other)
+
+    scores = {(r["project"], r["file"]): r["score"] for r in search.search(tmp_path, "needle")}
+    assert scores[("one", "x.md")] == scores[("two", "x.md")]
+
+
+def test_queries_do_not_stat_every_file(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("alpha\n")
+    for folder in project_path.iterdir():
+        os.utime(folder, ns=(0, 0))  # settled, so the manifest trusts its folder listing
+    search.update_index(project_path)
+
+    def no_restat(*args):
+        raise AssertionError("query revalidated every file")
+
+    monkeypatch.setattr(manifest, "_restat_files", no_restat)
+    assert search.search_project(project_path, "alpha")[0]["file"] == "a.md"
@@ -0,0 +1,95 @@
+import pytest
+
+from context_core import operations, sections
+
+DOC = b"""# Summary
+
+intro
+
+## Key Accomplishments
+- one
+
+### Detail
+- deep
+
+## Next Steps
+- two
+"""
+
+
+def test_sections_span_until_same_or_higher_heading():
+    found = sections.sections_of(DOC)
+    titles = [(level, title) for level, title, _, _ in found]
+    assert titles == [(1, "Summary"), (2, "Key Accomplishments"), (3, "Detail"), (2, "Next Steps")]
+
+    offset, length = sections.find_section(found, "key accomplishments")
+    assert DOC[offset:offset + length] == b"## Key Accomplishments\n- one\n\n### Detail\n- deep\n\n"
+    offset, length = sections.find_section(found, "Summary")
+    assert offset + length == len(DOC)
+
+
+def test_heading_keeps_inner_hashes():
+    assert sections.sections_of(b"## C# notes ##\n")[0][1] == "C# notes"
+
+
+def test_index_is_cached_until_file_changes(tmp_path, monkeypatch):
+    (tmp_path / "facts").mkdir()
+    path = tmp_path / "facts" / "a.md"
+    path.write_bytes(DOC)
+
+    scanned = []
+    original = sections.scan
+    monkeypatch.setattr(sections, "scan", lambda p: scanned.append(p) or original(p))
+
+    sections.file_sections(tmp_path, "facts/a.md")
+    sections.file_sections(tmp_path, "facts/a.md")
+    assert len(scanned) == 1
+
+    path.write_bytes(DOC + b"## Later\n")
+    assert sections.file_sections(tmp_path, "facts/a.md")[-1][1] == "Later"
+    assert len(scanned) == 2
+
+
+def test_each_file_has_its_own_index(tmp_path):
+    (tmp_path / "facts").mkdir()
+    (tmp_path / "facts" / "a.md").write_bytes(DOC)
+    (tmp_path / "facts" / "b.md").write_bytes(b"# Other\n")
+    sections.file_sections(tmp_path, "facts/a.md")
+    before = sections.index_path(tmp_path, "facts/a.md").stat().st_ino
+
+    # Indexing another file never rewrites this one's index
+    sections.file_sections(tmp_path, "facts/b.md")
+    assert sections.index_path(tmp_path, "facts/a.md").stat().st_ino == before
+    assert sections.file_sections(tmp_path, "facts/b.md")[0][1] == "Other"
+
+
+def test_parse_range():
+    assert sections.parse_range("10:20", 100) == (10, 10)
+    assert sections.parse_range(":5", 100) == (0, 5)
+    assert sections.parse_range("-10:", 100) == (90, 10)
+    assert sections.parse_range("50:500", 100) == (50, 50)
+    with pytest.raises(ValueError):
+        sections.parse_range("10", 100)
+
+
+def test_iter_text_streams_in_blocks_across_utf8_boundaries(tmp_path):
+    path = tmp_path / "big.md"
+    text = "é" * 5000
+    path.write_text(text)
+
+    blocks = list(sections.iter_text(path, block_size=1001))
+    assert len(blocks) > 1
+    assert "".join(blocks) == text
+
+
+def test_stream_context_section_and_range(tmp_path):
+    (tmp_path / "proj" / "summaries").mkdir(parents=True)
+    (tmp_path / "proj" / "summaries" / "s.md").write_bytes(DOC)
+
+    text = "".join(operations.stream_context("proj", "summaries", "s", "Next Steps", data_path=tmp_path))
+    assert text == "## Next Steps\n- two\n"
+    text = "".join(operations.stream_context("proj", "summaries", "s", "Next Steps", ":13", data_path=tmp_path))
+    assert text == "## Next Steps"
+
+    with pytest.raises(operations.ContextError, match="Sections: 'Summary'"):
+        operations.stream_context("proj", "summaries", "s", "Missing", data_path=tmp_path)
@@ -0,0 +1,64 @@
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from context_core import fastpath
+from context_core.__main__ import app
+
+runner = CliRunner()
+DATA_DIR = Path("projects_data")
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def project():
+    name = "test-fastpath"
+    runner.invoke(app, ["init-project", name])
+    (DATA_DIR / name / "facts" / "a.md").write_text("# A\n\nfast facts\n")
+    yield name
+    shutil.rmtree(DATA_DIR / name)
+
+
+@pytest.mark.parametrize("args", [
+    ["hello"],
+    ["list-contexts", "test-fastpath"],
+    ["view-context", "test-fastpath", "facts", "a"],
+    ["load", "--project", "test-fastpath", "--facts", "--max-tokens", "50"],
+])
+def test_fast_path_does_not_import_typer(project, args):
+    code = (
+        "import sys; from context_core.fastpath import main; code = main(sys.argv[1:]); "
+        "assert 'typer' not in sys.modules and 'click' not in sys.modules; sys.exit(code)"
+    )
+    result = subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+@pytest.mark.parametrize("args", [
+    ["list-contexts", "test-fastpath"],
+    ["list-contexts", "test-fastpath", "goals"],
+    ["view-context", "test-fastpath", "facts", "a"],
+    ["load", "--project", "test-fastpath", "--max-tokens", "20"],
+    ["view-context", "test-fastpath", "facts", "missing"],
+])
+def test_fast_path_matches_typer_output(project, args, capsys):
+    code = fastpath.main(args)
+    fast_output = capsys.readouterr().out
+
+    result = runner.invoke(app, args)
+    assert fast_output == result.output
+    assert code == result.exit_code
+
+
+def test_options_fall_back_to_typer():
+    with pytest.raises(SystemExit) as exit_info:
+        fastpath.main(["load", "--project"])
+    assert exit_info.value.code != 0
@@ -0,0 +1,162 @@
+import threading
+
+import pytest
+
+from context_core import batch, operations, storage
+
+
+@pytest.fixture(params=storage.BACKENDS)
+def store(request, tmp_path):
+    backend = storage.FileStorage(tmp_path) if request.param == "files" else storage.SQLiteStorage(tmp_path)
+    yield backend
+    backend.close()
+
+
+def test_backends_must_implement_the_interface(tmp_path):
+    class Partial(storage.Storage):
+        def projects(self):
+            return []
+
+    with pytest.raises(TypeError, match="abstract"):
+        Partial(tmp_path)
+
+
+def test_project_lifecycle(store):
+    assert not store.project_exists("proj")
+    store.init_project("proj")
+    assert store.project_exists("proj")
+    with pytest.raises(operations.ContextExists):
+        store.init_project("proj")
+
+
+def test_delete_and_restore_project(store):
+    store.init_project("proj")
+    store.create("proj", "facts", "topic", "hello\n")
+    store.delete_project("proj")
+    assert not store.project_exists("proj")
+    assert [info["kind"] for info in store.trash_entries()] == ["project"]
+    with pytest.raises(operations.ContextError):
+        store.delete_project("proj")
+
+    store.restore_project("proj")
+    assert store.read("proj", "facts", "topic") == "hello\n"
+    assert store.trash_entries() == []
+    with pytest.raises(operations.ContextError):
+        store.restore_project("proj")
+
+
+def test_create_read_list_delete(store, tmp_path):
+    store.init_project("proj")
+    path = store.create("proj", "facts", "topic", "hello\n")
+    assert path == tmp_path / "proj" / "facts" / "topic.md"
+    assert store.read("proj", "facts", "topic") == "hello\n"
+    assert store.locate("proj", "facts", "topic") == path
+    store.create("proj", "goals", "templated")
+    assert store.read("proj", "goals", "templated").startswith("# Templated\n")
+
+    listing = store.list_contexts("proj")
+    assert listing["facts"] == ["topic.md"]
+    assert listing["goals"] == ["templated.md"]
+    assert listing["decisions"] == []
+    assert store.list_contexts("proj", "facts") == {"facts": ["topic.md"]}
+
+    store.delete("proj", "facts", "topic")
+    assert store.list_contexts("proj", "facts") == {"facts": []}
+    with pytest.raises(operations.ContextError, match="does not exist"):
+        store.read("proj", "facts", "topic")
+    with pytest.raises(operations.ContextError, match="does not exist"):
+        store.delete("proj", "facts", "topic")
+
+
+def test_validation(store):
+    store.init_project("proj")
+    store.create("proj", "facts", "topic", "x")
+    with pytest.raises(operations.ContextExists):
+        store.create("proj", "facts", "topic", "y")
+    with pytest.raises(operations.InvalidContextType):
+        store.create("proj", "nope", "topic", "y")
+    with pytest.raises(operations.ContextError):
+        store.create("missing", "facts", "topic", "y")
+    with pytest.raises(operations.ContextError):
+        store.list_contexts("missing")
+    with pytest.raises(operations.ContextError):
+        store.list_contexts("proj", "nope")
+
+
+def test_bulk_create(store):
+    store.init_project("proj")
+    items = [("facts", f"n{i:04d}", f"note {i}\n") for i in range(500)]
+    assert store.create_many("proj", items) == 500
+    listing = store.list_contexts("proj", "facts")["facts"]
+    assert len(listing) == 500 and listing[0] == "n0000.md"
+    assert store.read("proj", "facts", "n0123") == "note 123\n"
+
+
+def test_execute(store):
+    store.init_project("proj")
+    assert store.execute("create-context", {"project": "proj", "type": "facts", "name": "x", "content": "x\n"})
+    assert store.execute("view-context", {"project": "proj", "type": "facts", "name": "x"}) == "x\n"
+    assert store.execute("list-contexts", {"project": "proj", "type": "facts"}) == {"facts": ["x.md"]}
+    store.execute("delete-context", {"project": "proj", "type": "facts", "name": "x"})
+    assert store.execute("ping", {}) == "pong"
+
+
+def test_load_is_the_same_on_every_backend(store):
+    store.init_project("proj")
+    store.create("proj", "goals", "g", "# G\nship it\n")
+    store.create("proj", "facts", "f", "# F\nsky is blue\n")
+    text = store.execute("load", {"project": "proj", "types": [], "priority": ["facts"]})
+    assert text == "==> facts/f.md <==\n# F\nsky is blue\n\n==> goals/g.md <==\n# G\nship it\n\n"
+    assert "truncated" in store.execute("load", {"project": "proj", "max_tokens": 20})
+    if not isinstance(store, storage.FileStorage):
+        with pytest.raises(operations.ContextError, match="'search' needs the file storage backend"):
+            store.execute("search", {"query": "sky"})
+
+
+def test_concurrent_creates(store):
+    store.init_project("proj")
+    errors = []
+
+    def writer(number):
+        try:
+            for i in range(50):
+                store.create("proj", "facts", f"w{number}-{i}", f"{number} {i}\n")
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert len(store.list_contexts("proj", "facts")["facts"]) == 200
+
+
+def test_sqlite_bulk_insert_is_all_or_nothing(tmp_path):
+    store = storage.SQLiteStorage(tmp_path)
+    store.init_project("proj")
+    store.create("proj", "facts", "taken", "x")
+    with pytest.raises(operations.ContextExists):
+        store.create_many("proj", [("facts", "new", "y"), ("facts", "taken", "z")])
+    assert store.list_contexts("proj", "facts") == {"facts": ["taken.md"]}
+    assert store._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    store.close()
+
+
+def test_sqlite_project_delete_is_one_transaction(tmp_path):
+    import sqlite3
+
+    store = storage.SQLiteStorage(tmp_path)
+    store.init_project("proj")
+    store.create("proj", "facts", "topic", "x")
+    # Fail the last statement, after the contexts are already gone
+    store._db.execute(
+        "CREATE TRIGGER keep BEFORE DELETE ON projects BEGIN SELECT RAISE(ABORT, 'refused'); END"
+    )
+    with pytest.raises(sqlite3.IntegrityError):
+        store.delete_project("proj")
+    assert store.project_exists("proj")
+    assert store.read("proj", "facts", "topic") == "x"
+    assert store.trash_entries() == []
+    store.close()
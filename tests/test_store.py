@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from context_core import access, operations, storage
+from context_core.store import ContentCache, ContextFile, ContextStore, Project
+
+
+@pytest.fixture(params=storage.BACKENDS)
+def store(request, tmp_path):
+    context_store = ContextStore(tmp_path, backend=request.param)
+    context_store.init_project("proj")
+    yield context_store
+    if request.param != "files":
+        storage._opened.pop(os.path.abspath(tmp_path)).close()
+
+
+def test_structured_objects(store, tmp_path):
+    assert store.projects() == [Project("proj", tmp_path / "proj")]
+    created = store.create("proj", "facts", "topic", "hello\n")
+    assert created == ContextFile("proj", "facts", "topic", tmp_path / "proj" / "facts" / "topic.md")
+    store.write("proj", "goals", "ship", "# Ship\n")
+    assert store.list("proj") == [
+        ContextFile("proj", "facts", "topic", tmp_path / "proj" / "facts" / "topic.md"),
+        ContextFile("proj", "goals", "ship", tmp_path / "proj" / "goals" / "ship.md"),
+    ]
+    assert [f.file_name for f in store.list("proj", "goals")] == ["ship.md"]
+
+
+def test_write_read_delete(store):
+    store.write("proj", "facts", "topic", "first\n")
+    assert store.read("proj", "facts", "topic") == "first\n"
+    store.write("proj", "facts", "topic", "second, longer\n")
+    assert store.read("proj", "facts", "topic") == "second, longer\n"
+    store.delete("proj", "facts", "topic")
+    with pytest.raises(operations.ContextError):
+        store.read("proj", "facts", "topic")
+    with pytest.raises(operations.ContextError):
+        store.project("missing")
+
+
+def test_load_and_view(store):
+    store.write("proj", "facts", "topic", "# Topic\n\nalpha beta\n")
+    assert "alpha beta" in store.load("proj", ["facts"])
+    if not store.files_backend:
+        with pytest.raises(operations.ContextError, match="'load' needs the file storage backend"):
+            store.load("proj", ["facts"], dedup=0.8)
+        with pytest.raises(operations.ContextError):
+            store.view("proj", "facts", "topic", byte_range="0:7")
+        return
+    assert store.view("proj", "facts", "topic", byte_range="0:7") == "# Topic"
+
+
+def test_repeated_reads_are_served_from_memory(tmp_path, monkeypatch):
+    store = ContextStore(tmp_path, backend="files")
+    store.init_project("proj")
+    store.write("proj", "facts", "topic", "cached\n")
+    assert store.read("proj", "facts", "topic") == "cached\n"
+
+    def no_reads(*args, **kwargs):
+        raise AssertionError("file was read again")
+
+    monkeypatch.setattr("pathlib.Path.read_text", no_reads)
+    for _ in range(3):
+        assert store.read("proj", "facts", "topic") == "cached\n"
+    assert (store.cache.hits, store.cache.misses) == (3, 1)
+
+
+def test_cache_is_bounded_by_bytes(tmp_path):
+    cache = ContentCache(max_bytes=250)
+    paths = []
+    for index in range(4):
+        path = tmp_path / f"{index}.md"
+        path.write_text(str(index) * 100)
+        paths.append(path)
+
+    cache.read(paths[0])
+    cache.read(paths[1])
+    cache.read(paths[0])  # now the most recent
+    cache.read(paths[2])  # evicts paths[1]
+    assert cache.bytes == 200
+    cache.read(paths[0])
+    assert cache.hits == 2
+    cache.read(paths[1])
+    assert cache.misses == 4
+
+    big = tmp_path / "big.md"
+    big.write_text("x" * 1000)
+    assert cache.read(big) == "x" * 1000
+    assert cache.bytes <= 250
+
+
+def test_cached_lines_split_like_the_file(tmp_path):
+    path = tmp_path / "form.md"
+    path.write_text("one\x0ctwo\u2028three\nfour")
+    with open(path) as f:
+        assert ContentCache().lines(path) == list(f) == ["one\x0ctwo\u2028three\n", "four"]
+
+
+def test_reads_are_counted_for_tiering(tmp_path):
+    store = ContextStore(tmp_path, backend="files")
+    store.init_project("proj")
+    store.write("proj", "facts", "topic", "counted\n")
+    for _ in range(2):
+        store.read("proj", "facts", "topic")
+    assert access.counters(tmp_path / "proj")["facts/topic.md"]["count"] == 2
+    access.flush()
@@ -0,0 +1,89 @@
+from context_core import summaries
+
+
+def write_session(project_path, date, accomplishments, insights=(), next_steps=()):
+    lines = [f"# Session Summary – {date}", "", "## Key Accomplishments"]
+    lines += [f"- {item}" for item in accomplishments]
+    lines += ["", "## Insights"] + [f"- {item}" for item in insights]
+    lines += ["", "## Next Steps"] + [f"- {item}" for item in next_steps]
+    (project_path / "summaries" / f"{date}.md").write_text("\n".join(lines) + "\n")
+
+
+def make_project(root):
+    project_path = root / "proj"
+    (project_path / "summaries").mkdir(parents=True)
+    return project_path
+
+
+def test_parse_sections():
+    sections = summaries.parse_sections("# Title\n\n## Insights\n- one\n* two\ntext\n\n## Next Steps\n- three\n")
+    assert sections == {"Insights": ["one", "two"], "Next Steps": ["three"]}
+
+
+def test_cumulative_folds_sessions_in_order(tmp_path):
+    project_path = make_project(tmp_path)
+    write_session(project_path, "2025-05-22", ["Added CLI"], ["Keep it simple"], ["Add archives"])
+    write_session(project_path, "2025-05-23", ["Added archives", "Added CLI"], [], ["Add search"])
+
+    result = summaries.update_cumulative(project_path)
+    assert result["folded"] == ["2025-05-22", "2025-05-23"]
+
+    text = (project_path / "summaries" / "cumulative.md").read_text()
+    assert "Sessions folded: 2 (2025-05-22 → 2025-05-23)" in text
+    assert text.count("Added CLI") == 1
+    assert "- Added archives (2025-05-23)" in text
+    assert "- Keep it simple (2025-05-22)" in text
+    assert "Add search" in text and "Add archives\n" not in text
+
+
+def test_only_new_sessions_are_read(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    write_session(project_path, "2025-05-22", ["First"])
+    summaries.update_cumulative(project_path)
+
+    parsed = []
+    original = summaries.parse_sections
+    monkeypatch.setattr(summaries, "parse_sections", lambda text: parsed.append(text) or original(text))
+
+    assert summaries.update_cumulative(project_path)["folded"] == []
+    write_session(project_path, "2025-05-24", ["Second"])
+    result = summaries.update_cumulative(project_path)
+
+    assert result["folded"] == ["2025-05-24"]
+    assert result["sessions"] == 2
+    assert len(parsed) == 1
+    text = (project_path / "summaries" / "cumulative.md").read_text()
+    assert "- First (2025-05-22)" in text and "- Second (2025-05-24)" in text
+
+
+def test_edited_checkpoint_session_triggers_rebuild(tmp_path):
+    project_path = make_project(tmp_path)
+    write_session(project_path, "2025-05-22", ["Original"])
+    summaries.update_cumulative(project_path)
+
+    write_session(project_path, "2025-05-22", ["Rewritten entirely"])
+    result = summaries.update_cumulative(project_path)
+
+    assert result["rebuilt"]
+    text = (project_path / "summaries" / "cumulative.md").read_text()
+    assert "Rewritten entirely" in text and "Original" not in text
+
+
+def test_back_dated_and_edited_older_sessions_trigger_rebuild(tmp_path):
+    project_path = make_project(tmp_path)
+    write_session(project_path, "2025-05-22", ["First"])
+    write_session(project_path, "2025-05-24", ["Third"])
+    summaries.update_cumulative(project_path)
+
+    write_session(project_path, "2025-05-23", ["Back-dated"])
+    result = summaries.update_cumulative(project_path)
+    assert result["rebuilt"] and result["sessions"] == 3
+    assert "- Back-dated (2025-05-23)" in (project_path / "summaries" / "cumulative.md").read_text()
+
+    write_session(project_path, "2025-05-22", ["First, corrected"])
+    result = summaries.update_cumulative(project_path)
+    assert result["rebuilt"] and result["sessions"] == 3
+    text = (project_path / "summaries" / "cumulative.md").read_text()
+    assert "- First, corrected (2025-05-22)" in text and "- First (2025-05-22)" not in text
+
+    assert summaries.update_cumulative(project_path) == dict(result, folded=[], rebuilt=False)
@@ -0,0 +1,106 @@
+import os
+import time
+
+import pytest
+
+from context_core import access, loader, manifest, operations, search, tiering
+
+DAY_NS = tiering.DAY_NS
+
+
+@pytest.fixture
+def project(tmp_path):
+    project_path = operations.init_project("proj", tmp_path)
+    for folder, name in [("facts", "hot"), ("facts", "cold"), ("instructions", "rules")]:
+        path = operations.create_context("proj", folder, name, f"# {name}\n\nzebra {name} notes\n", tmp_path)
+        os.utime(path, ns=(0, 0))
+    manifest.refresh(project_path, deep=True)
+    yield project_path
+    access.flush()
+
+
+def _start_accounting(project_path, days_ago):
+    log_path = project_path / access.LOG_PATH
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path.write_text(f"# since {time.time_ns() - days_ago * DAY_NS}\n")
+
+
+def test_reads_are_batched_then_appended(project, monkeypatch):
+    monkeypatch.setattr(access, "FLUSH_INTERVAL", 3600)
+    access.flush()
+    "".join(loader.iter_context(project, ["facts"]))
+    "".join(operations.stream_context("proj", "facts", "hot", data_path=project.parent))
+    assert not (project / access.LOG_PATH).exists()
+
+    counts = access.counters(project)
+    assert counts["facts/hot.md"]["count"] == 2
+    assert counts["facts/cold.md"]["count"] == 1
+
+    access.flush()
+    lines = (project / access.LOG_PATH).read_text().splitlines()
+    assert lines[0].startswith("# since ")
+    assert len(lines) == 3
+    assert access.counters(project)["facts/hot.md"]["count"] == 2
+
+
+def test_log_is_compacted(project, monkeypatch):
+    monkeypatch.setattr(access, "COMPACT_BYTES", 200)
+    for _ in range(10):
+        access.record(project, "facts/hot.md")
+        access.flush()
+    lines = (project / access.LOG_PATH).read_text().splitlines()
+    assert len(lines) <= 6
+    assert access.counters(project)["facts/hot.md"]["count"] == 10
+    assert access.since(project) is not None
+
+
+def test_nothing_is_cold_without_enough_history(project):
+    access.record(project, "facts/hot.md")
+    access.flush()
+    assert tiering.apply(project, days=30) == []
+    assert not tiering.has_history(project, 30)
+
+
+def test_explicit_zero_days_is_not_the_default(project):
+    _start_accounting(project, days_ago=1)
+    assert tiering.has_history(project, 0)
+    assert not tiering.has_history(project)
+    moved = tiering.apply(project, days=0)
+    assert [c["path"] for c in moved] == ["facts/cold.md", "facts/hot.md"]
+
+
+def test_cold_files_move_out_and_come_back_on_request(project):
+    _start_accounting(project, days_ago=60)
+    access.record(project, "facts/hot.md")
+    access.flush()
+
+    moved = tiering.apply(project, days=30)
+    assert [c["path"] for c in moved] == ["facts/cold.md"]
+    assert tiering.cold_files(project) == ["facts/cold.md"]
+    assert operations.list_contexts("proj", "facts", project.parent) == {"facts": ["hot.md"]}
+    assert "zebra cold" not in "".join(loader.iter_context(project))
+    found = [r["file"] for r in search.search(project.parent, "zebra")]
+    assert "hot.md" in found and "cold.md" not in found
+    assert (project / "instructions" / "rules.md").exists()
+
+    with pytest.raises(operations.ContextExists):
+        operations.create_context("proj", "facts", "cold", "new", project.parent)
+
+    assert "zebra cold" in operations.read_context("proj", "facts", "cold", project.parent)
+    assert tiering.cold_files(project) == []
+    assert operations.list_contexts("proj", "facts", project.parent) == {"facts": ["cold.md", "hot.md"]}
+    # Just read, so it is hot again
+    assert tiering.apply(project, days=30) == []
+
+
+def test_policy_runs_at_most_daily(project):
+    _start_accounting(project, days_ago=60)
+    assert tiering.run_due(project) == []  # no policy
+    tiering.set_policy(project, 30)
+    assert len(tiering.run_due(project)) == 2
+    assert tiering.run_due(project) == []
+    later = time.time_ns() + 2 * DAY_NS
+    operations.read_context("proj", "facts", "hot", project.parent)
+    assert tiering.run_due(project, now_ns=later) == []
+    tiering.set_policy(project, None)
+    assert tiering.policy(project) is None
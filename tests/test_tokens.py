@@ -0,0 +1,76 @@
+import pytest
+
+from context_core import tokens
+from context_core.archives import ArchiveStore
+
+
+def make_project(root):
+    project_path = root / "proj"
+    for folder in ["facts", "archives"]:
+        (project_path / folder).mkdir(parents=True)
+    return project_path
+
+
+def test_counts_are_cached_by_content_hash(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("x" * 40)
+    (project_path / "facts" / "b.md").write_text("x" * 40)
+
+    calls = []
+    monkeypatch.setattr(tokens, "TOKENIZERS", dict(tokens.TOKENIZERS))
+    tokens.register_tokenizer("counting", lambda text: calls.append(text) or len(text))
+
+    assert tokens.count_files(project_path, "counting") == {"facts/a.md": 40, "facts/b.md": 40}
+    assert len(calls) == 1  # identical content is tokenized once
+
+    assert tokens.count_files(project_path, "counting")["facts/a.md"] == 40
+    assert len(calls) == 1
+
+    (project_path / "facts" / "a.md").write_text("changed")
+    assert tokens.count_files(project_path, "counting")["facts/a.md"] == 7
+    assert len(calls) == 2
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = tokens.TokenCache(tmp_path, limit=2)
+    cache.put("approx", "a", 1)
+    cache.put("approx", "b", 2)
+    assert cache.get("approx", "a") == 1
+    cache.put("approx", "c", 3)
+
+    assert cache.get("approx", "b") is None
+    assert cache.get("approx", "a") == 1
+    cache.save()
+    assert tokens.TokenCache(tmp_path).tables == {"approx": {"c": 3, "a": 1}}
+
+
+def test_project_totals_include_packed_archives(tmp_path):
+    project_path = make_project(tmp_path)
+    (project_path / "facts" / "a.md").write_text("12345678")
+    ArchiveStore(project_path).append("chat", "x" * 400)
+
+    totals = tokens.project_totals(project_path)
+    assert totals["facts"] == {"files": 1, "tokens": 2}
+    assert totals["archives"] == {"files": 1, "tokens": 100}
+
+
+def test_packed_counts_survive_compaction(tmp_path, monkeypatch):
+    project_path = make_project(tmp_path)
+    store = ArchiveStore(project_path)
+    store.append("old", "y" * 40)
+    store.append("chat", "x" * 400)
+    tokens.count_files(project_path)
+    store.delete("old")
+    store.compact()  # moves "chat" to a new segment and offset
+
+    def no_counting(text):
+        raise AssertionError("archive was tokenized again")
+
+    monkeypatch.setitem(tokens.TOKENIZERS, "approx", no_counting)
+    assert tokens.count_files(project_path)["archives/chat.md"] == 100
+
+
+def test_tokenizers():
+    assert tokens.get_tokenizer("words")[1]("Hello, world!") == 4
+    with pytest.raises(tokens.ContextError, match="Unknown tokenizer"):
+        tokens.get_tokenizer("nope")
@@ -0,0 +1,98 @@
+import json
+import sys
+import threading
+
+from typer.testing import CliRunner
+
+from context_core import trace
+from context_core.__main__ import app
+
+runner = CliRunner(mix_stderr=False)
+
+
+def test_disabled_tracing_is_a_no_op():
+    assert not trace.enabled()
+    with trace.span("read") as span:
+        trace.count("bytes_read", 10)
+    assert span is trace._NULL_SPAN
+    assert not trace.enabled()
+
+
+def test_json_trace_file(tmp_path, monkeypatch):
+    destination = tmp_path / "trace.json"
+    monkeypatch.delenv(trace.TRACE_ENV, raising=False)
+    assert trace.start(str(destination))
+    try:
+        with trace.span("read"):
+            trace.count("bytes_read", 42)
+        with trace.span("read"):
+            trace.count("bytes_read", 8)
+    finally:
+        trace.finish()
+
+    data = json.loads(destination.read_text())
+    assert data["spans"]["read"]["calls"] == 2
+    assert data["counters"] == {"bytes_read": 50}
+    assert [e["name"] for e in data["traceEvents"]] == ["read", "read"]
+
+
+def test_counters_from_threads_are_not_lost(tmp_path, monkeypatch):
+    destination = tmp_path / "trace.json"
+    monkeypatch.delenv(trace.TRACE_ENV, raising=False)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+
+    def work():
+        for _ in range(2000):
+            trace.count("files_stat")
+            with trace.span("fs"):
+                pass
+
+    assert trace.start(str(destination))
+    try:
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        trace.finish()
+        sys.setswitchinterval(interval)
+
+    data = json.loads(destination.read_text())
+    assert data["counters"] == {"files_stat": 16000}
+    assert data["spans"]["fs"]["calls"] == 16000
+
+
+def test_stats_refreshes_each_manifest_once(tmp_path, monkeypatch):
+    from context_core import manifest
+
+    monkeypatch.chdir(tmp_path)
+    runner.invoke(app, ["init-project", "traced"])
+    runner.invoke(app, ["create-context", "traced", "facts", "a"])
+
+    calls = []
+    original = manifest.refresh
+    monkeypatch.setattr(manifest, "refresh", lambda path, deep=False: calls.append(deep) or original(path, deep))
+    result = runner.invoke(app, ["--profile", "stats", "traced", "--tokens"])
+    assert result.exit_code == 0
+    assert calls.count(True) == 1
+
+
+def test_cprofile_dump(tmp_path, monkeypatch):
+    monkeypatch.setenv(trace.PROFILE_ENV, str(tmp_path / "out.prof"))
+    assert trace.start()
+    trace.finish()
+    assert (tmp_path / "out.prof").stat().st_size > 0
+
+
+def test_profile_flag_reports_on_stderr(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    runner.invoke(app, ["init-project", "traced"])
+    runner.invoke(app, ["create-context", "traced", "facts", "a"])
+    result = runner.invoke(app, ["--profile", "list-contexts", "traced"])
+    assert result.exit_code == 0
+    assert "📂 facts/" in result.stdout
+    assert "⏱️ trace" in result.stderr
+    assert "fs" in result.stderr
+    assert not trace.enabled()
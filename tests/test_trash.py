@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from context_core import manifest, operations, trash
+from context_core.archives import ArchiveStore
+
+
+def make_project(root):
+    operations.init_project("proj", root)
+    operations.create_context("proj", "facts", "keep", "kept\n", root)
+    return root / "proj"
+
+
+def test_delete_and_restore_project(tmp_path):
+    project_path = make_project(tmp_path)
+    operations.delete_project("proj", tmp_path)
+    assert not project_path.exists()
+
+    [(entry, info)] = trash.entries(tmp_path)
+    assert info["kind"] == "project" and info["project"] == "proj"
+    assert (entry / trash.ITEM_NAME / "facts" / "keep.md").exists()
+
+    operations.restore_project("proj", tmp_path)
+    assert (project_path / "facts" / "keep.md").read_text() == "kept\n"
+    assert trash.entries(tmp_path) == []
+
+
+def test_restore_refuses_to_overwrite(tmp_path):
+    make_project(tmp_path)
+    operations.delete_project("proj", tmp_path)
+    operations.init_project("proj", tmp_path)
+    with pytest.raises(operations.ContextExists):
+        operations.restore_project("proj", tmp_path)
+    with pytest.raises(operations.ContextError):
+        operations.restore_project("other", tmp_path)
+
+
+def test_delete_and_restore_context(tmp_path):
+    project_path = make_project(tmp_path)
+    operations.delete_context("proj", "facts", "keep", tmp_path)
+    assert "keep.md" not in manifest.read_manifest(project_path)["folders"]["facts"]["files"]
+
+    operations.restore_context("proj", "facts", "keep", tmp_path)
+    assert (project_path / "facts" / "keep.md").read_text() == "kept\n"
+    assert "keep.md" in manifest.read_manifest(project_path)["folders"]["facts"]["files"]
+
+
+def test_packed_archive_goes_to_trash(tmp_path):
+    project_path = make_project(tmp_path)
+    ArchiveStore(project_path).append("chat", "old chat\n")
+    operations.delete_context("proj", "archives", "chat", tmp_path)
+    assert "chat" not in ArchiveStore(project_path)
+
+    operations.restore_context("proj", "archives", "chat", tmp_path)
+    assert (project_path / "archives" / "chat.md").read_text() == "old chat\n"
+
+
+def test_collect_respects_retention(tmp_path):
+    make_project(tmp_path)
+    operations.delete_context("proj", "facts", "keep", tmp_path)
+
+    assert trash.collect(tmp_path)["entries"] == 0
+    assert trash.collect(tmp_path, older_than=0) == {"entries": 1, "files": 1, "bytes": 5}
+    assert trash.entries(tmp_path) == []
+
+
+def test_collect_is_throttled(tmp_path):
+    project_path = make_project(tmp_path)
+    for i in range(4):
+        (project_path / "facts" / f"big-{i}.md").write_bytes(b"x" * (1 << 20))
+    operations.delete_project("proj", tmp_path)
+
+    started = time.perf_counter()
+    result = trash.collect(tmp_path, everything=True, rate=20 * (1 << 20))
+    assert result["bytes"] >= 4 << 20
+    assert time.perf_counter() - started >= 0.15
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from context_core import operations, tokens, watch
+
+
+def make_project(root):
+    operations.init_project("proj", root)
+    operations.create_context("proj", "facts", "a", "# Alpha\n\nplain words\n", root)
+    operations.create_context("proj", "goals", "b", "# Beta\n\nother words\n", root)
+    project_path = root / "proj"
+    watch.resync(project_path)
+    return project_path
+
+
+def edit(path, text):
+    path.write_text(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def read_cache(project_path, name):
+    return json.loads((project_path / ".cache" / name).read_text())
+
+
+def test_sync_files_updates_every_index(tmp_path):
+    project_path = make_project(tmp_path)
+    edit(project_path / "facts" / "a.md", "# Alpha\n\n## Zebra\n\nstriped words\n")
+    (project_path / "goals" / "b.md").unlink()
+
+    assert watch.sync_files(project_path, {"facts/a.md", "goals/b.md"}) == 2
+
+    files = json.loads((project_path / "manifest.json").read_text())["folders"]
+    assert "b.md" not in files["goals"]["files"]
+    docs = read_cache(project_path, "search/docs.json")
+    assert set(docs) == {"facts/a.md"}
+    assert docs["facts/a.md"]["hash"] == files["facts"]["files"]["a.md"]["hash"]
+    titles = [s[1] for s in read_cache(project_path, "sections/facts/a.md.json")["sections"]]
+    assert titles == ["Alpha", "Zebra"]
+    assert not (project_path / ".cache" / "sections" / "goals" / "b.md.json").exists()
+    cache = tokens.TokenCache(project_path)
+    assert cache.get("approx", files["facts"]["files"]["a.md"]["hash"]) is not None
+
+    # Nothing changed since: a second sync is a no-op
+    assert watch.sync_files(project_path, {"facts/a.md"}) == 0
+
+
+def test_polling_watcher(tmp_path):
+    project_path = make_project(tmp_path)
+    watcher = watch.PollingWatcher(tmp_path, interval=0)
+
+    edit(project_path / "facts" / "a.md", "changed\n")
+    (project_path / "goals" / "c.md").write_text("new\n")
+    (project_path / "facts" / ".a.md.lock").write_text("")
+    assert watcher.poll(0) == {"proj": {"facts/a.md", "goals/c.md"}}
+    assert watcher.poll(0) == {}
+
+    operations.init_project("other", tmp_path)
+    assert watcher.poll(0) == {"other": watch.RESCAN}
+
+
+def test_inotify_watcher(tmp_path):
+    project_path = make_project(tmp_path)
+    try:
+        watcher = watch.InotifyWatcher(tmp_path)
+    except (OSError, AttributeError):
+        pytest.skip("inotify is not available")
+
+    try:
+        operations.create_context("proj", "facts", "new", "fresh\n", tmp_path)
+        (project_path / "goals" / "b.md").unlink()
+        changes = {}
+        deadline = time.monotonic() + 5
+        while changes.get("proj") != {"facts/new.md", "goals/b.md"} and time.monotonic() < deadline:
+            watch._merge(changes, watcher.poll(0.2))
+        assert changes["proj"] == {"facts/new.md", "goals/b.md"}
+
+        operations.init_project("other", tmp_path)
+        changes = {}
+        while "other" not in changes and time.monotonic() < deadline:
+            watch._merge(changes, watcher.poll(0.2))
+        assert changes["other"] is watch.RESCAN
+    finally:
+        watcher.close()
+
+
+def test_watch_loop_debounces_bursts(tmp_path):
+    project_path = make_project(tmp_path)
+    batches = []
+    stop = threading.Event()
+    started = threading.Event()
+    synced = threading.Event()
+
+    def on_sync(results):
+        batches.append(results)
+        (synced if len(batches) > 1 else started).set()
+
+    thread = threading.Thread(target=watch.watch, kwargs={
+        "data_path": tmp_path, "on_sync": on_sync, "watcher": watch.PollingWatcher(tmp_path, interval=0.05),
+        "debounce": 0.3, "interval": 0.05, "stop": stop,
+    })
+    thread.start()
+    try:
+        assert started.wait(5)
+        for i in range(5):
+            operations.create_context("proj", "facts", f"burst-{i}", f"burst {i}\n", tmp_path)
+            time.sleep(0.02)
+        assert synced.wait(5)
+    finally:
+        stop.set()
+        thread.join(5)
+
+    # The whole burst is applied as one batch
+    assert batches[1] == {"proj": 5}
+    assert "facts/burst-3.md" in read_cache(project_path, "search/docs.json")